@@ -0,0 +1,88 @@
+"""
+rows/sec for clean_reviews: the previous per-row .apply implementation versus
+the vectorized one, on a Play Store-like fixture with mixed date formats.
+Also checks that both produce identical frames.
+
+    python benchmarks/bench_clean.py --rows 200000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing.clean import CATEGORICAL_COLUMNS, clean_reviews, normalize_date
+
+
+def legacy_clean_text(text):
+    if not isinstance(text, str):
+        return ""
+    return re.sub(r'\s+', ' ', text.strip())
+
+
+def legacy_clean_reviews(df: pd.DataFrame) -> pd.DataFrame:
+    """clean_reviews as it was before vectorization."""
+    df = df.copy()
+    df['review_text'] = df.get('review_text', '').fillna('').apply(legacy_clean_text)
+    df = df[df['review_text'].str.len() > 0]
+    if 'review_date' in df.columns:
+        df['review_date'] = df['review_date'].apply(normalize_date)
+    df = df.drop_duplicates(subset=['review_text', 'review_date'])
+    df['rating'] = pd.to_numeric(df.get('rating'), errors='coerce')
+    df = df[(df['rating'] >= 1) & (df['rating'] <= 5)]
+    return df.reset_index(drop=True)
+
+
+TEXTS = ["Good app", "  Slow   login\n again ", "", None, "OTP never arrives 😡", "ጥሩ ነው", "good app", 42]
+DATE_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%d %B %Y"]
+
+
+def make_fixture(n: int, seed: int = 3) -> pd.DataFrame:
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    dates = []
+    for _ in range(n):
+        d = base + timedelta(minutes=rng.randint(0, 500000))
+        roll = rng.random()
+        dates.append(None if roll < 0.01 else ("not a date" if roll < 0.02 else d.strftime(rng.choice(DATE_FORMATS))))
+    return pd.DataFrame({
+        "review_text": [t if not isinstance(t, str) else f"{t} {rng.randint(0, n // 3)}" if t else t
+                        for t in (rng.choice(TEXTS) for _ in range(n))],
+        "rating": [rng.choice([1, 2, 3, 4, 5, 5, 0, None, "5"]) for _ in range(n)],
+        "review_date": dates,
+        "source": "google_play",
+        "bank": [rng.choice(["CBE", "BOA", "Dashen"]) for _ in range(n)],
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=100000)
+    args = ap.parse_args()
+    df = make_fixture(args.rows)
+
+    start = time.perf_counter()
+    before = legacy_clean_reviews(df)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = clean_reviews(df)
+    vectorized = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(after.astype({c: object for c in CATEGORICAL_COLUMNS}), before, check_dtype=False)
+    assert after["review_date"].dtype == before["review_date"].dtype
+    print(f"{'implementation':<12} | {'seconds':>8} | {'rows/sec':>10}")
+    print(f"{'per-row':<12} | {legacy:>8.2f} | {args.rows / legacy:>10.0f}")
+    print(f"{'vectorized':<12} | {vectorized:>8.2f} | {args.rows / vectorized:>10.0f}")
+    print(f"identical output: {len(after)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Time-to-first-render for the Streamlit dashboard. The postgres module is
+mocked (as in tests/test_dashboard_data.py) with a configurable per-query
+latency, and the app script is imported in Streamlit's bare mode. Reports when
+the first KPI metric is drawn and when the whole script has finished.
+
+    python benchmarks/bench_dashboard_render.py --latency-ms 80 --runs 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+from src.db import postgres
+
+BANKS = ["CBE", "BOA", "Dashen"]
+
+
+def _slow(fn, latency: float):
+    def wrapper(*args, **kwargs):
+        time.sleep(latency)
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def mock_postgres(latency: float, days: int = 365):
+    """Replace every dashboard query with canned rollup-sized results behind a fixed delay."""
+    dates = pd.date_range("2024-01-01", periods=days).date
+    daily = pd.DataFrame([
+        {"bank": b, "review_date": d, "sentiment_label": label, "rating": r, "review_count": 3, "score_sum": 1.5}
+        for b in BANKS for d in dates for label in ("POSITIVE", "NEGATIVE") for r in (1, 5)
+    ])
+    themes = pd.DataFrame([
+        {"bank": b, "theme": t, "review_count": 2 * days, "score_sum": 1.0 * days}
+        for b in BANKS for t in ("otp", "login", "transfer")
+    ])
+    page = pd.DataFrame({"review_id": range(50, 0, -1), "bank": "CBE", "review_text": "ok", "rating": 5,
+                         "sentiment_label": "POSITIVE", "themes": [["otp"]] * 50})
+
+    postgres.get_bank_names = _slow(lambda: list(BANKS), latency)
+    postgres.get_kpis = _slow(lambda banks: {"volume": len(daily) * 3, "avg_rating": 3.0,
+                                             "positive_pct": 50.0, "polarization": 0.0}, latency)
+    postgres.get_rollups = _slow(lambda: {"daily": daily, "themes": themes}, latency)
+    postgres.get_recent_reviews = _slow(lambda banks, limit, before_id=None: page.head(limit), latency)
+
+
+def render_once() -> dict:
+    """Run the app script top to bottom; returns seconds to the first metric and to completion."""
+    marks = {}
+    original_metric = DeltaGenerator.metric
+
+    def metric(self, *args, **kwargs):
+        marks.setdefault("first_kpi", time.perf_counter() - start)
+        return original_metric(self, *args, **kwargs)
+
+    DeltaGenerator.metric = metric
+    st.cache_data.clear()
+    sys.modules.pop("src.dashboard.app", None)
+    start = time.perf_counter()
+    try:
+        import src.dashboard.app  # noqa: F401
+    finally:
+        DeltaGenerator.metric = original_metric
+    marks["complete"] = time.perf_counter() - start
+    return marks
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    mock_postgres(args.latency_ms / 1000)
+    runs = [render_once() for _ in range(args.runs)]
+
+    print(f"{'stage':<16} | {'median s':>9} | {'max s':>7}")
+    for stage in ("first_kpi", "complete"):
+        values = [r[stage] for r in runs if stage in r]
+        print(f"{stage:<16} | {statistics.median(values):>9.3f} | {max(values):>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
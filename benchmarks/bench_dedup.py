@@ -0,0 +1,85 @@
+"""
+Model calls saved by near-duplicate clustering, on a Play Store-like fixture:
+stock praise in many spellings ("good", "Good app!!", "nice 👍"), copy-pasted
+complaints with small edits, and long-tail unique reviews.
+
+Compares the number of texts sent to the model with no deduplication, with the
+exact-match deduplication predict_sentiment already does, and with MinHash LSH.
+
+    python benchmarks/bench_dedup.py --rows 100000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.analysis.sentiment import preprocess_text
+from src.preprocessing.dedup import find_near_duplicates
+
+STOCK = ["good", "good app", "nice", "very good", "best app", "bad", "not working", "excellent", "wow", "ok"]
+DECORATIONS = ["", "!", "!!", "!!!", " 👍", " 😍", ".", " 🙏🙏"]
+COMPLAINTS = [
+    "The app keeps crashing every time I try to transfer money to another account",
+    "I can't login after the last update, it says my password is wrong even after reset",
+    "OTP never arrives so I cannot complete any transaction please fix this issue",
+    "Very slow app, it takes forever to load my balance and the statement page",
+    "Money was deducted from my account but the transfer failed and no refund yet",
+]
+WORDS = ("app bank transfer balance login otp update slow fast service branch account card "
+         "statement network error support easy simple design fee telebirr airtime").split()
+
+
+def _variant(text: str, rng: random.Random) -> str:
+    words = text.split()
+    roll = rng.random()
+    if roll < 0.3:
+        words[rng.randrange(len(words))] = rng.choice(WORDS)  # one-word edit
+    elif roll < 0.5:
+        words.append(rng.choice(["please", "asap", "!!!", "😡", "fix it"]))
+    text = " ".join(words)
+    return text.upper() if rng.random() < 0.1 else text
+
+
+def make_fixture(n: int, seed: int = 13) -> pd.DataFrame:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.45:
+            t = rng.choice(STOCK) + rng.choice(DECORATIONS)
+            texts.append(t.capitalize() if rng.random() < 0.5 else t)
+        elif roll < 0.65:
+            texts.append(_variant(rng.choice(COMPLAINTS), rng))
+        else:
+            texts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 25))))
+    return pd.DataFrame({"review_text": texts})
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--threshold", type=float, default=0.8)
+    args = ap.parse_args()
+    df = make_fixture(args.rows)
+
+    exact_calls = len({preprocess_text(t) for t in df["review_text"]})
+    start = time.perf_counter()
+    out = find_near_duplicates(df, threshold=args.threshold)
+    elapsed = time.perf_counter() - start
+    lsh_calls = int(out["is_representative"].sum())
+
+    print(f"{'strategy':<14} | {'model calls':>11} | {'saved':>6}")
+    for name, calls in [("none", len(df)), ("exact", exact_calls), ("minhash-lsh", lsh_calls)]:
+        print(f"{name:<14} | {calls:>11} | {1 - calls / len(df):>6.1%}")
+    print(f"clustering: {elapsed:.2f}s ({len(df) / elapsed:.0f} rows/sec), "
+          f"{int(out['spam_candidate'].sum())} spam candidates")
+
+
+if __name__ == "__main__":
+    main()
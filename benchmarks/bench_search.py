@@ -0,0 +1,80 @@
+"""
+Full-text search latency: search_reviews on the SQLite FTS5 stand-in and the
+in-memory ReviewIndex used by the offline dashboard, p50/p95 per query over a
+synthetic corpus. On PostgreSQL the same queries run against the GIN index;
+point DB_URL at a loaded database and pass --postgres to include it.
+
+    python benchmarks/bench_search.py --n 1000000
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from bench_sentiment_batching import make_corpus
+from src.db import postgres, search
+
+QUERIES = ["otp", "login error", "otp or login error", '"slow network" -update', "ጥሩ", "crash or balance"]
+
+
+def _timings(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[-1] if repeat > 1 else timings[0]
+
+
+def _report(name, query, fn, repeat):
+    p50, p95 = _timings(fn, repeat)
+    print(f"{name:<10} | {query:<24} | {p50 * 1000:>7.1f} | {p95 * 1000:>7.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--postgres", action="store_true", help="Also query the database configured in DB_URL")
+    args = ap.parse_args()
+
+    texts = make_corpus(args.n)
+    frame = pd.DataFrame({
+        "review_text": [f"{t} #{i}" for i, t in enumerate(texts)],  # unique texts, so none dedupe away
+        "rating": 3, "review_date": "2024-01-01", "sentiment_label": "NEUTRAL", "sentiment_score": 0.5,
+        "source": "bench", "identified_theme": None,
+    })
+
+    start = time.perf_counter()
+    index = search.ReviewIndex(frame["review_text"])
+    print(f"ReviewIndex built over {args.n} reviews in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'backend':<10} | {'query':<24} | {'p50 ms':>7} | {'p95 ms':>7}")
+    for query in QUERIES:
+        _report("memory", query, lambda: index.search_frame(frame, query, limit=args.limit), args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        postgres._engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        postgres.create_schema()
+        postgres.insert_reviews(frame, "BENCH")
+        for query in QUERIES:
+            _report("sqlite", query, lambda: postgres.search_reviews(query, ["BENCH"], limit=args.limit), args.repeat)
+        postgres._engine.dispose()
+        postgres._engine = None
+
+    if args.postgres:
+        for query in QUERIES:
+            _report("postgres", query, lambda: postgres.search_reviews(query, limit=args.limit), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Latency and throughput per sentiment backend (hf, quantized, onnx), in-process
+and with the worker pool, plus label/score parity against the first backend.
+Backends that cannot be loaded here (missing torch/onnxruntime, no model
+download) are reported as skipped.
+
+    python benchmarks/bench_sentiment_backends.py --n 2000 --workers 1 4
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bench_sentiment_batching import make_corpus
+from src.analysis import sentiment
+
+
+def _latencies(classifier, texts, batch_size):
+    processed = [sentiment.preprocess_text(t) for t in texts]
+    timings = []
+    for start in range(0, len(processed), batch_size):
+        t0 = time.perf_counter()
+        sentiment._score_batched(classifier, processed[start:start + batch_size], batch_size, sentiment.MAX_SEQ_LENGTH)
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=2000)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--backends", nargs="+", default=list(sentiment.BACKENDS))
+    ap.add_argument("--workers", type=int, nargs="+", default=[1],
+                    help="Worker process counts to try (1 = in-process)")
+    ap.add_argument("--threads", type=int, default=0, help="Intra-op threads per model (0 = default)")
+    ap.add_argument("--model", default=sentiment.MODEL_NAME, help="HF model name or local directory")
+    args = ap.parse_args()
+    sentiment.MODEL_NAME = args.model
+    sentiment.logger.setLevel("WARNING")
+    texts = make_corpus(args.n)
+
+    reference = None
+    print(f"{'backend':<10} | {'workers':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'reviews/sec':>11} | parity")
+    for name in args.backends:
+        try:
+            classifier = sentiment.load_backend(name, model_name=args.model, num_threads=args.threads)
+        except Exception as e:
+            print(f"{name:<10} | skipped: {e}")
+            continue
+        if reference is None:
+            reference, parity = classifier, "reference"
+        else:
+            report = sentiment.compare_backends(texts[:500], classifier, reference, args.batch_size)
+            parity = (f"{'ok' if report['ok'] else 'FAIL'} labels {report['label_agreement']:.1%}, "
+                      f"max Δscore {report['max_score_diff']}")
+        for workers in args.workers:
+            if workers <= 1:
+                timings = _latencies(classifier, texts, args.batch_size)
+                elapsed = sum(timings)
+                p50 = statistics.median(timings)
+                p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            else:
+                sentiment.BACKEND = name
+                sentiment.get_worker_pool(workers, num_threads=args.threads or None)
+                sentiment._score_parallel(texts[:workers], workers, args.batch_size, sentiment.MAX_SEQ_LENGTH)  # load models
+                start = time.perf_counter()
+                sentiment._score_parallel([sentiment.preprocess_text(t) for t in texts], workers,
+                                          args.batch_size, sentiment.MAX_SEQ_LENGTH)
+                elapsed = time.perf_counter() - start
+                p50 = p95 = float("nan")
+            print(f"{name:<10} | {workers:>7} | {p50 * 1000:>7.1f} | {p95 * 1000:>7.1f} | "
+                  f"{args.n / elapsed:>11.1f} | {parity}")
+    sentiment.shutdown_worker_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Throughput benchmark for predict_sentiment batching.
+Reports reviews/sec per batch size against a local stand-in model, so it runs
+offline. Pass --model to benchmark a locally downloaded HF model directory instead.
+
+    python benchmarks/bench_sentiment_batching.py --n 2000 --batch-sizes 1 8 32 64
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.analysis import sentiment
+
+
+class StandInPipeline:
+    """
+    Mimics the cost profile of a transformers pipeline: a fixed overhead per call
+    plus a cost proportional to batch size times the longest (padded) sequence.
+    """
+
+    def __init__(self, call_overhead: float = 0.004, token_cost: float = 0.00002):
+        self.call_overhead = call_overhead
+        self.token_cost = token_cost
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        padded = max(len(t.split()) for t in batch) + 2
+        time.sleep(self.call_overhead + self.token_cost * padded * len(batch))
+        return [{"label": "POSITIVE" if len(t) % 2 else "NEGATIVE", "score": 0.9} for t in batch]
+
+
+WORDS = ["app", "slow", "login", "otp", "transfer", "great", "crash", "update", "bank", "service",
+         "ጥሩ", "አይሰራም", "money", "fast", "network", "error", "balance", "support"]
+
+
+def make_corpus(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    # Play Store reviews are mostly short with a long tail
+    return [" ".join(rng.choice(WORDS) for _ in range(min(int(rng.expovariate(1 / 12)) + 1, 200)))
+            for _ in range(n)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=2000)
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32, 64])
+    ap.add_argument("--model", help="Path to a local HF sentiment model directory")
+    args = ap.parse_args()
+
+    if args.model:
+        from transformers import pipeline
+        sentiment._classifier = pipeline("sentiment-analysis", model=args.model, tokenizer=args.model)
+    else:
+        sentiment._classifier = StandInPipeline()
+    sentiment.logger.setLevel("WARNING")
+
+    texts = make_corpus(args.n)
+    print(f"{'batch_size':>10} | {'seconds':>8} | {'reviews/sec':>11}")
+    for bs in args.batch_sizes:
+        start = time.perf_counter()
+        sentiment.predict_sentiment(texts, batch_size=bs)
+        elapsed = time.perf_counter() - start
+        print(f"{bs:>10} | {elapsed:>8.2f} | {args.n / elapsed:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
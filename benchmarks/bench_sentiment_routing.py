@@ -0,0 +1,95 @@
+"""
+Routed vs. unrouted predict_sentiment: per-route text counts and model latency
+(from the instrumentation registry) and overall reviews/sec. Offline it uses
+stand-in models where the English one is cheaper per token; pass --model and
+--english-model (HF names or local directories) to measure real models and to
+check label accuracy on the labelled fixture in tests/fixtures.
+
+    python benchmarks/bench_sentiment_routing.py --n 5000
+    python benchmarks/bench_sentiment_routing.py --model cardiffnlp/twitter-xlm-roberta-base-sentiment \\
+        --english-model distilbert-base-uncased-finetuned-sst-2-english
+"""
+import argparse
+import csv
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bench_sentiment_batching import StandInPipeline, make_corpus
+from src import instrumentation
+from src.analysis import sentiment
+
+FIXTURE = PROJECT_ROOT / "tests" / "fixtures" / "labelled_reviews.csv"
+AMHARIC = ["ይህ መተግበሪያ በጣም ጥሩ ነው", "አይሰራም", "በጣም ቀርፋፋ ነው", "ጥሩ አገልግሎት"]
+EMOJI = ["👍", "😡", "😍😍", "🙏", "..."]
+
+
+def make_mixed_corpus(n: int, amharic_share: float, emoji_share: float, seed: int = 7):
+    rng = random.Random(seed)
+    texts = make_corpus(n, seed)
+    for i in range(n):
+        roll = rng.random()
+        if roll < emoji_share:
+            texts[i] = rng.choice(EMOJI)
+        elif roll < emoji_share + amharic_share:
+            texts[i] = rng.choice(AMHARIC)
+        else:
+            # make_corpus mixes in a couple of Ge'ez words; keep the rest Latin-only
+            texts[i] = " ".join(w for w in texts[i].split() if w.isascii()) or "app"
+    return texts
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--amharic-share", type=float, default=0.15)
+    ap.add_argument("--emoji-share", type=float, default=0.10)
+    ap.add_argument("--model", help="Multilingual HF model (default: stand-in)")
+    ap.add_argument("--english-model", help="English HF model (default: stand-in)")
+    args = ap.parse_args()
+    sentiment.logger.setLevel("WARNING")
+
+    if args.model:
+        sentiment._classifier = sentiment.load_backend(model_name=args.model)
+    else:
+        sentiment._classifier = StandInPipeline(token_cost=0.00004)
+    sentiment.ENGLISH_MODEL_NAME = args.english_model or "stand-in-english"
+    if args.english_model:
+        sentiment._english_classifier = sentiment.load_backend(model_name=args.english_model)
+    else:
+        sentiment._english_classifier = StandInPipeline(token_cost=0.00001)
+    sentiment._english_loaded = True
+
+    texts = make_mixed_corpus(args.n, args.amharic_share, args.emoji_share)
+    print(f"{'mode':<9} | {'seconds':>8} | {'reviews/sec':>11} | per route: texts, model seconds")
+    for routing in (False, True):
+        instrumentation.registry.reset()
+        start = time.perf_counter()
+        sentiment.predict_sentiment(texts, batch_size=args.batch_size, routing=routing)
+        elapsed = time.perf_counter() - start
+        snap = instrumentation.snapshot()
+        per_route = ", ".join(
+            f"{route} {int(snap['counters'].get(f'sentiment.route.{route}', 0))} "
+            f"/ {snap['histograms'].get(f'sentiment.route.{route}', {}).get('sum', 0.0):.2f}s"
+            for route in sentiment.ROUTES
+        )
+        print(f"{'routed' if routing else 'unrouted':<9} | {elapsed:>8.2f} | {args.n / elapsed:>11.1f} | {per_route}")
+
+    if args.model and args.english_model:
+        with open(FIXTURE, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        report = sentiment.evaluate_routing([r["review_text"] for r in rows], [r["label"] for r in rows],
+                                            args.batch_size)
+        print(f"fixture accuracy: routed {report['routed_accuracy']:.1%} vs "
+              f"unrouted {report['baseline_accuracy']:.1%} ({'ok' if report['ok'] else 'FAIL'})")
+        for text, before, after in report["mismatches"]:
+            print(f"  {text!r}: {before} -> {after}")
+
+
+if __name__ == "__main__":
+    main()
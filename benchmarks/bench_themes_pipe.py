@@ -0,0 +1,62 @@
+"""
+Docs/sec for theme extraction: the per-review nlp() loop versus streaming
+nlp.pipe with the parser and NER disabled, on a synthetic review corpus.
+
+    python benchmarks/bench_themes_pipe.py --n 20000 --n-process 1 4
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.analysis import thematic
+
+SUBJECTS = ["The app", "This update", "Login", "The OTP", "Money transfer", "Customer service", "The balance page"]
+VERBS = ["is", "keeps being", "became", "was"]
+ADJS = ["slow", "great", "useless", "fast", "buggy", "reliable", "confusing", "excellent"]
+TAILS = ["after the latest update.", "every single time.", "when I check my account.",
+         "during network issues.", "", "and support never answers."]
+
+
+def make_corpus(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        " ".join(filter(None, [rng.choice(SUBJECTS), rng.choice(VERBS), rng.choice(ADJS), rng.choice(TAILS)]))
+        for _ in range(n)
+    ]
+
+
+def per_review_loop(texts):
+    return [thematic.extract_themes([t]) if t.strip() else [] for t in texts]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=20000)
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--n-process", type=int, nargs="+", default=[1])
+    args = ap.parse_args()
+
+    texts = make_corpus(args.n)
+    thematic.warmup()
+
+    start = time.perf_counter()
+    baseline = per_review_loop(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{'per-review nlp()':<24} | {elapsed:>7.2f}s | {args.n / elapsed:>9.1f} docs/sec")
+
+    for n_process in args.n_process:
+        start = time.perf_counter()
+        streamed = list(thematic.iter_themes(texts, batch_size=args.batch_size, n_process=n_process))
+        elapsed = time.perf_counter() - start
+        label = f"nlp.pipe n_process={n_process}"
+        print(f"{label:<24} | {elapsed:>7.2f}s | {args.n / elapsed:>9.1f} docs/sec")
+        assert streamed == baseline, "streamed themes differ from the per-review loop"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Seeded synthetic review corpus shaped like the scraper's Play Store output
+(src.scraping.scraper.RAW_COLUMNS plus bank): English, Amharic and mixed
+reviews, emoji, stock one-word praise, a long tail of unique texts, J-shaped
+ratings with a few invalid values, mixed date formats, blanks and re-scraped
+duplicates. The same seed always gives the same frame.
+
+    from corpus import make_reviews, with_scores
+    raw = make_reviews(100_000, seed=0)
+"""
+import numpy as np
+import pandas as pd
+
+BANKS = ["Commercial Bank of Ethiopia", "Bank of Abyssinia", "Dashen Bank"]
+
+STOCK = ["good", "Good app", "nice", "very good", "best app", "bad", "not working", "excellent", "wow", "ok"]
+SUBJECTS = ["The app", "This update", "Login", "The OTP", "Money transfer", "Customer service",
+            "The balance page", "Telebirr transfer", "Airtime top up"]
+VERBS = ["is", "keeps being", "became", "was", "is always"]
+ADJS = ["slow", "great", "useless", "fast", "buggy", "reliable", "confusing", "excellent", "simple", "broken"]
+TAILS = ["after the latest update.", "every single time.", "when I check my account.",
+         "during network issues.", "", "and support never answers.", "please fix it!"]
+AMHARIC = ["ጥሩ ነው", "በጣም ጥሩ መተግበሪያ", "አይሰራም", "በጣም ቀርፋፋ ነው", "ገንዘብ መላክ አልቻልኩም",
+           "ኦቲፒ አይመጣም", "ምርጥ ባንክ", "እባካችሁ አስተካክሉት"]
+EMOJI = ["👍", "😍", "😡", "😭", "🙏", "😊", "😞", "🔥", "💯"]
+WORDS = ("app bank transfer balance login otp update slow fast service branch account card statement "
+         "network error support easy simple design fee telebirr airtime crash password pin receipt").split()
+
+# (strftime format, share) as the scraper and older CSV exports produced them
+DATE_FORMATS = [("%Y-%m-%d %H:%M:%S", 0.70), ("%Y-%m-%dT%H:%M:%S", 0.10), ("%d %B %Y", 0.10), ("%m/%d/%Y", 0.05)]
+# Play Store ratings are J-shaped; 0, None and "5" are the invalid values clean_reviews must handle
+RATINGS = [(5, 0.48), (1, 0.24), (4, 0.10), (3, 0.07), (2, 0.06), ("5", 0.02), (0, 0.02), (None, 0.01)]
+KINDS = ["stock", "english", "amharic", "mixed", "long_tail"]
+
+
+def _draw(rng: np.random.Generator, choices, n: int):
+    values, weights = zip(*choices)
+    weights = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+
+def _texts(rng: np.random.Generator, n: int, emoji_rate: float, amharic_rate: float) -> list:
+    other = 1 - amharic_rate
+    kinds = rng.choice(len(KINDS), size=n, p=[0.25 * other, 0.45 * other, amharic_rate * 0.7,
+                                              amharic_rate * 0.3, 0.30 * other])
+    picks = rng.integers(0, 1 << 30, size=(n, 4))
+    # Long-tail reviews are random word runs, mostly short with a long tail; draw all words at once
+    tail_lengths = np.where(kinds == 4, np.minimum(rng.exponential(14, size=n).astype(int) + 3, 200), 0)
+    ends = np.cumsum(tail_lengths)
+    words = np.asarray(WORDS, dtype=object)[rng.integers(0, len(WORDS), size=int(ends[-1]) if n else 0)]
+    texts = []
+    for kind, (a, b, c, d), end, length in zip(kinds, picks, ends, tail_lengths):
+        if kind == 0:
+            text = STOCK[a % len(STOCK)]
+        elif kind == 1:
+            text = " ".join(filter(None, [SUBJECTS[a % len(SUBJECTS)], VERBS[b % len(VERBS)],
+                                          ADJS[c % len(ADJS)], TAILS[d % len(TAILS)]]))
+        elif kind == 2:
+            text = AMHARIC[a % len(AMHARIC)]
+        elif kind == 3:
+            text = f"{SUBJECTS[a % len(SUBJECTS)]} {AMHARIC[b % len(AMHARIC)]}"
+        else:
+            text = " ".join(words[end - length:end])
+        texts.append(text)
+
+    decorate = rng.random(n) < emoji_rate
+    emoji_ids = rng.integers(0, len(EMOJI), size=n)
+    repeats = rng.integers(1, 4, size=n)
+    emoji_only = rng.random(n) < 0.2
+    for i in np.flatnonzero(decorate):
+        marks = EMOJI[emoji_ids[i]] * repeats[i]
+        texts[i] = marks if emoji_only[i] else f"{texts[i]} {marks}"
+    # Whitespace noise the cleaner has to collapse
+    for i in np.flatnonzero(rng.random(n) < 0.05):
+        texts[i] = f"  {texts[i]}\n ".replace(" ", "  ", 1)
+    return texts
+
+
+def make_reviews(n: int, seed: int = 0, duplicate_rate: float = 0.05, emoji_rate: float = 0.10,
+                 amharic_rate: float = 0.15, blank_rate: float = 0.01,
+                 start: str = "2023-01-01", days: int = 730) -> pd.DataFrame:
+    """
+    Raw scraped reviews: [review_id, review_text, rating, review_date, user_name, source, bank].
+
+    Args:
+        n: Rows to generate.
+        seed: Random seed; equal seeds give equal frames.
+        duplicate_rate: Share of rows that repeat an earlier review (same text and date), as
+            overlapping scrapes do.
+        emoji_rate: Share of reviews carrying emoji (a fifth of those are emoji-only).
+        amharic_rate: Share of reviews in Amharic or mixed Amharic/English.
+        blank_rate: Share of empty or missing texts and unparseable dates.
+    """
+    rng = np.random.default_rng(seed)
+    texts = np.asarray(_texts(rng, n, emoji_rate, amharic_rate), dtype=object)
+    blanks = rng.random(n) < blank_rate
+    texts[blanks] = rng.choice(np.asarray(["", None, "   "], dtype=object), size=int(blanks.sum()))
+
+    stamps = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days * 86400, size=n), unit="s")
+    formats = _draw(rng, [(f, w) for f, w in DATE_FORMATS], n)
+    dates = np.empty(n, dtype=object)
+    for fmt in {f for f, _ in DATE_FORMATS}:
+        rows = formats == fmt
+        dates[rows] = stamps[rows].strftime(fmt)
+    missing = rng.random(n) < blank_rate
+    dates[missing] = rng.choice(np.asarray([None, "not a date"], dtype=object), size=int(missing.sum()))
+
+    df = pd.DataFrame({
+        "review_id": [f"gp:{seed}:{i:08d}" for i in range(n)],
+        "review_text": texts,
+        "rating": _draw(rng, RATINGS, n),
+        "review_date": dates,
+        "user_name": [f"User {u}" for u in rng.integers(0, max(n // 3, 1), size=n)],
+        "source": "google_play",
+        "bank": _draw(rng, [(b, 1) for b in BANKS], n),
+    })
+
+    # Re-scraped rows: copies of earlier reviews with a fresh review_id
+    dupes = np.flatnonzero(rng.random(n) < duplicate_rate)
+    dupes = dupes[dupes > 0]
+    originals = (rng.random(len(dupes)) * dupes).astype(int)
+    cols = ["review_text", "rating", "review_date", "user_name", "bank"]
+    df.loc[dupes, cols] = df.loc[originals, cols].to_numpy()
+    return df
+
+
+def with_scores(df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """
+    Cleaned reviews plus stand-in model outputs (sentiment_label, sentiment_score,
+    identified_theme), so DB and dashboard stages run without the models.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(df)
+    labels = np.asarray(["POSITIVE", "NEGATIVE", "NEUTRAL"], dtype=object)
+    # Follow the rating so aggregates look plausible
+    rating = pd.to_numeric(df["rating"], errors="coerce").fillna(3).to_numpy()
+    label_ids = np.where(rating >= 4, 0, np.where(rating <= 2, 1, 2))
+    flip = rng.random(n) < 0.15
+    label_ids[flip] = rng.integers(0, 3, size=int(flip.sum()))
+    theme_ids = rng.integers(0, len(WORDS), size=(n, 3))
+    return df.assign(
+        sentiment_label=labels[label_ids],
+        sentiment_score=np.round(rng.uniform(0.5, 1.0, size=n), 4),
+        identified_theme=[[WORDS[i] for i in row] for row in theme_ids],
+    )
@@ -0,0 +1,217 @@
+"""
+End-to-end benchmark suite over the seeded synthetic corpus (benchmarks/corpus.py):
+seconds and rows/sec per pipeline stage at each scale, written to JSON so runs
+can be compared.
+
+Stages:
+    clean       clean_reviews on the raw scraped frame
+    sentiment   predict_sentiment with an instant stub model (routing, preprocessing,
+                dedup and batching overhead; not model speed)
+    themes      extract_themes_per_review (skipped when spaCy / en_core_web_sm is missing)
+    insert      insert_reviews into a throwaway SQLite database, rollups included
+    dashboard   get_rollups plus the dashboard's aggregate_rollups, the offline
+                rollup_frame fallback and the trend table
+
+    python benchmarks/run_suite.py --scales 1000 100000 1000000 --out results/baseline.json
+    python benchmarks/run_suite.py --scales 100000 --stages clean sentiment --compare results/baseline.json
+"""
+import argparse
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine
+
+from corpus import make_reviews, with_scores
+from src.analysis import sentiment, trends
+from src.db import postgres
+from src.preprocessing.clean import clean_reviews
+
+STAGES = ["clean", "sentiment", "themes", "insert", "dashboard"]
+SCALES = [1_000, 100_000, 1_000_000]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class StubClassifier:
+    """Pipeline-compatible model that answers instantly, so only our own overhead is measured."""
+
+    tokenizer = None
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        return [{"label": "positive" if len(t) % 2 else "negative", "score": 0.9} for t in batch]
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _dashboard_module():
+    """Import the dashboard's aggregation helpers; the script runs once in bare mode against mocks."""
+    import streamlit  # noqa: F401  (registers its loggers)
+    from bench_dashboard_render import mock_postgres
+
+    # Bare mode warns about the missing script context on every widget
+    for name, logger in logging.Logger.manager.loggerDict.items():
+        if name.startswith("streamlit") and isinstance(logger, logging.Logger):
+            logger.setLevel(logging.ERROR)
+
+    saved = {name: getattr(postgres, name) for name in
+             ("get_bank_names", "get_kpis", "get_rollups", "get_recent_reviews")}
+    mock_postgres(0.0, days=7)
+    try:
+        import src.dashboard.app as app
+    finally:
+        for name, fn in saved.items():
+            setattr(postgres, name, fn)
+    return app
+
+
+def run_scale(rows: int, stages, seed: int, db_dir: Path, app=None) -> list:
+    raw = make_reviews(rows, seed=seed)
+    state = {}
+    results = []
+
+    def clean():
+        state["clean"] = clean_reviews(raw)
+        return len(raw)
+
+    def sentiment_stage():
+        texts = state["clean"]["review_text"].tolist()
+        sentiment._classifier = StubClassifier()
+        sentiment.predict_sentiment(texts, batch_size=32)
+        return len(texts)
+
+    def themes():
+        from src.analysis import thematic
+        texts = state["clean"]["review_text"].tolist()
+        thematic.get_nlp()  # load outside the timed region
+        start = time.perf_counter()
+        thematic.extract_themes_per_review(texts)
+        return len(texts), time.perf_counter() - start
+
+    def insert():
+        scored = with_scores(state["clean"], seed=seed)
+        postgres._engine = create_engine(f"sqlite:///{db_dir / f'suite-{rows}.db'}")
+        postgres.create_schema()
+        for bank, part in scored.groupby("bank", observed=True):
+            postgres.insert_reviews(part, str(bank))
+        return len(scored)
+
+    def dashboard():
+        rollups = postgres.get_rollups()
+        banks = sorted(rollups["daily"]["bank"].unique())
+        app.aggregate_rollups(rollups, banks)
+        trends.trend_table(trends.daily_series(rollups["daily"]), freq="W")
+        fallback = with_scores(state["clean"], seed=seed).rename(columns={"identified_theme": "themes"})
+        app.aggregate_rollups(app.rollup_frame(fallback.assign(std_score=fallback["sentiment_score"])), banks)
+        return len(state["clean"])
+
+    steps = {"clean": clean, "sentiment": sentiment_stage, "themes": themes, "insert": insert, "dashboard": dashboard}
+    # Later stages consume the cleaned frame / loaded DB, so run their prerequisites untimed
+    needed = {"clean"} | set(stages)
+    if "dashboard" in stages:
+        needed.add("insert")
+    for name in STAGES:
+        if name not in needed:
+            continue
+        record = {"stage": name, "rows": rows}
+        start = time.perf_counter()
+        try:
+            done = steps[name]()
+            seconds = time.perf_counter() - start
+            if isinstance(done, tuple):
+                done, seconds = done
+            record.update(status="ok", items=done, seconds=round(seconds, 4),
+                          rows_per_sec=round(done / seconds, 1) if seconds else None)
+        except ImportError as e:
+            record.update(status="skipped", reason=str(e))
+        except OSError as e:
+            # e.g. the spaCy model package is not installed
+            record.update(status="skipped", reason=str(e))
+        record["max_rss_mb"] = round(_max_rss_mb(), 1)
+        if name in stages:
+            results.append(record)
+            shown = (f"{record['seconds']:>9.3f} | {record['rows_per_sec']:>11.0f}" if record["status"] == "ok"
+                     else f"skipped: {record['reason']}")
+            print(f"{name:<10} | {rows:>9} | {shown}", flush=True)
+    if postgres._engine is not None:
+        postgres._engine.dispose()
+        postgres._engine = None
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: Path):
+    """Print the speedup (baseline seconds / current seconds) per stage and scale."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    before = {(r["stage"], r["rows"]): r for r in baseline["results"] if r["status"] == "ok"}
+    print(f"\nvs. {baseline_path} ({baseline['meta']['commit']}):")
+    print(f"{'stage':<10} | {'rows':>9} | {'before s':>9} | {'after s':>9} | {'speedup':>7}")
+    for r in current["results"]:
+        old = before.get((r["stage"], r["rows"]))
+        if r["status"] != "ok" or old is None:
+            continue
+        print(f"{r['stage']:<10} | {r['rows']:>9} | {old['seconds']:>9.3f} | {r['seconds']:>9.3f} | "
+              f"{old['seconds'] / r['seconds']:>6.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, help="Results file (default: benchmarks/results/suite-<timestamp>.json)")
+    ap.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = ap.parse_args()
+    sentiment.logger.setLevel("WARNING")
+
+    started = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "started": started.isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "scales": args.scales,
+            "stages": args.stages,
+        },
+        "results": [],
+    }
+    print(f"{'stage':<10} | {'rows':>9} | {'seconds':>9} | {'rows/sec':>11}")
+    # Imported up front so the one-off script run is not timed as part of the first scale
+    app = _dashboard_module() if "dashboard" in args.stages else None
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.scales:
+            report["results"] += run_scale(rows, args.stages, args.seed, Path(tmp), app)
+
+    out = args.out or RESULTS_DIR / f"suite-{started:%Y%m%dT%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
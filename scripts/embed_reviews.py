@@ -0,0 +1,24 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.analysis.embeddings import EmbeddingStore, embed_new_reviews, similar_reviews
+from src.db import postgres
+
+parser = argparse.ArgumentParser(description="Embed new reviews and/or find reviews similar to a complaint.")
+parser.add_argument("--similar", help="Free-text complaint to search for")
+parser.add_argument("-k", type=int, default=10, help="Number of similar reviews to show")
+parser.add_argument("--skip-update", action="store_true", help="Search without embedding new reviews first")
+args = parser.parse_args()
+
+store = EmbeddingStore()
+if not args.skip_update:
+    embed_new_reviews(store)
+if args.similar:
+    hits = similar_reviews(args.similar, k=args.k, store=store)
+    reviews = postgres.get_reviews_by_ids(hits["review_id"].tolist())
+    print(hits.merge(reviews, on="review_id").to_string(index=False))
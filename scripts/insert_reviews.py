@@ -9,6 +9,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.db import postgres
+from src.storage import columnar
 
 
 DATA_DIR = PROJECT_ROOT / 'data' / 'output'
@@ -48,4 +49,15 @@ for file in DATA_DIR.glob('*_themes.csv'):
     except Exception as e:
         print(f"❌ Failed to process {file.name}: {e}")
 
+# Parquet output dataset: dtypes and theme lists are stored natively, so no parsing is needed
+if columnar.exists('output'):
+    banks = columnar.read_table('output', columns=['bank']).column('bank').unique().to_pylist()
+    for bank_name in banks:
+        print(f"➡️ Processing Parquet partition: bank={bank_name}")
+        try:
+            df = columnar.read_reviews('output', banks=[bank_name])
+            postgres.insert_reviews(df, bank_name=bank_name)
+        except Exception as e:
+            print(f"❌ Failed to process bank={bank_name}: {e}")
+
 print("✅ All CSV files processed and inserted successfully.")
@@ -0,0 +1,18 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.db import postgres
+
+parser = argparse.ArgumentParser(
+    description="Backfill content_hash for reviews loaded before it existed and delete the duplicates it reveals."
+)
+parser.add_argument("--dry-run", action="store_true", help="Only report how many reviews would change")
+args = parser.parse_args()
+
+postgres.create_schema()
+postgres.migrate_content_hashes(dry_run=args.dry_run)
@@ -0,0 +1,30 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import instrumentation
+from src.config import config
+from src.pipeline.rescore import rescore_stale
+
+parser = argparse.ArgumentParser(description="Re-score reviews whose sentiment/theme version is out of date.")
+parser.add_argument("--skip-sentiment", action="store_true", help="Leave sentiment scores alone")
+parser.add_argument("--skip-themes", action="store_true", help="Leave theme lists alone")
+parser.add_argument("--chunksize", type=int, default=config.PIPELINE_CHUNKSIZE)
+parser.add_argument("--limit", type=int, help="Stop after this many reviews (rerun to continue)")
+parser.add_argument("--metrics-out", default=config.METRICS_PATH, help="Metrics snapshot (.json or Prometheus text)")
+parser.add_argument("--profile", help="Write cProfile stats for the run to this file")
+args = parser.parse_args()
+
+with instrumentation.profiled(args.profile):
+    report = rescore_stale(
+        sentiment=not args.skip_sentiment,
+        themes=not args.skip_themes,
+        chunksize=args.chunksize,
+        limit=args.limit,
+    )
+print(report.summary())
+print(f"Metrics written to {instrumentation.export(args.metrics_out)}")
@@ -0,0 +1,32 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import instrumentation
+from src.config import config
+from src.pipeline.runner import iter_raw_chunks, run_pipeline
+
+parser = argparse.ArgumentParser(description="Stream raw reviews through clean → sentiment → themes → load.")
+parser.add_argument("--banks", nargs="+", help="Banks to process (default: all with a raw file)")
+parser.add_argument("--chunksize", type=int, default=config.PIPELINE_CHUNKSIZE)
+parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+parser.add_argument("--reset", action="store_true", help="Ignore and overwrite the existing checkpoint")
+parser.add_argument("--metrics-out", default=config.METRICS_PATH, help="Metrics snapshot (.json or Prometheus text)")
+parser.add_argument("--profile", help="Write cProfile stats for the run to this file")
+args = parser.parse_args()
+
+if args.reset and config.PIPELINE_CHECKPOINT.exists():
+    config.PIPELINE_CHECKPOINT.unlink()
+
+with instrumentation.profiled(args.profile):
+    report = run_pipeline(
+        iter_raw_chunks(args.banks, args.chunksize),
+        mode=args.mode,
+        checkpoint_path=config.PIPELINE_CHECKPOINT,
+    )
+print(report.summary())
+print(f"Metrics written to {instrumentation.export(args.metrics_out)}")
@@ -0,0 +1,6 @@
+def warmup():
+    """Load the sentiment and spaCy models up front, e.g. before serving traffic."""
+    from src.analysis import sentiment, thematic
+
+    sentiment.warmup()
+    thematic.warmup()
@@ -0,0 +1,308 @@
+"""
+Review Embeddings & Similarity Index
+------------------------------------
+Encodes reviews with the sentence-transformers model in
+config.SENTIMENT_MODEL_NAME and stores L2-normalized float16 vectors in a
+memory-mapped file keyed by review_id, so cosine similarity is a dot product.
+
+Search is exact (blocked matrix-vector scan) for small stores. Once the store
+reaches EMBEDDING_IVF_MIN_ROWS vectors, an IVF index (spherical k-means
+centroids plus one inverted list per centroid) is trained and only the
+`nprobe` closest lists are scanned. New vectors are appended and assigned to
+their nearest centroid, so indexing stays incremental; the centroids are
+retrained when the store has grown 4x since training. The same k-means
+drives embedding-based theme clustering.
+"""
+
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+import json
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+# Rows scored per block in an exact scan, bounding the float32 working set
+_SCAN_BLOCK = 65536
+# Retrain the IVF centroids once the store has grown by this factor
+_RETRAIN_GROWTH = 4
+
+
+# --------------------------------------------------
+# ENCODING
+# --------------------------------------------------
+def get_encoder():
+    """Return the sentence-transformers encoder, loading it on first use (thread-safe)."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from sentence_transformers import SentenceTransformer
+                _encoder = SentenceTransformer(config.SENTIMENT_MODEL_NAME)
+    return _encoder
+
+
+def encode(texts: Sequence[str], batch_size: int = None) -> np.ndarray:
+    """L2-normalized float16 embeddings, one row per text."""
+    vectors = get_encoder().encode(
+        [t if isinstance(t, str) else "" for t in texts],
+        batch_size=batch_size or config.EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    )
+    return np.asarray(vectors, dtype=np.float16)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.atleast_2d(np.asarray(x, dtype=np.float32))
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+def spherical_kmeans(X: np.ndarray, k: int, n_iter: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids (k x dim) maximising cosine similarity to their members."""
+    rng = np.random.default_rng(seed)
+    X = _normalize(X)
+    k = min(k, len(X))
+    centroids = X[rng.choice(len(X), size=k, replace=False)]
+    for _ in range(n_iter):
+        labels = np.argmax(X @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, X)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        # Re-seed empty clusters from random points instead of letting them die
+        sums[empty] = X[rng.choice(len(X), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+# --------------------------------------------------
+# STORE + INDEX
+# --------------------------------------------------
+class EmbeddingStore:
+    """
+    Append-only vector store on disk:
+    vectors.f16 (rows x dim float16, memory-mapped), ids.npy (review_id per row),
+    and, once trained, centroids.npy / lists.npy (IVF centroid id per row).
+
+    vectors.f16 is appended before the other files are replaced atomically, so
+    ids.npy is the commit point: rows past len(ids) left by an interrupted add are
+    truncated on open.
+
+    Args:
+        path: Store directory; defaults to config.EMBEDDINGS_DIR.
+        ivf_min_rows (int): Train the IVF index once the store holds this many vectors.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ivf_min_rows: int = None):
+        self.path = Path(path or config.EMBEDDINGS_DIR)
+        self.ivf_min_rows = config.EMBEDDING_IVF_MIN_ROWS if ivf_min_rows is None else ivf_min_rows
+        self._lock = threading.Lock()
+        meta_path = self.path / "meta.json"
+        self.meta = json.loads(meta_path.read_text()) if meta_path.exists() else {"dim": None, "trained_rows": 0}
+        self.ids = np.load(self.path / "ids.npy") if (self.path / "ids.npy").exists() else np.zeros(0, np.int64)
+        self.centroids = np.load(self.path / "centroids.npy") if (self.path / "centroids.npy").exists() else None
+        self.lists = np.load(self.path / "lists.npy") if (self.path / "lists.npy").exists() else None
+        self._vectors = None
+        self._inverted = None
+        self._recover()
+
+    def _recover(self):
+        """Drop what an interrupted add left behind: vector rows past ids.npy, stale IVF lists."""
+        vectors_path = self.path / "vectors.f16"
+        if vectors_path.exists():
+            size = len(self) * (self.dim or 0) * np.dtype(np.float16).itemsize
+            if vectors_path.stat().st_size > size:
+                logger.warning(f"⚠️ Truncating {vectors_path} to the {len(self)} vectors listed in ids.npy")
+                with open(vectors_path, "r+b") as f:
+                    f.truncate(size)
+        if self.lists is not None and len(self.lists) != len(self):
+            # Exact scans until the index is retrained on the next add
+            logger.warning("⚠️ IVF lists do not match the stored vectors; dropping the index")
+            self.centroids = self.lists = None
+            self.meta["trained_rows"] = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.meta["dim"]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only memory map of all stored vectors (rows x dim float16)."""
+        if self._vectors is None or len(self._vectors) != len(self):
+            if not len(self):
+                return np.zeros((0, self.dim or 0), dtype=np.float16)
+            self._vectors = np.memmap(self.path / "vectors.f16", dtype=np.float16, mode="r",
+                                      shape=(len(self), self.dim))
+        return self._vectors
+
+    @property
+    def last_id(self) -> int:
+        return int(self.ids.max()) if len(self) else 0
+
+    def _replace(self, name: str, write):
+        """Write a store file through a temporary file and os.replace, so readers never see half of it."""
+        tmp = self.path / f"{name}.tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path / name)
+
+    def _save(self):
+        # meta.json first: a crash before ids.npy is replaced leaves the extra vectors uncommitted
+        self._replace("meta.json", lambda f: f.write(json.dumps(self.meta).encode()))
+        if self.centroids is not None:
+            self._replace("centroids.npy", lambda f: np.save(f, self.centroids))
+            self._replace("lists.npy", lambda f: np.save(f, self.lists))
+        self._replace("ids.npy", lambda f: np.save(f, self.ids))
+
+    def add(self, review_ids: Sequence[int], vectors: np.ndarray) -> int:
+        """Append vectors for review ids not stored yet and index them. Returns how many were added."""
+        review_ids = np.asarray(review_ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float16)
+        if len(review_ids) != len(vectors):
+            raise ValueError(f"Got {len(vectors)} vectors for {len(review_ids)} review ids")
+        with self._lock:
+            keep = ~np.isin(review_ids, self.ids)
+            _, first = np.unique(review_ids, return_index=True)
+            keep &= np.isin(np.arange(len(review_ids)), first)
+            review_ids, vectors = review_ids[keep], vectors[keep]
+            if not len(review_ids):
+                return 0
+            if self.dim is None:
+                self.meta["dim"] = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Store holds {self.dim}-d vectors, got {vectors.shape[1]}-d")
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / "vectors.f16", "ab") as f:
+                # Cut off rows of an earlier add that failed before ids.npy was saved
+                f.truncate(len(self) * self.dim * vectors.itemsize)
+                f.write(np.ascontiguousarray(vectors).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self.ids = np.concatenate([self.ids, review_ids])
+            self._vectors = None
+
+            if self.centroids is not None and len(self) < _RETRAIN_GROWTH * self.meta["trained_rows"]:
+                new_lists = np.argmax(_normalize(vectors) @ self.centroids.T, axis=1)
+                self.lists = np.concatenate([self.lists, new_lists])
+                self._inverted = None
+            elif len(self) >= self.ivf_min_rows:
+                self._train()
+            self._save()
+        return len(review_ids)
+
+    def _fit_centroids(self, k: int, n_iter: int, seed: int) -> np.ndarray:
+        """k-means on a sample of at most 64 vectors per centroid, which is plenty to place them."""
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(len(self), size=min(len(self), 64 * k), replace=False))
+        return spherical_kmeans(self.vectors[sample], k, n_iter=n_iter, seed=seed)
+
+    def _train(self, nlist: Optional[int] = None, n_iter: int = 10, seed: int = 0):
+        n = len(self)
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        self.centroids = self._fit_centroids(nlist, n_iter, seed)
+        self.lists = self._assign(self.centroids)
+        self.meta["trained_rows"] = n
+        self._inverted = None
+        logger.info(f"✅ Trained IVF index with {len(self.centroids)} lists over {n} vectors")
+
+    def train_index(self, nlist: Optional[int] = None, n_iter: int = 10, seed: int = 0):
+        """(Re)train the IVF centroids over the whole store and re-assign every vector."""
+        with self._lock:
+            self._train(nlist, n_iter, seed)
+            self._save()
+
+    def _assign(self, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid for every stored vector, scanned block by block."""
+        vectors = self.vectors
+        return np.concatenate([
+            np.argmax(vectors[start:start + _SCAN_BLOCK].astype(np.float32) @ centroids.T, axis=1)
+            for start in range(0, len(vectors), _SCAN_BLOCK)
+        ]) if len(vectors) else np.zeros(0, np.int64)
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row positions grouped by list, plus the offset of each list in that array."""
+        if self._inverted is None:
+            order = np.argsort(self.lists, kind="stable")
+            offsets = np.searchsorted(self.lists[order], np.arange(len(self.centroids) + 1))
+            self._inverted = (order, offsets)
+        return self._inverted
+
+    def _candidates(self, query: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        """Row positions in the `nprobe` lists closest to the query; None means scan everything."""
+        if self.centroids is None or nprobe >= len(self.centroids):
+            return None
+        order, offsets = self._inverted_lists()
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe]))
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = None) -> pd.DataFrame:
+        """The k stored reviews most similar to a query vector: [review_id, score], best first."""
+        query = _normalize(query)[0]
+        positions = self._candidates(query, nprobe or config.EMBEDDING_NPROBE)
+        if positions is None:
+            positions = np.arange(len(self))
+        best_pos, best_scores = np.zeros(0, np.int64), np.zeros(0, np.float32)
+        for start in range(0, len(positions), _SCAN_BLOCK):
+            block = positions[start:start + _SCAN_BLOCK]
+            scores = self.vectors[block].astype(np.float32) @ query
+            best_pos = np.concatenate([best_pos, block])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > k:
+                top = np.argpartition(-best_scores, k - 1)[:k]
+                best_pos, best_scores = best_pos[top], best_scores[top]
+        order = np.argsort(-best_scores, kind="stable")
+        return pd.DataFrame({"review_id": self.ids[best_pos[order]], "score": best_scores[order]})
+
+    def cluster(self, k: int, n_iter: int = 10, seed: int = 0) -> pd.DataFrame:
+        """Spherical k-means over all stored vectors: [review_id, cluster]."""
+        centroids = self._fit_centroids(k, n_iter, seed)
+        return pd.DataFrame({"review_id": self.ids, "cluster": self._assign(centroids)})
+
+
+# --------------------------------------------------
+# JOBS
+# --------------------------------------------------
+def embed_new_reviews(store: Optional[EmbeddingStore] = None, chunksize: int = None,
+                      batch_size: int = None) -> int:
+    """Encode reviews inserted since the last run (review_id above the store's highest) and index them."""
+    from src.db import postgres
+
+    store = store if store is not None else EmbeddingStore()
+    chunksize = chunksize or config.PIPELINE_CHUNKSIZE
+    added = 0
+    while True:
+        df = postgres.get_reviews_after(store.last_id, chunksize)
+        if df.empty:
+            break
+        added += store.add(df["review_id"].to_numpy(), encode(df["review_text"].tolist(), batch_size))
+    logger.info(f"✅ Embedded {added} new reviews ({len(store)} total)")
+    return added
+
+
+def similar_reviews(text: str, k: int = 10, store: Optional[EmbeddingStore] = None,
+                    nprobe: int = None) -> pd.DataFrame:
+    """Reviews most similar to a free-text complaint: [review_id, score], best first."""
+    store = store if store is not None else EmbeddingStore()
+    return store.search(encode([text])[0], k=k, nprobe=nprobe)
+
+
+def cluster_themes(k: int, store: Optional[EmbeddingStore] = None, seed: int = 0) -> pd.DataFrame:
+    """Embedding-based theme clusters: [review_id, cluster], one row per stored review."""
+    store = store if store is not None else EmbeddingStore()
+    return store.cluster(k, seed=seed)
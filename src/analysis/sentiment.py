@@ -3,14 +3,27 @@ Sentiment Analysis Module (Multilingual + Emoji-Aware)
 ------------------------------------------------------
 Handles Amharic, English, and emoji-rich reviews using
 cardiffnlp/twitter-xlm-roberta-base-sentiment.
-Supports offline fallback and CI-safe execution.
+Supports offline fallback and CI-safe execution, pluggable CPU
+backends (HF pipeline, int8-quantized torch, ONNX Runtime) and a
+process pool for many-core scoring. A one-pass script/emoji router
+answers emoji and letterless texts from the lexicon and can send
+Latin-script reviews to a cheaper English-only model.
 """
 
-from typing import List, Tuple
-from transformers import pipeline
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 import logging
+import multiprocessing
 import os
+import re
+import threading
 import emoji
+import numpy as np
+
+from src import instrumentation
+from src.analysis.sentiment_cache import SentimentCache, open_default_cache
+from src.config import config
 
 # --------------------------------------------------
 # LOGGER CONFIG
@@ -19,27 +32,225 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --------------------------------------------------
-# MODEL LOADING (CI-SAFE)
+# MODEL LOADING (LAZY + CI-SAFE)
 # --------------------------------------------------
 MODEL_NAME = "cardiffnlp/twitter-xlm-roberta-base-sentiment"
+# Optional English-only model for Latin-script reviews; empty = the multilingual model scores them too
+ENGLISH_MODEL_NAME = os.getenv("SENTIMENT_ENGLISH_MODEL", "")
+# Stored with each prediction; bump it whenever scores would change so old rows get re-scored
+# (@2: script routing; letterless texts score NEUTRAL, emoji-only texts may go to the English model)
+_BASE_VERSION = os.getenv("SENTIMENT_MODEL_VERSION", f"{MODEL_NAME}@2")
+MODEL_VERSION = f"{_BASE_VERSION}+en:{ENGLISH_MODEL_NAME}" if ENGLISH_MODEL_NAME else _BASE_VERSION
 _classifier = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+_english_classifier = None
+_english_loaded = False
+_english_lock = threading.Lock()
+_cache: Optional[SentimentCache] = None
+_cache_lock = threading.Lock()
 
 # Disable model loading in CI for faster, offline testing
 DISABLE_MODEL = os.getenv("CI", "false").lower() == "true"
 
-if not DISABLE_MODEL:
-    try:
-        _classifier = pipeline("sentiment-analysis", model=MODEL_NAME, tokenizer=MODEL_NAME)
-        logger.info(f"✅ Multilingual sentiment model '{MODEL_NAME}' loaded successfully.")
-    except Exception as e:
-        logger.error(f"❌ Failed to load multilingual model: {e}")
-        _classifier = None
-else:
-    logger.warning("⚠️ Running in CI mode — skipping model load.")
+# Inference backend: "hf" (transformers pipeline), "quantized" (dynamic int8 torch) or "onnx"
+BACKEND = os.getenv("SENTIMENT_BACKEND", "hf")
+# Intra-op threads per model instance (0 = library default)
+NUM_THREADS = int(os.getenv("SENTIMENT_NUM_THREADS", "0"))
+# Worker processes for scoring (0 or 1 = score in this process)
+WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+
+
+def _set_torch_threads(num_threads: int):
+    if num_threads:
+        import torch
+        torch.set_num_threads(num_threads)
+
+
+def _load_hf(model_name: str, num_threads: int = 0):
+    """The plain transformers pipeline (fp32 torch)."""
+    # transformers pulls in torch, so it is only imported when the model is needed
+    from transformers import pipeline
+    _set_torch_threads(num_threads)
+    return pipeline("sentiment-analysis", model=model_name, tokenizer=model_name)
+
+
+def _load_quantized(model_name: str, num_threads: int = 0):
+    """The same pipeline with every nn.Linear dynamically quantized to int8."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    _set_torch_threads(num_threads)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("sentiment-analysis", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+
+def onnx_model_path(model_name: str) -> Path:
+    return Path(config.MODELS_DIR) / "onnx" / f"{model_name.replace('/', '__')}.onnx"
+
+
+def export_onnx(model_name: str, path: Optional[Path] = None) -> Path:
+    """Export the classifier to ONNX (once) with dynamic batch and sequence axes."""
+    path = Path(path or onnx_model_path(model_name))
+    if path.exists():
+        return path
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    axes = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        model, (sample["input_ids"], sample["attention_mask"]), str(path),
+        input_names=["input_ids", "attention_mask"], output_names=["logits"],
+        dynamic_axes={"input_ids": axes, "attention_mask": axes, "logits": {0: "batch"}},
+        opset_version=17,
+    )
+    logger.info(f"✅ Exported '{model_name}' to ONNX at {path}")
+    return path
+
+
+class OnnxClassifier:
+    """
+    ONNX Runtime session behind the transformers pipeline call signature, so the
+    batching code treats it like any other classifier.
+    """
+
+    def __init__(self, model_path: Path, tokenizer, id2label: Dict[int, str], num_threads: int = 0):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = tokenizer
+        self.id2label = id2label
+
+    def __call__(self, inputs, batch_size: Optional[int] = None, truncation: bool = True,
+                 max_length: int = 512, **kwargs) -> List[dict]:
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        step = batch_size or len(batch)
+        preds = []
+        for start in range(0, len(batch), step):
+            encoded = self.tokenizer(batch[start:start + step], padding=True, truncation=truncation,
+                                     max_length=max_length, return_tensors="np")
+            feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+            logits = self.session.run(None, feeds)[0]
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            for row in probs:
+                best = int(row.argmax())
+                preds.append({"label": self.id2label[best], "score": float(row[best])})
+        return preds
+
+
+def _load_onnx(model_name: str, num_threads: int = 0):
+    """ONNX Runtime on CPU, exporting the model on first use."""
+    from transformers import AutoConfig, AutoTokenizer
+    model_config = AutoConfig.from_pretrained(model_name)
+    return OnnxClassifier(export_onnx(model_name), AutoTokenizer.from_pretrained(model_name),
+                          model_config.id2label, num_threads)
+
+
+BACKENDS: Dict[str, Callable[[str, int], object]] = {
+    "hf": _load_hf,
+    "quantized": _load_quantized,
+    "onnx": _load_onnx,
+}
+
+
+def load_backend(name: str = None, model_name: str = None, num_threads: int = None):
+    """
+    Build a classifier for the named backend. All backends take a list of texts
+    (plus batch_size/truncation/max_length) and return [{"label", "score"}, ...].
+    """
+    name = name or BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](model_name or MODEL_NAME, NUM_THREADS if num_threads is None else num_threads)
+
+
+def get_classifier():
+    """
+    Return the classifier for the configured backend, loading it on first use.
+    Thread-safe; returns None in CI mode or when the model cannot be loaded.
+    """
+    global _classifier, _classifier_loaded
+    if _classifier is not None or _classifier_loaded:
+        return _classifier
+    with _classifier_lock:
+        if _classifier_loaded:
+            return _classifier
+        if DISABLE_MODEL:
+            logger.warning("⚠️ Running in CI mode — skipping model load.")
+        else:
+            try:
+                _classifier = load_backend()
+                logger.info(f"✅ Multilingual sentiment model '{MODEL_NAME}' loaded successfully ({BACKEND} backend).")
+            except Exception as e:
+                logger.error(f"❌ Failed to load multilingual model: {e}")
+                _classifier = None
+        _classifier_loaded = True
+    return _classifier
+
+
+def get_english_classifier():
+    """
+    Classifier for the English route: ENGLISH_MODEL_NAME on the configured backend,
+    or the multilingual classifier when none is configured or it cannot be loaded.
+    """
+    global _english_classifier, _english_loaded
+    if not ENGLISH_MODEL_NAME or DISABLE_MODEL:
+        return get_classifier()
+    if not _english_loaded:
+        with _english_lock:
+            if not _english_loaded:
+                try:
+                    _english_classifier = load_backend(model_name=ENGLISH_MODEL_NAME)
+                    logger.info(f"✅ English sentiment model '{ENGLISH_MODEL_NAME}' loaded successfully.")
+                except Exception as e:
+                    logger.error(f"❌ Failed to load English model, using the multilingual one: {e}")
+                    _english_classifier = None
+                _english_loaded = True
+    return _english_classifier or get_classifier()
+
+
+def current_model_version() -> Optional[str]:
+    """MODEL_VERSION, or None when predictions are neutral fallbacks (CI mode or a failed model load)."""
+    if DISABLE_MODEL or (_classifier_loaded and _classifier is None):
+        return None
+    if ENGLISH_MODEL_NAME and _english_loaded and _english_classifier is None:
+        # English reviews fell back to the multilingual model
+        return _BASE_VERSION
+    return MODEL_VERSION
+
+
+def get_cache() -> Optional[SentimentCache]:
+    """
+    The persistent prediction cache for the configured model, backend and version,
+    opened on first use; None when SENTIMENT_CACHE_ENABLED is off.
+    """
+    global _cache
+    if not config.SENTIMENT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = open_default_cache(MODEL_NAME, backend=BACKEND, model_version=MODEL_VERSION)
+    return _cache
+
+
+def warmup() -> bool:
+    """Load the sentiment model ahead of the first request. Returns True if it is available."""
+    return get_classifier() is not None
 
 # --------------------------------------------------
 # EMOJI SENTIMENT MAP
 # --------------------------------------------------
+NEUTRAL_FALLBACK = ("NEUTRAL", 0.5)
 EMOJI_MAP = {
     "👍": ("POSITIVE", 0.95),
     "😀": ("POSITIVE", 0.9),
@@ -53,6 +264,61 @@ EMOJI_MAP = {
     "😞": ("NEGATIVE", 0.88),
 }
 
+# --------------------------------------------------
+# LANGUAGE ROUTING
+# --------------------------------------------------
+ROUTE_LEXICON = "lexicon"
+ROUTE_ENGLISH = "english"
+ROUTE_MULTILINGUAL = "multilingual"
+ROUTES = (ROUTE_LEXICON, ROUTE_ENGLISH, ROUTE_MULTILINGUAL)
+# Route texts by script; disable to score every non-emoji text with the multilingual model
+ROUTING = os.getenv("SENTIMENT_ROUTING", "true").lower() == "true"
+
+# One alternation classifies a whole review in a single left-to-right scan.
+# Letters are matched in runs (one match per word); pictographs one at a time so
+# a mapped emoji right after an unmapped one is still seen.
+_SCRIPT_RE = re.compile(
+    "(?P<emoji>" + "|".join(map(re.escape, EMOJI_MAP)) + ")"
+    "|(?P<geez>[\u1200-\u139F\u2D80-\u2DDF\uAB00-\uAB2F]+)"
+    "|(?P<latin>[A-Za-z\u00C0-\u024F]+)"
+    "|(?P<symbol>[\u2600-\u27BF\U0001F000-\U0001FAFF])"
+    r"|(?P<other>[^\W\d_]+)"
+)
+_EMOJI_RE = re.compile("|".join(map(re.escape, EMOJI_MAP)))
+
+
+def route_text(text: str) -> Tuple[str, Optional[Tuple[str, float]]]:
+    """
+    Pick the scorer for one review: (route, lexicon result or None).
+
+    - Any mapped emoji -> lexicon, scored by the first one (as before routing).
+    - No letters and no pictographs (blank, digits, punctuation) -> lexicon, neutral.
+    - Ge'ez or any other non-Latin script -> multilingual model.
+    - Latin letters and/or unmapped emoji (demojized to English names) -> English model.
+    """
+    latin = non_latin = False
+    for match in _SCRIPT_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "emoji":
+            return ROUTE_LEXICON, EMOJI_MAP[match.group()]
+        if kind in ("geez", "other"):
+            non_latin = True
+        else:
+            latin = True
+    if non_latin:
+        return ROUTE_MULTILINGUAL, None
+    if latin:
+        return ROUTE_ENGLISH, None
+    return ROUTE_LEXICON, NEUTRAL_FALLBACK
+
+
+def _route_unrouted(text: str) -> Tuple[str, Optional[Tuple[str, float]]]:
+    """Pre-routing behaviour: mapped emoji from the lexicon, everything else to the multilingual model."""
+    match = _EMOJI_RE.search(text)
+    if match:
+        return ROUTE_LEXICON, EMOJI_MAP[match.group()]
+    return ROUTE_MULTILINGUAL, None
+
 # --------------------------------------------------
 # TEXT NORMALIZATION
 # --------------------------------------------------
@@ -70,46 +336,358 @@ def preprocess_text(text: str) -> str:
 # --------------------------------------------------
 # PREDICTION FUNCTION
 # --------------------------------------------------
-def predict_sentiment(texts: List[str]) -> List[Tuple[str, float]]:
+MAX_SEQ_LENGTH = 512
+
+
+def _to_result(pred: dict) -> Tuple[str, float]:
+    """Convert a pipeline prediction dict into a (label, score) tuple."""
+    label = pred["label"].upper().replace("LABEL_", "")
+    score = round(float(pred["score"]), 4)
+    return label, score
+
+
+def _score_one(classifier, processed: str) -> Optional[Tuple[str, float]]:
+    """Score a single preprocessed text with the model; None on failure."""
+    instrumentation.inc('sentiment.model_calls')
+    try:
+        with instrumentation.timer('sentiment.batch'):
+            return _to_result(classifier(processed)[0])
+    except Exception as e:
+        logger.error(f"❌ Model inference failed for text '{processed}': {e}")
+        return None
+
+
+def _token_lengths(classifier, processed: List[str], max_length: int) -> List[int]:
+    """
+    Token count per text, used to bucket similar lengths into the same batch.
+    Falls back to whitespace tokens when the classifier exposes no tokenizer.
+    """
+    tokenizer = getattr(classifier, "tokenizer", None)
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(processed, truncation=True, max_length=max_length)
+            return [len(ids) for ids in encoded["input_ids"]]
+        except Exception as e:
+            logger.warning(f"⚠️ Tokenizer length lookup failed, using word counts: {e}")
+    return [len(p.split()) for p in processed]
+
+
+def _score_batched(
+    classifier, processed: List[str], batch_size: int, max_length: int
+) -> List[Optional[Tuple[str, float]]]:
+    """
+    Score preprocessed texts in length-bucketed batches, returning results in input order.
+    A failing batch is retried text by text so the fallback stays per text.
+    """
+    lengths = _token_lengths(classifier, processed, max_length)
+    order = sorted(range(len(processed)), key=lengths.__getitem__)
+    results: List[Optional[Tuple[str, float]]] = [None] * len(processed)
+
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        batch = [processed[i] for i in idx]
+        instrumentation.inc('sentiment.model_calls')
+        try:
+            with instrumentation.timer('sentiment.batch'):
+                preds = classifier(batch, batch_size=len(batch), truncation=True, max_length=max_length)
+            for i, pred in zip(idx, preds):
+                results[i] = _to_result(pred)
+        except Exception as e:
+            logger.error(f"❌ Batch inference failed for {len(batch)} texts, retrying one by one: {e}")
+            for i in idx:
+                results[i] = _score_one(classifier, processed[i])
+    return results
+
+
+# --------------------------------------------------
+# WORKER POOL (MANY-CORE CPU SCORING)
+# --------------------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[tuple] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(backend: Union[str, Callable], model_name: str, num_threads: int, english_model_name: str = ""):
+    """Load the model(s) once per worker process, pinned to `num_threads` intra-op threads."""
+    global _classifier, _classifier_loaded, _english_classifier, _english_loaded
+    if num_threads:
+        # must be set before torch/onnxruntime create their thread pools
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[var] = str(num_threads)
+    for name in filter(None, (model_name, english_model_name)):
+        try:
+            if callable(backend):
+                loaded = backend(name, num_threads)
+            else:
+                loaded = load_backend(backend, model_name=name, num_threads=num_threads)
+        except Exception as e:
+            logger.error(f"❌ Worker {os.getpid()} failed to load {name} on the {backend} backend: {e}")
+            loaded = None
+        if name == model_name:
+            _classifier = loaded
+        else:
+            _english_classifier = loaded
+    _classifier_loaded = _english_loaded = True
+
+
+def _worker_score(processed: List[str], batch_size: Optional[int], max_length: int,
+                  route: str = ROUTE_MULTILINGUAL) -> List[Optional[Tuple[str, float]]]:
+    classifier = (_english_classifier if route == ROUTE_ENGLISH else None) or _classifier
+    if classifier is None:
+        return [None] * len(processed)
+    if batch_size and batch_size > 1:
+        return _score_batched(classifier, processed, batch_size, max_length)
+    return [_score_one(classifier, t) for t in processed]
+
+
+def get_worker_pool(workers: int, backend: Union[str, Callable] = None, num_threads: int = None) -> ProcessPoolExecutor:
+    """
+    Return a pool of `workers` processes that each hold a loaded model. The pool is
+    reused across calls and rebuilt only when its configuration changes. By default
+    the cores are split evenly so workers do not oversubscribe the CPU.
+    """
+    global _pool, _pool_key
+    backend = backend or BACKEND
+    if num_threads is None:
+        num_threads = NUM_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    key = (workers, backend, MODEL_NAME, ENGLISH_MODEL_NAME, num_threads)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.shutdown()
+            # spawn: forking a process whose torch thread pool is already running can deadlock
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(backend, MODEL_NAME, num_threads, ENGLISH_MODEL_NAME))
+            _pool_key = key
+        return _pool
+
+
+def shutdown_worker_pool():
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_key = None, None
+
+
+def _score_parallel(
+    processed: List[str], workers: int, batch_size: Optional[int], max_length: int,
+    route: str = ROUTE_MULTILINGUAL,
+) -> List[Optional[Tuple[str, float]]]:
+    """Shard texts into contiguous slices, one per worker, and score them in parallel."""
+    pool = get_worker_pool(workers)
+    shard = -(-len(processed) // workers)
+    shards = [processed[i:i + shard] for i in range(0, len(processed), shard)]
+    futures = [pool.submit(_worker_score, part, batch_size, max_length, route) for part in shards]
+    return [res for future in futures for res in future.result()]
+
+
+def _score_route(
+    route: str, model_texts: List[str], classifier, parallel: bool, workers: int,
+    batch_size: Optional[int], max_length: int,
+) -> List[Optional[Tuple[str, float]]]:
+    """Score the unique preprocessed texts of one model route, timed per route."""
+    with instrumentation.timer(f"sentiment.route.{route}"):
+        if parallel:
+            return _score_parallel(model_texts, workers, batch_size, max_length, route)
+        if batch_size and batch_size > 1:
+            return _score_batched(classifier, model_texts, batch_size, max_length)
+        return [_score_one(classifier, t) for t in model_texts]
+
+
+def predict_sentiment(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    max_length: int = MAX_SEQ_LENGTH,
+    cache: Optional[SentimentCache] = None,
+    workers: Optional[int] = None,
+    routing: Optional[bool] = None,
+    failed: Optional[List[int]] = None,
+) -> List[Tuple[str, float]]:
     """
     Predict sentiment for a list of texts using multilingual Roberta model.
     Handles emoji-only texts with manual fallback.
     
     Args:
         texts (List[str]): List of review texts.
+        batch_size (Optional[int]): When set, texts that reach the model are grouped
+            by token length and scored in batches of this size. Defaults to one
+            model call per text.
+        max_length (int): Token limit applied with truncation in batched mode.
+        cache (Optional[SentimentCache]): Prediction cache consulted before the model;
+            only unseen texts are scored and successful scores are stored back.
+            Texts routed to a dedicated English model bypass it.
+        workers (Optional[int]): Score model texts in this many worker processes,
+            each with its own model. Defaults to SENTIMENT_WORKERS; 0 or 1 scores
+            in this process.
+        routing (Optional[bool]): Route texts with route_text (lexicon / English /
+            multilingual). Defaults to SENTIMENT_ROUTING; False keeps the old
+            emoji-or-multilingual split.
+        failed (Optional[List[int]]): When given, the positions of texts that got
+            NEUTRAL_FALLBACK because no model was available or inference failed are
+            appended to it, so callers can avoid stamping them with a model version.
     Returns:
-        List[Tuple[str, float]]: [(label, score), ...]
+        List[Tuple[str, float]]: [(label, score), ...] in the order of `texts`.
     """
-    results = []
+    results: List[Optional[Tuple[str, float]]] = [None] * len(texts)
+    # model route -> preprocessed text -> positions in `texts`
+    pending: Dict[str, Dict[str, List[int]]] = {}
+    workers = WORKERS if workers is None else workers
+    parallel = workers > 1
+    routing = ROUTING if routing is None else routing
+    route_fn = route_text if routing else _route_unrouted
+    # the parent never loads a model of its own when workers do the scoring
+    classifier = (not DISABLE_MODEL) if parallel else get_classifier()
+
+    with instrumentation.timer("sentiment.routing"):
+        for i, text in enumerate(texts):
+            text = str(text).strip()
+            route, lexicon = route_fn(text)
+            instrumentation.inc(f"sentiment.route.{route}")
 
-    for text in texts:
-        text = str(text).strip()
+            # 1️⃣ Lexicon: mapped emoji, or nothing a model could read
+            if lexicon is not None:
+                if _EMOJI_RE.search(text):
+                    instrumentation.inc("sentiment.emoji_shortcircuit")
+                results[i] = lexicon
+                continue
 
-        # 1️⃣ Emoji fallback
-        if any(ch in EMOJI_MAP for ch in text):
-            e = next((EMOJI_MAP[ch] for ch in text if ch in EMOJI_MAP), ("NEUTRAL", 0.5))
-            results.append(e)
+            # 2️⃣ Model-based inference (if available)
+            if classifier:
+                # Without a dedicated English model both routes share one model, so batch them together
+                model_route = route if route == ROUTE_ENGLISH and ENGLISH_MODEL_NAME else ROUTE_MULTILINGUAL
+                # Identical texts are scored once per call
+                pending.setdefault(model_route, {}).setdefault(preprocess_text(text), []).append(i)
+            else:
+                # 3️⃣ Fallback for CI/offline environments
+                results[i] = NEUTRAL_FALLBACK
+                instrumentation.inc('sentiment.fallbacks')
+                if failed is not None:
+                    failed.append(i)
+
+    for route, route_pending in pending.items():
+        # The cache belongs to the multilingual model; English-model scores are not mixed into it
+        use_cache = cache is not None and route == ROUTE_MULTILINGUAL
+        if use_cache:
+            for processed, res in cache.get_many(list(route_pending)).items():
+                for i in route_pending.pop(processed):
+                    results[i] = res
+                    instrumentation.inc('sentiment.cache_hits')
+        if not route_pending:
             continue
 
-        # 2️⃣ Model-based inference (if available)
-        if _classifier:
-            try:
-                processed = preprocess_text(text)
-                pred = _classifier(processed)[0]
-                label = pred["label"].upper().replace("LABEL_", "")
-                score = round(float(pred["score"]), 4)
-                results.append((label, score))
-            except Exception as e:
-                logger.error(f"❌ Model inference failed for text '{text}': {e}")
-                results.append(("NEUTRAL", 0.5))
-        else:
-            # 3️⃣ Fallback for CI/offline environments
-            results.append(("NEUTRAL", 0.5))
+        model_texts = list(route_pending)
+        route_classifier = None
+        if not parallel:
+            route_classifier = get_english_classifier() if route == ROUTE_ENGLISH else classifier
+        scored = _score_route(route, model_texts, route_classifier, parallel, workers, batch_size, max_length)
+        if use_cache:
+            cache.put_many({t: res for t, res in zip(model_texts, scored) if res is not None})
+        for processed, res in zip(model_texts, scored):
+            if res is None:
+                instrumentation.inc('sentiment.fallbacks', len(route_pending[processed]))
+                if failed is not None:
+                    failed.extend(route_pending[processed])
+            for i in route_pending[processed]:
+                results[i] = res or NEUTRAL_FALLBACK
 
+    if failed is not None:
+        failed.sort()
+    instrumentation.inc('sentiment.texts', len(results))
     logger.info(f"✅ Sentiment predictions generated for {len(results)} texts.")
     return results
 
 
+def evaluate_routing(
+    texts: Sequence[str], labels: Sequence[str], batch_size: int = 32, tolerance: float = 0.0,
+) -> dict:
+    """
+    Accuracy of routed vs. unrouted predict_sentiment on labelled texts.
+
+    Args:
+        texts: Review texts.
+        labels: Expected POSITIVE / NEGATIVE / NEUTRAL label per text.
+        batch_size: Batch size for both runs.
+        tolerance: Largest allowed accuracy drop of the routed run.
+    Returns:
+        dict with routed_accuracy, baseline_accuracy, agreement (fraction of equal
+        labels), routes {route: count}, route_accuracy {route: routed accuracy on the
+        texts sent that way}, mismatches [(text, baseline, routed), ...] and ok
+        (routed accuracy within `tolerance` of the baseline).
+    """
+    texts = [str(t) for t in texts]
+    baseline = predict_sentiment(texts, batch_size=batch_size, routing=False)
+    routed = predict_sentiment(texts, batch_size=batch_size, routing=True)
+    routes = {route: 0 for route in ROUTES}
+    correct = {route: 0 for route in ROUTES}
+    for text, pred, label in zip(texts, routed, labels):
+        route = route_text(text.strip())[0]
+        routes[route] += 1
+        correct[route] += pred[0] == label
+
+    def accuracy(preds):
+        return sum(p[0] == label for p, label in zip(preds, labels)) / len(texts) if texts else 1.0
+
+    mismatches = [(t, b, r) for t, b, r in zip(texts, baseline, routed) if b[0] != r[0]]
+    report = {
+        "routed_accuracy": accuracy(routed),
+        "baseline_accuracy": accuracy(baseline),
+        "agreement": 1 - len(mismatches) / len(texts) if texts else 1.0,
+        "routes": routes,
+        "route_accuracy": {route: correct[route] / n for route, n in routes.items() if n},
+        "mismatches": mismatches,
+    }
+    report["ok"] = report["routed_accuracy"] >= report["baseline_accuracy"] - tolerance
+    return report
+
+
+# --------------------------------------------------
+# BACKEND PARITY
+# --------------------------------------------------
+def compare_backends(
+    texts: Sequence[str],
+    candidate: Union[str, Callable],
+    reference: Union[str, Callable] = "hf",
+    batch_size: int = 32,
+    score_tolerance: float = 0.05,
+    max_length: int = MAX_SEQ_LENGTH,
+) -> dict:
+    """
+    Score `texts` with two backends and check that they agree.
+
+    Args:
+        texts: Review texts (preprocessed the same way predict_sentiment does).
+        candidate: Backend name or an already-loaded classifier to validate.
+        reference: Backend name or classifier treated as ground truth.
+        batch_size: Batch size used for both backends.
+        score_tolerance: Largest allowed absolute score difference.
+    Returns:
+        dict with label_agreement (fraction), max_score_diff (over texts with
+        matching labels), mismatches [(text, reference, candidate), ...] and ok.
+    """
+    processed = [preprocess_text(t) for t in texts]
+    scored = []
+    for backend in (reference, candidate):
+        classifier = load_backend(backend) if isinstance(backend, str) else backend
+        scored.append(_score_batched(classifier, processed, batch_size, max_length))
+    ref, cand = ([r or NEUTRAL_FALLBACK for r in results] for results in scored)
+
+    mismatches = []
+    max_diff = 0.0
+    for text, r, c in zip(texts, ref, cand):
+        if r[0] != c[0]:
+            mismatches.append((text, r, c))
+        else:
+            max_diff = max(max_diff, abs(r[1] - c[1]))
+    agreement = 1 - len(mismatches) / len(texts) if texts else 1.0
+    return {
+        "label_agreement": agreement,
+        "max_score_diff": round(max_diff, 4),
+        "mismatches": mismatches,
+        "ok": not mismatches and max_diff <= score_tolerance,
+    }
+
+
 # --------------------------------------------------
 # MODULE TEST
 # --------------------------------------------------
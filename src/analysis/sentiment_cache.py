@@ -0,0 +1,187 @@
+"""
+Sentiment Prediction Cache
+--------------------------
+Two-tier cache for predict_sentiment results keyed on a hash of the
+preprocessed text plus the model name, backend and model version: an
+in-memory LRU in front of a persistent SQLite store. Switching any of them
+invalidates the store, since backends and versions may score differently.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import hashlib
+import logging
+import sqlite3
+import threading
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+Prediction = Tuple[str, float]
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+class SentimentCache:
+    """
+    LRU + SQLite cache of (label, score) predictions.
+
+    Args:
+        model_name (str): Model the cached scores belong to; part of every key.
+        path (Optional[str]): SQLite file for the persistent tier, or None for memory only.
+        max_memory_items (int): Capacity of the in-memory LRU tier.
+        backend (str): Inference backend (hf / quantized / onnx); part of every key.
+        model_version (str): Stored model version; part of every key.
+    """
+
+    def __init__(self, model_name: str, path: Optional[str] = None, max_memory_items: int = 50000,
+                 backend: str = "", model_version: str = ""):
+        self.model_name = model_name
+        self.backend = backend
+        self.model_version = model_version
+        self.max_memory_items = max_memory_items
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Prediction]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._init_db()
+
+    # --------------------------------------------------
+    # KEYS & SCHEMA
+    # --------------------------------------------------
+    @property
+    def identity(self) -> Dict[str, str]:
+        """What the cached scores depend on besides the text; stored in the meta table."""
+        return {"model_name": self.model_name, "backend": self.backend, "model_version": self.model_version}
+
+    def key(self, processed: str) -> str:
+        """Content hash of a preprocessed text for the current model, backend and version."""
+        prefix = "\x00".join(self.identity.values())
+        return hashlib.sha256(f"{prefix}\x00{processed}".encode("utf-8")).hexdigest()
+
+    def _init_db(self):
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL)"
+            )
+            stored = dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+            if any(stored.get(name) != value for name, value in self.identity.items()):
+                if stored:
+                    logger.info(f"ℹ️ Sentiment model changed ({stored} → {self.identity}), clearing cache.")
+                self._db.execute("DELETE FROM predictions")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", list(self.identity.items())
+                )
+
+    # --------------------------------------------------
+    # LOOKUPS
+    # --------------------------------------------------
+    def _remember(self, key: str, value: Prediction):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, processed: str) -> Optional[Prediction]:
+        """Return the cached prediction for a preprocessed text, if any."""
+        return self.get_many([processed]).get(processed)
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, Prediction]:
+        """Return cached predictions for the given preprocessed texts; misses are omitted."""
+        keys = {self.key(t): t for t in texts}
+        found: Dict[str, Prediction] = {}
+        with self._lock:
+            missing = []
+            for k, t in keys.items():
+                if k in self._memory:
+                    self._memory.move_to_end(k)
+                    found[t] = self._memory[k]
+                    self.memory_hits += 1
+                else:
+                    missing.append(k)
+
+            if missing and self._db is not None:
+                for start in range(0, len(missing), _SQL_CHUNK):
+                    chunk = missing[start:start + _SQL_CHUNK]
+                    rows = self._db.execute(
+                        f"SELECT key, label, score FROM predictions WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for k, label, score in rows:
+                        value = (label, score)
+                        found[keys[k]] = value
+                        self._remember(k, value)
+                        self.disk_hits += 1
+
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, processed: str, prediction: Prediction):
+        """Store a prediction for a preprocessed text."""
+        self.put_many({processed: prediction})
+
+    def put_many(self, predictions: Dict[str, Prediction]):
+        """Store predictions keyed by preprocessed text in both tiers."""
+        if not predictions:
+            return
+        rows = [(self.key(t), label, float(score)) for t, (label, score) in predictions.items()]
+        with self._lock:
+            for k, label, score in rows:
+                self._remember(k, (label, score))
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO predictions (key, label, score) VALUES (?, ?, ?)", rows
+                    )
+
+    # --------------------------------------------------
+    # COUNTERS & MAINTENANCE
+    # --------------------------------------------------
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for logging and monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+    def clear(self):
+        """Drop every cached prediction from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM predictions")
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def open_default_cache(model_name: str, backend: str = "", model_version: str = "") -> SentimentCache:
+    """Cache backed by config.SENTIMENT_CACHE_PATH for the given model, backend and version."""
+    return SentimentCache(
+        model_name,
+        path=config.SENTIMENT_CACHE_PATH,
+        max_memory_items=config.SENTIMENT_CACHE_MEMORY_ITEMS,
+        backend=backend,
+        model_version=model_version,
+    )
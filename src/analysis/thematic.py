@@ -1,23 +1,77 @@
 # src/analysis/thematic.py
-from typing import List
-import spacy
+from typing import Iterable, Iterator, List
 from collections import Counter
+import threading
+
+from src import instrumentation
+
+SPACY_MODEL = "en_core_web_sm"
+# Stored with each theme list; bump it whenever the extraction rules change
+THEMES_VERSION = f"{SPACY_MODEL}:noun-adj-top5@1"
+# Themes only need POS tags and lemmas, so the parser and NER are skipped when streaming
+UNUSED_PIPES = ("parser", "ner")
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """Return the spaCy pipeline, loading it on first use (thread-safe)."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                # spaCy is only imported when themes are actually extracted
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL)
+    return _nlp
+
+
+def warmup():
+    """Load the spaCy pipeline ahead of the first request."""
+    get_nlp()
+
+
+def _doc_lemmas(doc) -> List[str]:
+    # Only consider nouns and adjectives as themes
+    return [token.lemma_.lower() for token in doc if token.pos_ in ("NOUN", "ADJ")]
+
+
+def _doc_themes(doc, top_n: int) -> List[str]:
+    return [w for w, _ in Counter(_doc_lemmas(doc)).most_common(top_n)]
 
-nlp = spacy.load("en_core_web_sm")
 
 def extract_themes(texts: List[str], top_n: int = 5) -> List[str]:
     """Extract top keywords/themes for a single review."""
-    doc = nlp(" ".join(texts))
-    # Only consider nouns and adjectives as themes
-    words = [token.lemma_.lower() for token in doc if token.pos_ in ("NOUN", "ADJ")]
-    most_common = [w for w, _ in Counter(words).most_common(top_n)]
-    return most_common
-
-def extract_themes_per_review(reviews: List[str], top_n: int = 5) -> List[str]:
-    themes_list = []
-    for review in reviews:
-        if not review.strip():
-            themes_list.append([])
-            continue
-        themes_list.append(extract_themes([review], top_n))
-    return themes_list
+    return _doc_themes(get_nlp()(" ".join(texts)), top_n)
+
+
+def _iter_docs(reviews: Iterable[str], batch_size: int, n_process: int):
+    nlp = get_nlp()
+    disable = [name for name in UNUSED_PIPES if name in nlp.pipe_names]
+    texts = (r if isinstance(r, str) and r.strip() else "" for r in reviews)
+    return nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disable)
+
+
+def iter_lemmas(reviews: Iterable[str], batch_size: int = 256, n_process: int = 1) -> Iterator[List[str]]:
+    """Stream the noun/adjective lemmas of each review (all occurrences, in text order)."""
+    for doc in _iter_docs(reviews, batch_size, n_process):
+        yield _doc_lemmas(doc)
+
+
+def iter_themes(
+    reviews: Iterable[str], top_n: int = 5, batch_size: int = 256, n_process: int = 1
+) -> Iterator[List[str]]:
+    """
+    Stream theme lists for an iterable of reviews using nlp.pipe.
+    Blank or non-string reviews yield []. Set n_process > 1 to use several cores.
+    """
+    for doc in _iter_docs(reviews, batch_size, n_process):
+        yield _doc_themes(doc, top_n)
+
+
+def extract_themes_per_review(reviews: List[str], top_n: int = 5, n_process: int = 1) -> List[List[str]]:
+    """Extract themes for each review, in order."""
+    with instrumentation.timer('themes.extract'):
+        themes = list(iter_themes(reviews, top_n=top_n, n_process=n_process))
+    instrumentation.inc('themes.reviews', len(themes))
+    return themes
@@ -0,0 +1,77 @@
+"""
+Theme Driver Analysis
+---------------------
+Impact (mean sentiment score) and Volume (mention count) per theme, computed
+from a sparse review x theme count matrix. Memory grows with the number
+of (review, theme) pairs rather than reviews x distinct themes, and all
+themes are scored with one sparse matrix-vector product. Like theme_rollups,
+a theme listed twice in one review is counted twice.
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def theme_indicator_matrix(theme_lists: Iterable, binary: bool = True) -> Tuple[sp.csr_matrix, List[str]]:
+    """
+    CSR matrix with one row per review and one column per theme, plus the sorted
+    theme names. A theme listed twice in a review counts once when `binary`, and
+    twice otherwise; anything that is not a list or tuple (NaN, None) is treated
+    as no themes.
+    """
+    vocabulary = {}
+    indices: List[int] = []
+    indptr = [0]
+    for themes in theme_lists:
+        if isinstance(themes, (list, tuple)):
+            for theme in themes:
+                indices.append(vocabulary.setdefault(theme, len(vocabulary)))
+        indptr.append(len(indices))
+
+    terms = sorted(vocabulary)
+    # Remap first-seen column ids onto sorted order so columns line up with `terms`
+    order = np.empty(len(terms), dtype=np.int64)
+    order[[vocabulary[t] for t in terms]] = np.arange(len(terms))
+    cols = order[np.asarray(indices, dtype=np.int64)] if indices else np.zeros(0, dtype=np.int64)
+
+    X = sp.csr_matrix(
+        (np.ones(len(cols), dtype=np.float64), cols, np.asarray(indptr)),
+        shape=(len(indptr) - 1, len(terms)),
+    )
+    X.sum_duplicates()
+    if binary:
+        X.data[:] = 1.0
+    return X, terms
+
+
+def theme_impact(theme_lists: Iterable, scores: Sequence[float], min_volume: int = 1,
+                 top_k: Optional[int] = None) -> pd.DataFrame:
+    """
+    Mean sentiment score and mention count per theme: [Theme, Impact, Volume], sorted by Impact.
+
+    Args:
+        theme_lists: One list of theme strings per review.
+        scores: One sentiment score per review; missing scores count as 0.
+        min_volume (int): Drop themes with fewer mentions.
+        top_k (int): Keep only the k themes with the largest Volume.
+    """
+    X, terms = theme_indicator_matrix(theme_lists, binary=False)
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64))
+    if len(scores) != X.shape[0]:
+        raise ValueError(f"Got {len(scores)} scores for {X.shape[0]} reviews")
+
+    volume = np.bincount(X.indices, weights=X.data, minlength=len(terms)).astype(np.int64)
+    impact = X.T @ scores
+    keep = np.flatnonzero(volume >= min_volume)
+    if top_k is not None and len(keep) > top_k:
+        # Stable sort on descending volume so ties keep alphabetical theme order
+        keep = np.sort(keep[np.argsort(-volume[keep], kind='stable')[:top_k]])
+
+    result = pd.DataFrame({
+        'Theme': np.asarray(terms, dtype=object)[keep],
+        'Impact': impact[keep] / volume[keep],
+        'Volume': volume[keep],
+    })
+    return result.sort_values('Impact', ascending=False, kind='stable').reset_index(drop=True)
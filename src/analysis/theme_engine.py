@@ -0,0 +1,159 @@
+"""
+Corpus-Level Theme Engine
+-------------------------
+TF-IDF over the noun/adjective lemmas produced by thematic.iter_lemmas.
+Document frequencies are kept as an incremental table, so new reviews
+update the IDF without re-scanning history, and per-review / per-bank
+top themes come from vectorized sparse operations.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+import joblib
+
+
+class ThemeEngine:
+    """
+    Incremental TF-IDF theme model.
+
+    Args:
+        min_df (int): Terms seen in fewer documents are never reported as themes.
+    """
+
+    def __init__(self, min_df: int = 1):
+        self.min_df = min_df
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+        self.n_docs = 0
+        self._blocks: List[sp.csr_matrix] = []
+        self._banks: List[np.ndarray] = []
+
+    # --------------------------------------------------
+    # FITTING
+    # --------------------------------------------------
+    def _encode(self, lemma_lists: Iterable[List[str]]) -> sp.csr_matrix:
+        """Term-count matrix for a batch of documents, growing the vocabulary as needed."""
+        indices: List[int] = []
+        indptr = [0]
+        for lemmas in lemma_lists:
+            for term in lemmas:
+                col = self.vocabulary.get(term)
+                if col is None:
+                    col = self.vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                indices.append(col)
+            indptr.append(len(indices))
+        counts = sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(self.terms)),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def partial_fit(self, lemma_lists: Iterable[List[str]], banks: Optional[Sequence[str]] = None) -> range:
+        """
+        Add documents (lists of lemmas) to the corpus and update document frequencies.
+        Returns the row positions assigned to the new documents.
+        """
+        counts = self._encode(lemma_lists)
+        n_new = counts.shape[0]
+        if banks is not None and len(banks) != n_new:
+            raise ValueError(f"Got {len(banks)} banks for {n_new} documents")
+
+        vocab_size = len(self.terms)
+        self.doc_freq = np.pad(self.doc_freq, (0, vocab_size - len(self.doc_freq)))
+        # After sum_duplicates each stored entry is one (document, term) pair
+        self.doc_freq += np.bincount(counts.indices, minlength=vocab_size)
+
+        start = self.n_docs
+        self.n_docs += n_new
+        self._blocks.append(counts)
+        self._banks.append(np.asarray(banks if banks is not None else [None] * n_new, dtype=object))
+        return range(start, self.n_docs)
+
+    def fit_texts(self, texts: Iterable[str], banks: Optional[Sequence[str]] = None,
+                  batch_size: int = 256, n_process: int = 1) -> range:
+        """Extract lemmas with spaCy and add the reviews to the corpus."""
+        from src.analysis.thematic import iter_lemmas
+
+        return self.partial_fit(iter_lemmas(texts, batch_size=batch_size, n_process=n_process), banks)
+
+    # --------------------------------------------------
+    # WEIGHTING
+    # --------------------------------------------------
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequency for every vocabulary term."""
+        return np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1.0
+
+    def counts_matrix(self, rows: Optional[range] = None) -> sp.csr_matrix:
+        """Term counts for the whole corpus (or only `rows`), padded to the current vocabulary."""
+        vocab_size = len(self.terms)
+        start, stop = (0, self.n_docs) if rows is None else (rows.start, min(rows.stop, self.n_docs))
+        padded, offset = [], 0
+        for block in self._blocks:
+            # Only the blocks overlapping [start, stop) are sliced and stacked
+            lo, hi = max(start - offset, 0), min(stop - offset, block.shape[0])
+            offset += block.shape[0]
+            if lo < hi:
+                b = block[lo:hi]
+                padded.append(sp.csr_matrix((b.data, b.indices, b.indptr), shape=(b.shape[0], vocab_size)))
+        if not padded:
+            return sp.csr_matrix((0, vocab_size))
+        return sp.vstack(padded, format="csr")
+
+    def tfidf(self, counts: Optional[sp.csr_matrix] = None) -> sp.csr_matrix:
+        """L2-normalized TF-IDF rows for `counts` (defaults to the whole corpus)."""
+        counts = self.counts_matrix() if counts is None else counts
+        weights = sp.csr_matrix(counts.multiply(self.idf()[: counts.shape[1]]))
+        weights.data[self.doc_freq[weights.indices] < self.min_df] = 0.0
+        weights.eliminate_zeros()
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.csr_matrix(sp.diags(1.0 / norms) @ weights)
+
+    # --------------------------------------------------
+    # QUERIES
+    # --------------------------------------------------
+    def _top_k_rows(self, matrix: sp.csr_matrix, k: int) -> List[List[Tuple[str, float]]]:
+        """Top-k (term, weight) per row using one lexsort over all stored entries."""
+        matrix = sp.csr_matrix(matrix)
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        order = np.lexsort((matrix.indices, -matrix.data, rows))
+        rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+        keep = order[rank < k]
+
+        out: List[List[Tuple[str, float]]] = [[] for _ in range(matrix.shape[0])]
+        for r, c, w in zip(rows[keep], matrix.indices[keep], matrix.data[keep]):
+            out[r].append((self.terms[c], float(w)))
+        return out
+
+    def top_themes_per_review(self, k: int = 5, rows: Optional[range] = None) -> List[List[str]]:
+        """Highest-weighted themes for each review (optionally only the given rows)."""
+        # IDF is a per-term vector, so weighting only the requested rows gives the same result
+        weights = self.tfidf(self.counts_matrix(rows))
+        return [[term for term, _ in top] for top in self._top_k_rows(weights, k)]
+
+    def top_themes_per_bank(self, k: int = 10) -> Dict[str, List[Tuple[str, float]]]:
+        """Mean TF-IDF weight per theme within each bank, top-k per bank."""
+        if not self.n_docs:
+            return {}
+        banks = np.concatenate(self._banks)
+        labels, codes = np.unique(banks.astype(str), return_inverse=True)
+        membership = sp.csr_matrix(
+            (np.ones(self.n_docs), (codes, np.arange(self.n_docs))), shape=(len(labels), self.n_docs)
+        )
+        sizes = np.asarray(membership.sum(axis=1)).ravel()
+        bank_weights = sp.diags(1.0 / sizes) @ (membership @ self.tfidf())
+        return dict(zip(labels.tolist(), self._top_k_rows(bank_weights, k)))
+
+    # --------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------
+    def save(self, path: str):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "ThemeEngine":
+        return joblib.load(path)
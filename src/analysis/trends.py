@@ -0,0 +1,135 @@
+"""
+Sentiment Trend Engine
+----------------------
+Daily / weekly per-bank trend series built from the review_rollups table
+(or the same frame rolled up from raw rows offline), which insert_reviews
+and the re-scoring job keep current incrementally. Nothing here scans raw
+reviews: a year of data for a few banks is a few thousand rollup rows.
+
+For every bank and period it reports volume, mean rating, POSITIVE share
+and the polarization index |#5-star - #1-star| / volume, plus trailing
+rolling means and an EWMA. Spike and change-point detection are vectorized
+over all banks at once with grouped rolling windows.
+"""
+
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+METRICS = ['volume', 'avg_rating', 'positive_share', 'polarization']
+FREQS = {'D': 'D', 'W': 'W-MON'}
+# Lower bound on the pooled standard deviation in change-point scores
+_MIN_SPREAD = 1e-3
+
+
+def daily_series(rollups: pd.DataFrame) -> pd.DataFrame:
+    """
+    Additive per-(bank, day) sums from review_rollups rows
+    [bank, review_date, sentiment_label, rating, review_count, ...]:
+    [bank, date, volume, rated, rating_sum, positive, ones, fives].
+    """
+    df = rollups.dropna(subset=['review_date'])
+    counts = df['review_count'].astype(float)
+    rated = df['rating'].notna()
+    parts = pd.DataFrame({
+        'bank': df['bank'].astype(str),
+        'date': pd.to_datetime(df['review_date']),
+        'volume': counts,
+        'rated': counts.where(rated, 0),
+        'rating_sum': (df['rating'].astype(float) * counts).where(rated, 0),
+        'positive': counts.where(df['sentiment_label'] == 'POSITIVE', 0),
+        'ones': counts.where(df['rating'] == 1, 0),
+        'fives': counts.where(df['rating'] == 5, 0),
+    })
+    return parts.groupby(['bank', 'date'], as_index=False).sum()
+
+
+def _ratios(sums: pd.DataFrame) -> pd.DataFrame:
+    volume = sums['volume'].replace(0, np.nan)
+    return pd.DataFrame({
+        'volume': sums['volume'],
+        'avg_rating': sums['rating_sum'] / sums['rated'].replace(0, np.nan),
+        'positive_share': sums['positive'] / volume,
+        'polarization': (sums['fives'] - sums['ones']).abs() / volume,
+    }, index=sums.index)
+
+
+def trend_table(daily: pd.DataFrame, freq: str = 'D', window: int = 7, ewm_span: int = 7) -> pd.DataFrame:
+    """
+    Per-bank trend series at daily ('D') or weekly ('W') resolution, with empty periods filled in:
+    [bank, date, <metric>, <metric>_rolling, <metric>_ewma for each of METRICS].
+
+    Rolling values are computed from the summed counts over the trailing `window` periods
+    (so a quiet day does not weigh as much as a busy one); EWMAs smooth the per-period values.
+    """
+    if freq not in FREQS:
+        raise ValueError(f"freq must be one of {sorted(FREQS)}, got {freq!r}")
+    columns = ['bank', 'date'] + [f'{m}{s}' for m in METRICS for s in ('', '_rolling', '_ewma')]
+    if daily.empty:
+        return pd.DataFrame(columns=columns)
+
+    sums = (daily.set_index('date').groupby('bank')
+            .resample(FREQS[freq]).sum(numeric_only=True))
+    grouped = sums.groupby(level='bank')
+    rolling = grouped.rolling(window, min_periods=1).sum().droplevel(0)
+
+    out = _ratios(sums)
+    rolled = _ratios(rolling.reindex(sums.index))
+    ewma = out.groupby(level='bank').transform(lambda s: s.ewm(span=ewm_span, ignore_na=True).mean())
+    for m in METRICS:
+        out[f'{m}_rolling'] = rolled[m]
+        out[f'{m}_ewma'] = ewma[m]
+    return out.reset_index()[columns]
+
+
+def detect_spikes(trends: pd.DataFrame, metric: str = 'volume', window: int = 14,
+                  threshold: float = 3.5) -> pd.DataFrame:
+    """
+    Periods where `metric` departs from its trailing median by more than `threshold` robust
+    z-scores (median absolute deviation). Returns the matching rows plus a `zscore` column.
+    """
+    values = trends[metric].astype(float)
+    grouped = values.groupby(trends['bank'])
+    # Shift so each period is compared against the window before it, not including itself
+    median = grouped.transform(lambda s: s.shift().rolling(window, min_periods=3).median())
+    mad = (values - median).abs().groupby(trends['bank']).transform(
+        lambda s: s.shift().rolling(window, min_periods=3).median())
+    z = 0.6745 * (values - median) / mad.replace(0, np.nan)
+    mask = z.abs() > threshold
+    return trends.loc[mask].assign(zscore=z[mask])
+
+
+def detect_change_points(trends: pd.DataFrame, metric: str = 'positive_share', window: int = 7,
+                         threshold: float = 2.0) -> pd.DataFrame:
+    """
+    Periods where the mean of the next `window` values differs from the mean of the previous
+    `window` by more than `threshold` pooled within-window standard deviations, keeping only the strongest
+    period of each run. Returns the matching rows plus `shift` (after - before) and `score`.
+    """
+    values = trends[metric].astype(float)
+    grouped = values.groupby(trends['bank'])
+    before = grouped.transform(lambda s: s.rolling(window, min_periods=window).mean().shift())
+    after = grouped.transform(lambda s: s[::-1].rolling(window, min_periods=window).mean()[::-1])
+    var_before = grouped.transform(lambda s: s.rolling(window, min_periods=window).var().shift())
+    var_after = grouped.transform(lambda s: s[::-1].rolling(window, min_periods=window).var()[::-1])
+    # Floor the spread so a clean step between two flat stretches still scores (very) high
+    spread = np.sqrt((var_before + var_after) / 2).clip(lower=_MIN_SPREAD)
+    score = ((after - before) / spread).abs()
+
+    # A level shift scores high for several consecutive periods; keep the local maximum
+    neighbours = score.groupby(trends['bank']).transform(
+        lambda s: s.rolling(2 * window + 1, center=True, min_periods=1).max())
+    mask = (score > threshold) & (score == neighbours)
+    return trends.loc[mask].assign(shift=(after - before)[mask], score=score[mask])
+
+
+def get_trends(banks: Optional[List[str]] = None, freq: str = 'D', window: int = 7,
+               ewm_span: int = 7, start=None, end=None) -> pd.DataFrame:
+    """
+    Trend table for the selected banks straight from the review_rollups table, reading only
+    the banks and review dates in [start, end] (rolling values start fresh at `start`).
+    """
+    from src.db import postgres
+
+    rollups = postgres.get_daily_rollups(banks, start=start, end=end)
+    return trend_table(daily_series(rollups), freq=freq, window=window, ewm_span=ewm_span)
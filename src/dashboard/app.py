@@ -1,15 +1,12 @@
 import sys
 import os
 import json
-import time
 from pathlib import Path
 
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from sklearn.preprocessing import MultiLabelBinarizer
-from sqlalchemy.exc import SQLAlchemyError, PendingRollbackError
 
 #SYSTEM CONFIGURATION
 
@@ -19,7 +16,8 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from src.db import postgres
+    from src.db import postgres, search
+    from src.analysis import theme_drivers, trends
 except ImportError:
     st.error("🚨 Configuration Error: Ensure 'src' is in project root.")
     st.stop()
@@ -68,14 +66,14 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # DATA ENGINE
+AUDIT_PAGE_SIZE = 50
+SEARCH_PAGE_SIZE = 20
+SEARCH_COLUMNS = ['bank', 'review_date', 'review_text', 'rating', 'sentiment_label']
+
 @st.cache_data(ttl=300, show_spinner=False)
 def fetch_production_data():
-    try:
-        df = postgres.get_all_reviews()
-    except (PendingRollbackError, SQLAlchemyError):
-        if hasattr(postgres, 'session'): postgres.session.rollback()
-        df = postgres.get_all_reviews()
-    
+    # Transient connection errors are retried inside postgres; a fresh pooled connection is pre-pinged
+    df = postgres.get_all_reviews()
     if df.empty: return df
 
     s_col = next((c for c in ['sentiment_score', 'score'] if c in df.columns), df.columns[0])
@@ -83,6 +81,105 @@ def fetch_production_data():
     df['themes'] = df['themes'].apply(lambda x: json.loads(x) if isinstance(x, str) and x.startswith('[') else (x if isinstance(x, list) else []))
     return df
 
+def rollup_frame(df: pd.DataFrame, min_volume: int = 1, top_k=None) -> dict:
+    """
+    Offline fallback: build the same rollup tables postgres.get_rollups() returns from raw review rows.
+    Per bank, themes with fewer than `min_volume` mentions are dropped and only the `top_k` most
+    mentioned are kept (all by default).
+    """
+    if df.empty:
+        return {'daily': pd.DataFrame(columns=['bank', 'review_date', 'sentiment_label', 'rating', 'review_count', 'score_sum']),
+                'themes': pd.DataFrame(columns=['bank', 'theme', 'review_count', 'score_sum'])}
+    dates = pd.to_datetime(df['review_date'], errors='coerce') if 'review_date' in df.columns else pd.Series(pd.NaT, index=df.index)
+    rows = df.assign(review_date=dates.dt.date)
+    daily = (rows.groupby(['bank', 'review_date', 'sentiment_label', 'rating'], dropna=False)
+             .agg(review_count=('std_score', 'size'), score_sum=('std_score', 'sum')).reset_index())
+    themes = []
+    for bank, part in rows.groupby('bank'):
+        impact = theme_drivers.theme_impact(part['themes'], part['std_score'], min_volume=min_volume, top_k=top_k)
+        themes.append(pd.DataFrame({'bank': bank, 'theme': impact['Theme'], 'review_count': impact['Volume'],
+                                    'score_sum': impact['Impact'] * impact['Volume']}))
+    themes = pd.concat(themes, ignore_index=True)
+    return {'daily': daily, 'themes': themes}
+
+
+def aggregate_rollups(rollups: dict, banks: list) -> dict:
+    """Dashboard aggregates for a bank selection as slices and sums of the small rollup tables."""
+    daily = rollups['daily'].loc[rollups['daily']['bank'].isin(banks)]
+    theme_rows = rollups['themes'].loc[rollups['themes']['bank'].isin(banks)]
+
+    counts = daily['review_count']
+    vol = int(counts.sum())
+    rated = daily['rating'].notna()
+    kpis = {
+        'volume': vol,
+        'avg_rating': (daily.loc[rated, 'rating'] * counts[rated]).sum() / counts[rated].sum() if rated.any() else 0,
+        'positive_pct': counts[daily['sentiment_label'] == 'POSITIVE'].sum() / vol * 100 if vol > 0 else 0,
+        'polarization': abs(counts[daily['rating'] == 5].sum() - counts[daily['rating'] == 1].sum()) / vol
+        if vol > 0 else 0,
+    }
+    sentiment = daily.groupby(['bank', 'sentiment_label'])['review_count'].sum().reset_index(name='count')
+    ratings = daily.groupby(['bank', 'rating'])['review_count'].sum().reset_index(name='count')
+
+    themes = theme_rows.groupby('theme')[['score_sum', 'review_count']].sum()
+    themes = pd.DataFrame({
+        'Theme': themes.index,
+        'Impact': themes['score_sum'].values / themes['review_count'].values,
+        'Volume': themes['review_count'].values,
+    }).sort_values('Impact', ascending=False)
+    return {'kpis': kpis, 'sentiment': sentiment, 'ratings': ratings, 'themes': themes}
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_bank_names():
+    return postgres.get_bank_names()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_rollups() -> dict:
+    """Daily rollup plus per-(bank, theme) totals, fetched once per TTL; bank selection changes only slice them."""
+    return postgres.get_rollups()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_fallback_rollups() -> dict:
+    return rollup_frame(fetch_production_data())
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_kpis(banks: tuple) -> dict:
+    """Single aggregate row over the rollups; cheap enough to render before anything else."""
+    return postgres.get_kpis(list(banks))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_audit_page(banks: tuple, before_id=None):
+    """One keyset page of the newest reviews, starting below review_id `before_id`."""
+    return postgres.get_recent_reviews(list(banks), limit=AUDIT_PAGE_SIZE, before_id=before_id)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_search_page(query: str, banks: tuple, page: int):
+    """One ranked page of full-text hits, answered from the reviews' search index."""
+    return postgres.search_reviews(query, list(banks), limit=SEARCH_PAGE_SIZE, offset=page * SEARCH_PAGE_SIZE)
+
+
+@st.cache_resource(ttl=300, show_spinner=False)
+def fallback_search_index():
+    """Offline fallback: the raw frame and an in-memory inverted index over it, built once per TTL."""
+    df = fetch_production_data()
+    return df, search.ReviewIndex(df['review_text'] if 'review_text' in df.columns else [])
+
+
+def load_banks():
+    """Bank list from the DB; if it is unreachable, also return the raw fallback frame."""
+    try:
+        return fetch_bank_names(), None
+    except Exception:
+        df = fetch_production_data()
+        return (sorted(df['bank'].unique().tolist()) if not df.empty else []), df
+
+
 # Initialize Session State
 if 'loaded' not in st.session_state:
     st.session_state.loaded = False
@@ -95,34 +192,32 @@ if not st.session_state.loaded:
             <div style="color: #64748b; margin-top: 10px;">Establishing Real-Time Postgres Link</div>
         </div>
     """, unsafe_allow_html=True)
-    df_raw = fetch_production_data()
-    time.sleep(1.2)
+    banks, df_raw = load_banks()
     st.session_state.loaded = True
     center_load.empty()
 else:
-    df_raw = fetch_production_data()
+    banks, df_raw = load_banks()
 
 
 # 4. SIDEBAR & KPI
 
 with st.sidebar:
     st.markdown("<h2 style='color:#38bdf8;'> Bank</h2>", unsafe_allow_html=True)
-    banks = sorted(df_raw['bank'].unique().tolist())
     selected_banks = st.multiselect("Benchmark Banks", banks, default=banks)
 
-filtered_df = df_raw.loc[df_raw['bank'].isin(selected_banks)].reset_index(drop=True)
+if df_raw is None:
+    # KPIs come from one count query; the rollup tables behind the charts load after they render
+    agg = {'kpis': fetch_kpis(tuple(selected_banks))}
+else:
+    # DB unreachable: roll up the raw fallback frame once in pandas, then slice it the same way
+    agg = aggregate_rollups(fetch_fallback_rollups(), selected_banks)
 
 st.markdown("<h1 style='text-align: center; color:#38bdf8;'>Fintech Market Intelligence Hub</h1>", unsafe_allow_html=True)
 k1, k2, k3, k4 = st.columns(4)
 
-vol = len(filtered_df)
-rating = filtered_df['rating'].mean() if vol > 0 else 0
-pos = (len(filtered_df[filtered_df['sentiment_label'] == 'POSITIVE']) / vol * 100) if vol > 0 else 0
-
-def get_polar(sub):
-    ones = len(sub[sub['rating'] == 1])
-    fives = len(sub[sub['rating'] == 5])
-    return abs(fives - ones) / len(sub) if len(sub) > 0 else 0
+vol = agg['kpis']['volume']
+rating = agg['kpis']['avg_rating']
+pos = agg['kpis']['positive_pct']
 
 k1.metric("Market Volume", f"{vol:,}")
 k2.metric("Avg Rating", f"{rating:.2f}")
@@ -136,20 +231,24 @@ with k3:
         </div>
     """, unsafe_allow_html=True)
 
-k4.metric("Polarization Index", f"{get_polar(filtered_df):.2f}")
+k4.metric("Polarization Index", f"{agg['kpis']['polarization']:.2f}")
 
 st.divider()
 
 
 # 5. CORE ANALYSIS TABS
-tab_bench, tab_dist, tab_shap = st.tabs(["Benchmarking", " Rating Profiles", " Driver Analysis"])
+if df_raw is None:
+    agg.update(aggregate_rollups(fetch_rollups(), selected_banks))
+
+tab_bench, tab_dist, tab_shap, tab_trend = st.tabs(
+    ["Benchmarking", " Rating Profiles", " Driver Analysis", " Trends"])
 
 # Professional White Background for Charts
 light_chart_theme = "plotly_white"
 
 with tab_bench:
     st.subheader("Market Sentiment Distribution")
-    sent_data = filtered_df.groupby(['bank', 'sentiment_label']).size().reset_index(name='count')
+    sent_data = agg['sentiment']
     fig_bench = px.bar(sent_data, x='bank', y='count', color='sentiment_label',
                        barmode='group', text_auto='.2s', template=light_chart_theme,
                        color_discrete_map={'POSITIVE': '#22c55e', 'NEUTRAL': '#64748b', 'NEGATIVE': '#ef4444'})
@@ -159,30 +258,97 @@ with tab_dist:
     st.subheader("Comparative Rating Distribution")
     st.markdown("White-background visualization for maximum clarity on star distribution.")
     
-    fig_dist = px.histogram(filtered_df, x="rating", color="bank", barmode="group",
-                            nbins=5, template=light_chart_theme, 
-                            color_discrete_sequence=px.colors.qualitative.Safe)
+    fig_dist = px.bar(agg['ratings'], x="rating", y="count", color="bank", barmode="group",
+                      template=light_chart_theme,
+                      color_discrete_sequence=px.colors.qualitative.Safe)
     fig_dist.update_layout(xaxis=dict(tickmode='linear', tick0=1, dtick=1), bargap=0.1)
     st.plotly_chart(fig_dist, use_container_width=True)
 
 with tab_shap:
     st.subheader("Theme Drivers")
     st.markdown("Analysis of feature impact on overall sentiment scores.")
-    if not filtered_df.empty and 'themes' in filtered_df.columns:
-        mlb = MultiLabelBinarizer()
-        X = pd.DataFrame(mlb.fit_transform(filtered_df['themes']), columns=mlb.classes_)
-        shap_metrics = []
-        for theme in mlb.classes_:
-            mask = X[theme] == 1
-            shap_metrics.append({'Theme': theme, 'Impact': filtered_df.loc[mask, 'std_score'].mean(), 'Volume': mask.sum()})
-        
-        shap_df = pd.DataFrame(shap_metrics).sort_values('Impact', ascending=False)
-        
+    shap_df = agg['themes']
+    if not shap_df.empty:
         fig_shap = px.bar(shap_df, x='Impact', y='Theme', orientation='h',
                           color='Impact', color_continuous_scale='RdYlGn', template=light_chart_theme)
         fig_shap.update_layout(coloraxis_showscale=False)
         st.plotly_chart(fig_shap, use_container_width=True)
 
+with tab_trend:
+    st.subheader("Sentiment Over Time")
+    t1, t2 = st.columns(2)
+    metric = t1.selectbox("Metric", trends.METRICS, index=trends.METRICS.index('positive_share'),
+                          format_func=lambda m: m.replace('_', ' ').title())
+    freq = t2.radio("Resolution", list(trends.FREQS), format_func={'D': 'Daily', 'W': 'Weekly'}.get,
+                    horizontal=True)
+    # Same cached rollups as the other tabs; the trend math only touches a few rows per bank-day
+    daily = (fetch_rollups() if df_raw is None else fetch_fallback_rollups())['daily']
+    trend_df = trends.trend_table(trends.daily_series(daily.loc[daily['bank'].isin(selected_banks)]), freq=freq)
+    if not trend_df.empty:
+        fig_trend = px.line(trend_df, x='date', y=f'{metric}_rolling', color='bank', template=light_chart_theme,
+                            labels={f'{metric}_rolling': f"{metric.replace('_', ' ')} (rolling)"})
+        spikes = trends.detect_spikes(trend_df, metric)
+        shifts = trends.detect_change_points(trend_df, metric)
+        fig_trend.add_scatter(x=spikes['date'], y=spikes[f'{metric}_rolling'], mode='markers', name='Spike',
+                              marker=dict(symbol='x', size=10, color='#ef4444'))
+        fig_trend.add_scatter(x=shifts['date'], y=shifts[f'{metric}_rolling'], mode='markers', name='Shift',
+                              marker=dict(symbol='diamond', size=10, color='#f59e0b'))
+        st.plotly_chart(fig_trend, use_container_width=True)
+
 st.divider()
+st.subheader("Search Reviews")
+query = st.text_input("Search reviews", placeholder='otp or "login failure" -update', label_visibility="collapsed")
+if query.strip():
+    search_key = (query, tuple(selected_banks))
+    if st.session_state.get('search_key') != search_key:
+        st.session_state.search_key = search_key
+        st.session_state.search_page = 0
+    page_no = st.session_state.search_page
+
+    if df_raw is None:
+        hits = fetch_search_page(query, tuple(selected_banks), page_no)
+    else:
+        frame, index = fallback_search_index()
+        hits = index.search_frame(frame, query, mask=frame['bank'].isin(selected_banks).to_numpy(),
+                                  limit=SEARCH_PAGE_SIZE, offset=page_no * SEARCH_PAGE_SIZE)
+
+    if hits.empty and page_no == 0:
+        st.info("No reviews match this search.")
+    else:
+        st.dataframe(hits[[c for c in SEARCH_COLUMNS if c in hits.columns]], use_container_width=True)
+        prev_col, page_col, next_col = st.columns([1, 4, 1])
+        if prev_col.button("◀ Better", key="search_prev", disabled=page_no == 0):
+            st.session_state.search_page -= 1
+            st.rerun()
+        page_col.caption(f"Results page {page_no + 1}")
+        if next_col.button("More ▶", key="search_next", disabled=len(hits) < SEARCH_PAGE_SIZE):
+            st.session_state.search_page += 1
+            st.rerun()
+
 with st.expander(" Audit Trail: Raw Transactional Data"):
-    st.dataframe(filtered_df[['bank', 'review_text', 'rating', 'sentiment_label', 'themes']], use_container_width=True)
\ No newline at end of file
+    # Keyset pagination: the stack holds the before_id of every page visited so far
+    selection = tuple(selected_banks)
+    if st.session_state.get('audit_selection') != selection:
+        st.session_state.audit_selection = selection
+        st.session_state.audit_cursors = [None]
+    cursors = st.session_state.audit_cursors
+
+    if df_raw is None:
+        page = fetch_audit_page(selection, cursors[-1])
+        next_cursor = int(page['review_id'].min()) if len(page) == AUDIT_PAGE_SIZE else None
+    else:
+        # The fallback frame is already in memory, so plain offsets are fine here
+        rows = df_raw.loc[df_raw['bank'].isin(selected_banks)]
+        start = cursors[-1] or 0
+        page = rows.iloc[start:start + AUDIT_PAGE_SIZE]
+        next_cursor = start + AUDIT_PAGE_SIZE if start + AUDIT_PAGE_SIZE < len(rows) else None
+
+    st.dataframe(page[['bank', 'review_text', 'rating', 'sentiment_label', 'themes']], use_container_width=True)
+    prev_col, page_col, next_col = st.columns([1, 4, 1])
+    if prev_col.button("◀ Newer", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    page_col.caption(f"Page {len(cursors)}")
+    if next_col.button("Older ▶", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
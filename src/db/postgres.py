@@ -1,36 +1,161 @@
 # src/db/postgres.py
 
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Text, Date, Float, ForeignKey, text
-from sqlalchemy.engine import Engine
-from sqlalchemy.exc import SQLAlchemyError
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from sqlalchemy import (
+    bindparam, create_engine, event, inspect, MetaData, Table, Column, Index, Integer, String, Text, Date, Float,
+    ForeignKey, text
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import (
+    DBAPIError, DisconnectionError, InterfaceError, SQLAlchemyError,
+    TimeoutError as PoolTimeoutError,
+)
 import pandas as pd
 from pathlib import Path
+from src import instrumentation
 from src.config import config
+from src.db import search
+import datetime
+import functools
+import hashlib
+import io
 import json
+import random
+import threading
+import time
 
 _engine: Engine = None
 
+# Columns written by insert_reviews, in COPY order
+REVIEW_COLUMNS = [
+    'bank_id', 'review_text', 'rating', 'review_date', 'sentiment_label',
+    'sentiment_score', 'themes', 'source', 'content_hash', 'model_version', 'themes_version',
+]
+# Columns refreshed when an existing review is upserted
+UPSERT_COLUMNS = ['rating', 'sentiment_label', 'sentiment_score', 'themes', 'source', 'model_version', 'themes_version']
+# Optional input columns; rows without them are stored unversioned and picked up by rescoring
+VERSION_COLUMNS = ['model_version', 'themes_version']
+
+# Text search configuration: 'simple' lowercases without stemming, so Amharic and English index alike
+SEARCH_CONFIG = 'simple'
+SEARCH_COLUMNS = ['review_id', 'bank', 'review_date', 'review_text', 'rating', 'sentiment_label', 'rank']
+
+# Counters behind get_pool_metrics(); updated from pool events and with_retry
+_pool_stats = {'connects': 0, 'checkouts': 0, 'invalidations': 0, 'retries': 0,
+               'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+_pool_stats_lock = threading.Lock()
+
+
+def _count(key: str, amount=1):
+    with _pool_stats_lock:
+        _pool_stats[key] += amount
+
+
+def _instrument(engine: Engine):
+    """Count connects, checkouts and invalidations on the engine's pool, and time checkout waits."""
+    event.listen(engine.pool, 'connect', lambda *_: _count('connects'))
+    event.listen(engine.pool, 'checkout', lambda *_: _count('checkouts'))
+    event.listen(engine.pool, 'invalidate', lambda *_: _count('invalidations'))
+
+    # Wait = time from asking the engine for a connection to holding one, pre-ping included
+    connect = engine.connect
+
+    @functools.wraps(connect)
+    def timed_connect():
+        started = time.perf_counter()
+        conn = connect()
+        waited = time.perf_counter() - started
+        with _pool_stats_lock:
+            _pool_stats['wait_seconds_total'] += waited
+            _pool_stats['wait_seconds_max'] = max(_pool_stats['wait_seconds_max'], waited)
+        return conn
+
+    engine.connect = timed_connect
+
+
 def get_engine() -> Engine:
-    """Create or return a singleton SQLAlchemy engine."""
+    """Create or return a singleton SQLAlchemy engine with a pre-pinged, recycled connection pool."""
     global _engine
     if _engine is None:
-        _engine = create_engine(config.DB_URL)
+        kwargs = {'pool_pre_ping': True}
+        if make_url(config.DB_URL).get_backend_name() == 'postgresql':
+            kwargs.update(
+                pool_size=config.DB_POOL_SIZE,
+                max_overflow=config.DB_MAX_OVERFLOW,
+                pool_timeout=config.DB_POOL_TIMEOUT,
+                pool_recycle=config.DB_POOL_RECYCLE,
+                connect_args={'options': f'-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}'},
+            )
+        _engine = create_engine(config.DB_URL, **kwargs)
+        _instrument(_engine)
     return _engine
 
 
-def create_schema():
-    """Create the database schema for banks and reviews."""
-    engine = get_engine()
+def get_pool_metrics() -> Dict[str, float]:
+    """Current pool gauges (size, checked out, overflow) plus cumulative connection counters."""
+    pool = get_engine().pool
+    with _pool_stats_lock:
+        metrics = dict(_pool_stats)
+    for name in ('size', 'checkedout', 'checkedin', 'overflow'):
+        gauge = getattr(pool, name, None)
+        metrics[name] = gauge() if callable(gauge) else 0
+    return metrics
+
+
+def pool_metrics_text(prefix: str = 'reviews_db_pool') -> str:
+    """get_pool_metrics() in the Prometheus text exposition format, for a scrape endpoint."""
+    return ''.join(f'{prefix}_{name} {value}\n' for name, value in get_pool_metrics().items())
+
+
+# SQLSTATEs worth retrying besides connection exceptions (class 08): serialization failure, deadlock
+_RETRY_SQLSTATES = {'40001', '40P01'}
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """
+    Dropped connections, pool timeouts, serialization failures and deadlocks are worth
+    retrying. Other errors (statement timeouts, auth failures, missing tables, SQL errors)
+    would fail the same way again.
+    """
+    if isinstance(exc, (DisconnectionError, PoolTimeoutError)):
+        return True
+    if isinstance(exc, DBAPIError):
+        if exc.connection_invalidated or isinstance(exc, InterfaceError):
+            return True
+        # psycopg2 exposes the SQLSTATE as pgcode, psycopg 3 as sqlstate
+        code = getattr(exc.orig, 'pgcode', None) or getattr(exc.orig, 'sqlstate', None) or ''
+        return code.startswith('08') or code in _RETRY_SQLSTATES
+    return False
+
+
+def with_retry(fn: Callable) -> Callable:
+    """Retry fn on transient database errors with exponential backoff and jitter."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(config.DB_MAX_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except SQLAlchemyError as e:
+                if attempt == config.DB_MAX_RETRIES or not _is_transient(e):
+                    raise
+                _count('retries')
+                delay = min(config.DB_BACKOFF_MAX, config.DB_BACKOFF_BASE * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+    return wrapper
+
+
+def _metadata() -> MetaData:
     metadata = MetaData()
 
-    banks = Table(
+    Table(
         'banks', metadata,
         Column('bank_id', Integer, primary_key=True),
         Column('bank_name', String, unique=True, nullable=False),
         Column('app_name', String)
     )
 
-    reviews = Table(
+    Table(
         'reviews', metadata,
         Column('review_id', Integer, primary_key=True),
         Column('bank_id', Integer, ForeignKey('banks.bank_id'), nullable=False),
@@ -39,87 +164,700 @@ def create_schema():
         Column('review_date', Date),
         Column('sentiment_label', String(20)),
         Column('sentiment_score', Float),
-        Column('themes', Text), 
+        # JSON array of theme strings; JSONB (GIN-indexed) on PostgreSQL, JSON text elsewhere
+        Column('themes', Text().with_variant(JSONB(), 'postgresql')),
         Column('source', String(50)),
+        # sha256 of review text + date; with bank_id it is the natural key used for upserts
+        Column('content_hash', String(64)),
+        # Versions of the sentiment model / theme logic that produced the stored results (NULL = unknown)
+        Column('model_version', String(100)),
+        Column('themes_version', String(100)),
+        Index('uq_reviews_bank_content', 'bank_id', 'content_hash', unique=True),
+        Index('ix_reviews_bank_date', 'bank_id', 'review_date'),
+        Index('ix_reviews_sentiment_label', 'sentiment_label'),
+        Index('ix_reviews_themes_gin', 'themes', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+    # Pre-aggregated rollups kept in step with reviews by insert_reviews; the dashboard reads these
+    Table(
+        'review_rollups', metadata,
+        Column('bank_id', Integer, ForeignKey('banks.bank_id'), nullable=False),
+        Column('review_date', Date),
+        Column('sentiment_label', String(20)),
+        Column('rating', Integer),
+        Column('review_count', Integer, nullable=False),
+        Column('score_sum', Float, nullable=False),
+        Index('ix_review_rollups_bank_date', 'bank_id', 'review_date'),
+    )
+
+    Table(
+        'theme_rollups', metadata,
+        Column('bank_id', Integer, ForeignKey('banks.bank_id'), nullable=False),
+        Column('review_date', Date),
+        Column('theme', Text, nullable=False),
+        Column('review_count', Integer, nullable=False),
+        Column('score_sum', Float, nullable=False),
+        Index('ix_theme_rollups_bank_date', 'bank_id', 'review_date'),
     )
+    return metadata
+
+
+def _upgrade_schema(engine: Engine, metadata: MetaData):
+    """Add columns and indexes introduced after a table was first created."""
+    with engine.begin() as conn:
+        # Inspect on the same connection: a second one would block on the ALTER TABLE locks
+        inspector = inspect(conn)
+        for table in metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    col_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+
+        if engine.dialect.name == 'postgresql':
+            inspector.clear_cache()
+            themes_type = next(c['type'] for c in inspector.get_columns('reviews') if c['name'] == 'themes')
+            if not isinstance(themes_type, JSONB):
+                conn.execute(text("ALTER TABLE reviews ALTER COLUMN themes TYPE JSONB USING themes::jsonb"))
+
+        # Deleting duplicates is destructive, so the backfill is left to an explicit migration
+        if conn.execute(text("SELECT 1 FROM reviews WHERE content_hash IS NULL LIMIT 1")).first() is not None:
+            print("⚠️ Some reviews have no content_hash and may be duplicated; "
+                  "run scripts/migrate_content_hashes.py to backfill it")
 
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        _create_search_index(conn)
+
+        # Backfill rollups for reviews loaded before the rollup tables existed
+        if conn.execute(text("SELECT 1 FROM review_rollups LIMIT 1")).first() is None:
+            _refresh_rollups(conn, incremental=False)
+
+
+def _create_search_index(conn: Connection):
+    """
+    Full-text index on review_text. PostgreSQL: a stored tsvector column maintained by the
+    server, with a GIN index. SQLite: an external-content FTS5 table kept in step by triggers.
+    """
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text(
+            "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', review_text)) STORED"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reviews_search_gin ON reviews USING gin (search_vector)"))
+    elif conn.dialect.name == 'sqlite':
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'reviews_fts'")).first()
+        if exists:
+            return
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE reviews_fts USING fts5("
+            "review_text, content='reviews', content_rowid='review_id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER reviews_fts_ai AFTER INSERT ON reviews BEGIN "
+            "INSERT INTO reviews_fts (rowid, review_text) VALUES (new.review_id, new.review_text); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER reviews_fts_ad AFTER DELETE ON reviews BEGIN "
+            "INSERT INTO reviews_fts (reviews_fts, rowid, review_text) "
+            "VALUES ('delete', old.review_id, old.review_text); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER reviews_fts_au AFTER UPDATE OF review_text ON reviews BEGIN "
+            "INSERT INTO reviews_fts (reviews_fts, rowid, review_text) "
+            "VALUES ('delete', old.review_id, old.review_text); "
+            "INSERT INTO reviews_fts (rowid, review_text) VALUES (new.review_id, new.review_text); END"
+        ))
+        # Index reviews loaded before the FTS table existed
+        conn.execute(text("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')"))
+
+
+@with_retry
+def create_schema():
+    """Create the database schema for banks and reviews."""
+    engine = get_engine()
+    metadata = _metadata()
     metadata.create_all(engine)
+    _upgrade_schema(engine, metadata)
     print("✅ Database schema created successfully.")
 
 
-def insert_reviews(df: pd.DataFrame, bank_name: str):
+def content_hash(review_text: str, review_date) -> str:
+    """Stable hash of a review's text and date, used as its natural key within a bank."""
+    day = pd.Timestamp(review_date).strftime('%Y-%m-%d') if pd.notna(review_date) else ''
+    return hashlib.sha256(f"{review_text}\x1f{day}".encode('utf-8')).hexdigest()
+
+
+@with_retry
+def migrate_content_hashes(dry_run: bool = False) -> dict:
+    """
+    One-time migration for reviews loaded before content_hash existed: compute the hash with
+    content_hash(), delete every later copy of a (bank, content_hash) pair (the lowest review_id
+    is kept) and store the hash on the rest. Rollups are rebuilt when reviews were deleted.
+
+    Args:
+        dry_run (bool): Only count what would change.
+    Returns:
+        dict with backfilled (hashes written) and deleted (duplicate reviews removed).
+    """
+    with get_engine().begin() as conn:
+        legacy = pd.read_sql(text(
+            "SELECT review_id, bank_id, review_text, review_date FROM reviews WHERE content_hash IS NULL"
+        ), conn)
+        if legacy.empty:
+            print("ℹ️ Every review has a content_hash; nothing to migrate")
+            return {'backfilled': 0, 'deleted': 0}
+        legacy['content_hash'] = [content_hash(t, d) for t, d in zip(legacy['review_text'], legacy['review_date'])]
+        # Rows that already have a hash only matter for the banks being backfilled
+        hashed = pd.read_sql(text(
+            "SELECT review_id, bank_id, content_hash FROM reviews "
+            "WHERE content_hash IS NOT NULL AND bank_id IN :banks"
+        ).bindparams(bindparam('banks', expanding=True)), conn,
+            params={'banks': legacy['bank_id'].unique().tolist()})
+
+        rows = pd.concat([hashed, legacy[['review_id', 'bank_id', 'content_hash']]]).sort_values('review_id')
+        duplicate = rows.duplicated(['bank_id', 'content_hash'])
+        deleted = rows.loc[duplicate, 'review_id'].astype(int).tolist()
+        backfill = legacy.loc[~legacy['review_id'].isin(deleted), ['review_id', 'content_hash']]
+        result = {'backfilled': len(backfill), 'deleted': len(deleted)}
+        if dry_run:
+            print(f"ℹ️ Would backfill {result['backfilled']} content hashes and delete {result['deleted']} duplicates")
+            return result
+
+        # Duplicates go first, so no backfilled hash collides with the unique (bank_id, content_hash) index
+        if deleted:
+            conn.execute(text("DELETE FROM reviews WHERE review_id = :review_id"),
+                         [{'review_id': i} for i in deleted])
+        conn.execute(text("UPDATE reviews SET content_hash = :content_hash WHERE review_id = :review_id"),
+                     [{'review_id': int(i), 'content_hash': h} for i, h in backfill.itertuples(index=False)])
+        if deleted:
+            _refresh_rollups(conn, incremental=False)
+    print(f"✅ Backfilled {result['backfilled']} content hashes and deleted {result['deleted']} duplicate reviews")
+    return result
+
+
+def _themes_to_json(val) -> str:
+    """Ensure themes are JSON strings."""
+    if isinstance(val, list):
+        return json.dumps(val)
+    elif isinstance(val, str):
+        val = val.strip()
+        if val.startswith('[') and val.endswith(']'):
+            try:
+                return json.dumps(json.loads(val.replace("'", '"')))
+            except Exception:
+                return json.dumps([val])
+        else:
+            return json.dumps([val])
+    else:
+        return json.dumps([])
+
+
+def _prepare_reviews(df: pd.DataFrame, bank_id: int) -> pd.DataFrame:
+    """Shape a chunk of reviews into REVIEW_COLUMNS with DB-ready values."""
+    insert_df = df[['review_text','rating','review_date','sentiment_label','sentiment_score','source','identified_theme']].copy()
+    for col in VERSION_COLUMNS:
+        insert_df[col] = df[col] if col in df.columns else None
+    insert_df.rename(columns={'identified_theme':'themes'}, inplace=True)
+    insert_df['bank_id'] = bank_id
+    insert_df['review_text'] = insert_df['review_text'].fillna('').astype(str)
+    insert_df['rating'] = pd.to_numeric(insert_df['rating'], errors='coerce').round().astype('Int64')
+
+    # Convert review_date to plain dates
+    dates = pd.to_datetime(insert_df['review_date'], errors='coerce')
+    insert_df['review_date'] = [d.date() if pd.notna(d) else None for d in dates]
+
+    insert_df['themes'] = insert_df['themes'].apply(_themes_to_json)
+    insert_df['content_hash'] = [content_hash(t, d) for t, d in zip(insert_df['review_text'], insert_df['review_date'])]
+    # A statement may not touch the same key twice, so keep the last copy within the chunk
+    insert_df = insert_df.drop_duplicates(subset=['content_hash'], keep='last')
+    return insert_df[REVIEW_COLUMNS]
+
+
+def _get_or_create_bank(conn: Connection, bank_name: str) -> int:
+    # Check if bank exists
+    existing = conn.execute(
+        text("SELECT bank_id FROM banks WHERE bank_name = :bn"),
+        {"bn": bank_name}
+    ).fetchone()
+
+    if existing is None:
+        conn.execute(
+            text("INSERT INTO banks (bank_name, app_name) VALUES (:bn, :app)"),
+            {"bn": bank_name, "app": bank_name}
+        )
+        existing = conn.execute(
+            text("SELECT bank_id FROM banks WHERE bank_name = :bn"),
+            {"bn": bank_name}
+        ).fetchone()
+
+    return existing[0]
+
+
+def _load_staging(conn: Connection, chunk: pd.DataFrame):
+    """Stream a prepared chunk into reviews_staging (COPY on PostgreSQL, executemany elsewhere)."""
+    cols = ', '.join(REVIEW_COLUMNS)
+    if conn.dialect.name == 'postgresql':
+        buf = io.StringIO()
+        chunk.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        sql = f"COPY reviews_staging ({cols}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (review_text))"
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                cursor.copy_expert(sql, buf)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buf.getvalue())
+        finally:
+            cursor.close()
+    else:
+        records = chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+        params = ', '.join(f':{c}' for c in REVIEW_COLUMNS)
+        conn.execute(text(f"INSERT INTO reviews_staging ({cols}) VALUES ({params})"), records)
+
+
+def _themes_join(dialect: str):
+    """(theme expression, FROM fragment) that expands r.themes into one row per theme."""
+    if dialect == 'postgresql':
+        return "t.theme", ("CROSS JOIN LATERAL jsonb_array_elements_text("
+                           "CASE WHEN jsonb_typeof(r.themes) = 'array' THEN r.themes ELSE '[]'::jsonb END) AS t(theme)")
+    return "t.value", "JOIN json_each(CASE WHEN json_valid(r.themes) THEN r.themes ELSE '[]' END) AS t"
+
+
+def _refresh_rollups(conn: Connection, incremental: bool = True):
+    """
+    Recompute rollup rows from reviews. Incrementally, only the (bank, day) keys present in
+    reviews_staging are rebuilt: dated keys by an equality join from the distinct staged keys
+    (one index range scan on ix_reviews_bank_date per key), undated reviews by a separate
+    review_date IS NULL branch. Otherwise both rollup tables are rebuilt from scratch.
+    """
+    if incremental:
+        # (rollup DELETE condition, reviews source, reviews condition) per kind of key
+        scopes = [
+            ("WHERE ({t}.bank_id, {t}.review_date) IN (SELECT bank_id, review_date FROM reviews_staging)",
+             # CROSS JOIN pins the staged keys as the outer loop on SQLite; PostgreSQL plans it as a join
+             "(SELECT DISTINCT bank_id, review_date FROM reviews_staging WHERE review_date IS NOT NULL) k "
+             "CROSS JOIN reviews r", "WHERE r.bank_id = k.bank_id AND r.review_date = k.review_date"),
+            ("WHERE {t}.review_date IS NULL AND {t}.bank_id IN "
+             "(SELECT bank_id FROM reviews_staging WHERE review_date IS NULL)", "reviews r", None),
+        ]
+    else:
+        scopes = [("", "reviews r", "")]
+    theme, themes_from = _themes_join(conn.dialect.name)
+    for delete_where, source, where in scopes:
+        where = delete_where.format(t='r') if where is None else where
+        for table in ('review_rollups', 'theme_rollups'):
+            conn.execute(text(f"DELETE FROM {table} {delete_where.format(t=table)}"))
+        conn.execute(text(
+            "INSERT INTO review_rollups (bank_id, review_date, sentiment_label, rating, review_count, score_sum) "
+            "SELECT r.bank_id, r.review_date, r.sentiment_label, r.rating, COUNT(*), "
+            f"SUM(COALESCE(r.sentiment_score, 0)) FROM {source} {where} "
+            "GROUP BY r.bank_id, r.review_date, r.sentiment_label, r.rating"
+        ))
+        conn.execute(text(
+            "INSERT INTO theme_rollups (bank_id, review_date, theme, review_count, score_sum) "
+            f"SELECT r.bank_id, r.review_date, {theme}, COUNT(*), SUM(COALESCE(r.sentiment_score, 0)) "
+            f"FROM {source} {themes_from} {where} GROUP BY r.bank_id, r.review_date, {theme}"
+        ))
+
+
+@with_retry
+def refresh_rollups():
+    """Rebuild the rollup tables from scratch, e.g. after reviews were edited outside insert_reviews."""
+    with get_engine().begin() as conn:
+        _refresh_rollups(conn, incremental=False)
+
+
+def _iter_chunks(df: Union[pd.DataFrame, Iterable[pd.DataFrame]], chunksize: int):
+    if isinstance(df, pd.DataFrame):
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    else:
+        yield from df
+
+
+def insert_reviews(df: Union[pd.DataFrame, Iterable[pd.DataFrame]], bank_name: str,
+                   chunksize: int = None, on_conflict: str = 'nothing', raise_errors: bool = False) -> int:
     """
     Insert reviews into the database.
     Expects df to have a column 'identified_theme' as a list or string.
     Automatically converts lists to JSON strings for DB storage.
+
+    Rows are loaded chunk by chunk (df may also be an iterable of DataFrames, e.g.
+    pd.read_csv(..., chunksize=...)) into a temporary staging table via COPY, then
+    merged into reviews on the (bank_id, content_hash) natural key. With
+    on_conflict='nothing' existing reviews are kept; with 'update' their rating,
+    sentiment, themes and source are refreshed. The rollup rows for every
+    (bank, day) touched by a chunk are recomputed in the same transaction.
+    Returns the number of rows written. Failures are reported and 0 is returned,
+    unless raise_errors is set (the pipeline needs to know a load failed).
     """
-    engine = get_engine()
+    if on_conflict not in ('nothing', 'update'):
+        raise ValueError(f"on_conflict must be 'nothing' or 'update', got {on_conflict!r}")
+    chunksize = chunksize or config.DB_LOAD_CHUNKSIZE
+    cols = ', '.join(REVIEW_COLUMNS)
+    if on_conflict == 'update':
+        action = 'DO UPDATE SET ' + ', '.join(f'{c} = excluded.{c}' for c in UPSERT_COLUMNS)
+    else:
+        action = 'DO NOTHING'
+    merge_sql = text(
+        f"INSERT INTO reviews ({cols}) SELECT {cols} FROM reviews_staging WHERE true "
+        f"ON CONFLICT (bank_id, content_hash) {action}"
+    )
+
+    def load() -> int:
+        written = 0
+        with get_engine().begin() as conn:  # Transaction auto-commit
+            bank_id = _get_or_create_bank(conn, bank_name)
+            conn.execute(text(f"CREATE TEMP TABLE reviews_staging AS SELECT {cols} FROM reviews WHERE 1 = 0"))
+            for chunk in _iter_chunks(df, chunksize):
+                if chunk.empty:
+                    continue
+                with instrumentation.timer('db.load_chunk'):
+                    _load_staging(conn, _prepare_reviews(chunk, bank_id))
+                    merged = conn.execute(merge_sql).rowcount
+                    if merged:
+                        _refresh_rollups(conn)
+                written += merged
+                conn.execute(text("DELETE FROM reviews_staging"))
+            conn.execute(text("DROP TABLE reviews_staging"))
+        return written
 
+    written = 0
     try:
-        with engine.begin() as conn:  # Transaction auto-commit
-            # Check if bank exists
-            existing = conn.execute(
-                text("SELECT bank_id FROM banks WHERE bank_name = :bn"),
-                {"bn": bank_name}
-            ).fetchone()
-
-            if existing is None:
-                conn.execute(
-                    text("INSERT INTO banks (bank_name, app_name) VALUES (:bn, :app)"),
-                    {"bn": bank_name, "app": bank_name}
-                )
-                existing = conn.execute(
-                    text("SELECT bank_id FROM banks WHERE bank_name = :bn"),
-                    {"bn": bank_name}
-                ).fetchone()
-
-            bank_id = existing[0]
-
-            insert_df = df[['review_text','rating','review_date','sentiment_label','sentiment_score','source','identified_theme']].copy()
-            insert_df.rename(columns={'identified_theme':'themes'}, inplace=True)
-            insert_df['bank_id'] = bank_id
-
-            # Convert review_date to datetime
-            insert_df['review_date'] = pd.to_datetime(insert_df['review_date'], errors='coerce')
-
-            # Ensure themes are JSON strings
-            def to_json(val):
-                if isinstance(val, list):
-                    return json.dumps(val)
-                elif isinstance(val, str):
-                    val = val.strip()
-                    if val.startswith('[') and val.endswith(']'):
-                        try:
-                            return json.dumps(json.loads(val.replace("'", '"')))
-                        except Exception:
-                            return json.dumps([val])
-                    else:
-                        return json.dumps([val])
-                else:
-                    return json.dumps([])
-
-            insert_df['themes'] = insert_df['themes'].apply(to_json)
-
-            # Insert into DB
-            insert_df.to_sql('reviews', con=conn, if_exists='append', index=False, method='multi')
-            print(f"✅ Inserted {len(insert_df)} reviews for bank '{bank_name}'")
+        # The load is one transaction, so a retry starts clean; a chunk iterator cannot be replayed, though
+        started = time.perf_counter()
+        written = with_retry(load)() if isinstance(df, pd.DataFrame) else load()
+        elapsed = time.perf_counter() - started
+        instrumentation.observe('db.load', elapsed)
+        instrumentation.inc('db.rows_written', written)
+        instrumentation.set_gauge('db.load_rows_per_sec', written / elapsed if elapsed else 0.0)
+        print(f"✅ Inserted {written} reviews for bank '{bank_name}'")
 
     except Exception as e:
         print(f"❌ Failed to insert reviews for '{bank_name}': {e}")
+        if raise_errors:
+            raise
+    return written
+
+
+def _stale_condition(model_version: Optional[str], themes_version: Optional[str]) -> str:
+    checks = []
+    if model_version is not None:
+        checks.append("model_version IS NULL OR model_version <> :model_version")
+    if themes_version is not None:
+        checks.append("themes_version IS NULL OR themes_version <> :themes_version")
+    return " OR ".join(checks) or "1 = 0"
+
+
+def _version_params(model_version: Optional[str], themes_version: Optional[str]) -> dict:
+    params = {}
+    if model_version is not None:
+        params['model_version'] = model_version
+    if themes_version is not None:
+        params['themes_version'] = themes_version
+    return params
+
+
+@with_retry
+def count_stale_reviews(model_version: Optional[str] = None, themes_version: Optional[str] = None) -> int:
+    """Number of reviews scored by another (or an unknown) version; None skips that check."""
+    sql = f"SELECT COUNT(*) FROM reviews WHERE {_stale_condition(model_version, themes_version)}"
+    with get_engine().connect() as conn:
+        return conn.execute(text(sql), _version_params(model_version, themes_version)).scalar()
+
+
+@with_retry
+def get_stale_reviews(model_version: Optional[str] = None, themes_version: Optional[str] = None,
+                      after_id: int = 0, limit: int = 1000) -> pd.DataFrame:
+    """
+    The next `limit` stale reviews with review_id > after_id, in review_id order:
+    [review_id, review_text, model_version, themes_version].
+    """
+    sql = text(
+        "SELECT review_id, review_text, model_version, themes_version FROM reviews "
+        f"WHERE review_id > :after_id AND ({_stale_condition(model_version, themes_version)}) "
+        "ORDER BY review_id LIMIT :limit"
+    )
+    params = {'after_id': after_id, 'limit': limit, **_version_params(model_version, themes_version)}
+    with get_engine().connect() as conn:
+        return pd.read_sql(sql, con=conn, params=params)
+
+
+@with_retry
+def update_scores(sentiment: Optional[List[dict]] = None, themes: Optional[List[dict]] = None) -> int:
+    """
+    Write re-scored results back with batched UPDATEs and refresh the affected rollups, in one
+    transaction. `sentiment` rows are {review_id, sentiment_label, sentiment_score, model_version};
+    `themes` rows are {review_id, themes (list), themes_version}. Returns the number of reviews touched.
+    """
+    sentiment, themes = sentiment or [], themes or []
+    ids = sorted({r['review_id'] for r in sentiment} | {r['review_id'] for r in themes})
+    if not ids:
+        return 0
+    with get_engine().begin() as conn:
+        themes_param = "CAST(:themes AS JSONB)" if conn.dialect.name == 'postgresql' else ":themes"
+        if sentiment:
+            conn.execute(text(
+                "UPDATE reviews SET sentiment_label = :sentiment_label, sentiment_score = :sentiment_score, "
+                "model_version = :model_version WHERE review_id = :review_id"
+            ), sentiment)
+        if themes:
+            conn.execute(text(
+                f"UPDATE reviews SET themes = {themes_param}, themes_version = :themes_version "
+                "WHERE review_id = :review_id"
+            ), [{**r, 'themes': _themes_to_json(r['themes'])} for r in themes])
+
+        # _refresh_rollups rebuilds the (bank, day) keys listed in reviews_staging
+        conn.execute(text("CREATE TEMP TABLE reviews_staging AS SELECT bank_id, review_date FROM reviews WHERE 1 = 0"))
+        conn.execute(
+            text("INSERT INTO reviews_staging SELECT DISTINCT bank_id, review_date FROM reviews "
+                 "WHERE review_id IN :ids").bindparams(bindparam('ids', expanding=True)),
+            {'ids': ids},
+        )
+        _refresh_rollups(conn)
+        conn.execute(text("DROP TABLE reviews_staging"))
+    return len(ids)
+
+
+def _bank_filter(banks: Optional[List[str]]):
+    """SQL condition and params restricting a query to the given bank names (None = all)."""
+    if banks is None:
+        return None, {}
+    return "b.bank_name IN :banks", {"banks": list(banks)}
+
+
+@with_retry
+def _read_aggregate(sql: str, banks: Optional[List[str]], conditions: Iterable[str] = (), **params) -> pd.DataFrame:
+    bank_cond, bank_params = _bank_filter(banks)
+    clauses = [c for c in (bank_cond, *conditions) if c]
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    stmt = text(sql.format(where=where))
+    # List-valued params feed IN clauses; dates are bound as DATE so SQLite compares ISO strings
+    binds = [bindparam(name, expanding=True) for name, value in params.items() if isinstance(value, (list, tuple))]
+    binds += [bindparam(name, type_=Date) for name, value in params.items() if isinstance(value, datetime.date)]
+    if bank_params:
+        binds.append(bindparam('banks', expanding=True, type_=String))
+    if binds:
+        stmt = stmt.bindparams(*binds)
+    with get_engine().connect() as conn:
+        return pd.read_sql(stmt, con=conn, params={**bank_params, **params})
+
+
+def get_bank_names() -> List[str]:
+    """Names of all banks that have reviews."""
+    df = _read_aggregate(
+        "SELECT DISTINCT b.bank_name AS bank FROM banks b JOIN review_rollups r ON r.bank_id = b.bank_id {where} "
+        "ORDER BY bank", None
+    )
+    return df['bank'].tolist()
+
+
+def get_kpis(banks: Optional[List[str]] = None) -> Dict[str, float]:
+    """Volume, average rating, POSITIVE share (%) and polarization index for the selection."""
+    df = _read_aggregate(
+        "SELECT SUM(r.review_count) AS volume, "
+        "CAST(SUM(r.rating * r.review_count) AS FLOAT) "
+        "/ NULLIF(SUM(CASE WHEN r.rating IS NOT NULL THEN r.review_count ELSE 0 END), 0) AS avg_rating, "
+        "SUM(CASE WHEN r.sentiment_label = 'POSITIVE' THEN r.review_count ELSE 0 END) AS positive, "
+        "SUM(CASE WHEN r.rating = 1 THEN r.review_count ELSE 0 END) AS ones, "
+        "SUM(CASE WHEN r.rating = 5 THEN r.review_count ELSE 0 END) AS fives "
+        "FROM review_rollups r JOIN banks b ON r.bank_id = b.bank_id {where}", banks
+    )
+    row = df.fillna(0).iloc[0]
+    volume = int(row['volume'])
+    return {
+        'volume': volume,
+        'avg_rating': float(row['avg_rating']),
+        'positive_pct': float(row['positive']) / volume * 100 if volume else 0.0,
+        'polarization': abs(float(row['fives']) - float(row['ones'])) / volume if volume else 0.0,
+    }
+
+
+def get_sentiment_counts(banks: Optional[List[str]] = None) -> pd.DataFrame:
+    """Review counts per bank and sentiment label: [bank, sentiment_label, count]."""
+    return _read_aggregate(
+        "SELECT b.bank_name AS bank, r.sentiment_label, SUM(r.review_count) AS count "
+        "FROM review_rollups r JOIN banks b ON r.bank_id = b.bank_id {where} "
+        "GROUP BY b.bank_name, r.sentiment_label ORDER BY bank, r.sentiment_label", banks
+    )
+
+
+def get_rating_histogram(banks: Optional[List[str]] = None) -> pd.DataFrame:
+    """Review counts per bank and star rating: [bank, rating, count]."""
+    return _read_aggregate(
+        "SELECT b.bank_name AS bank, r.rating, SUM(r.review_count) AS count "
+        "FROM review_rollups r JOIN banks b ON r.bank_id = b.bank_id {where} "
+        "GROUP BY b.bank_name, r.rating ORDER BY bank, r.rating", banks
+    )
+
+
+def get_polarization(banks: Optional[List[str]] = None) -> pd.DataFrame:
+    """Polarization index |#5-star - #1-star| / volume per bank: [bank, volume, polarization]."""
+    df = _read_aggregate(
+        "SELECT b.bank_name AS bank, SUM(r.review_count) AS volume, "
+        "SUM(CASE WHEN r.rating = 1 THEN r.review_count ELSE 0 END) AS ones, "
+        "SUM(CASE WHEN r.rating = 5 THEN r.review_count ELSE 0 END) AS fives "
+        "FROM review_rollups r JOIN banks b ON r.bank_id = b.bank_id {where} GROUP BY b.bank_name ORDER BY bank", banks
+    )
+    df['polarization'] = (df['fives'] - df['ones']).abs() / df['volume']
+    return df[['bank', 'volume', 'polarization']]
+
+
+def get_theme_impact(banks: Optional[List[str]] = None, min_volume: int = 1) -> pd.DataFrame:
+    """Mean sentiment score (missing = 0) and review count per theme: [Theme, Impact, Volume]."""
+    return _read_aggregate(
+        'SELECT r.theme AS "Theme", SUM(r.score_sum) / SUM(r.review_count) AS "Impact", '
+        'SUM(r.review_count) AS "Volume" '
+        "FROM theme_rollups r JOIN banks b ON r.bank_id = b.bank_id {where} "
+        'GROUP BY r.theme HAVING SUM(r.review_count) >= :min_volume ORDER BY "Impact" DESC', banks,
+        min_volume=min_volume
+    )
+
+
+def get_daily_rollups(banks: Optional[List[str]] = None, start=None, end=None) -> pd.DataFrame:
+    """
+    The daily rollup with bank names, [bank, review_date, sentiment_label, rating, review_count,
+    score_sum], optionally restricted to review dates in [start, end].
+    """
+    conditions, params = [], {}
+    if start is not None:
+        conditions.append("r.review_date >= :start")
+        params['start'] = pd.Timestamp(start).date()
+    if end is not None:
+        conditions.append("r.review_date <= :end")
+        params['end'] = pd.Timestamp(end).date()
+    return _read_aggregate(
+        "SELECT b.bank_name AS bank, r.review_date, r.sentiment_label, r.rating, r.review_count, r.score_sum "
+        "FROM review_rollups r JOIN banks b ON r.bank_id = b.bank_id {where}", banks, conditions, **params
+    )
+
+
+def get_rollups(banks: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Rollups with bank names, small enough to hold in memory and slice per selection:
+    'daily' [bank, review_date, sentiment_label, rating, review_count, score_sum] and
+    'themes' [bank, theme, review_count, score_sum]. The theme rollup is kept per day
+    for incremental refreshes, so it is summed per (bank, theme) in the database.
+    """
+    return {
+        'daily': get_daily_rollups(banks),
+        'themes': _read_aggregate(
+            "SELECT b.bank_name AS bank, r.theme, SUM(r.review_count) AS review_count, SUM(r.score_sum) AS score_sum "
+            "FROM theme_rollups r JOIN banks b ON r.bank_id = b.bank_id {where} GROUP BY b.bank_name, r.theme", banks
+        ),
+    }
+
+
+def get_recent_reviews(banks: Optional[List[str]] = None, limit: int = 500,
+                       before_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    The newest `limit` reviews for the selection, for display. Pages are keyset-paginated on
+    review_id: pass the smallest review_id of the previous page as before_id to get the next one.
+    """
+    conditions = ["r.review_id < :before_id"] if before_id is not None else []
+    return _read_aggregate(
+        "SELECT r.review_id, b.bank_name AS bank, r.review_text, r.rating, r.sentiment_label, r.themes "
+        "FROM reviews r JOIN banks b ON r.bank_id = b.bank_id {where} "
+        "ORDER BY r.review_id DESC LIMIT :limit", banks, conditions, limit=limit,
+        **({'before_id': before_id} if before_id is not None else {})
+    )
+
+
+@with_retry
+def get_reviews_after(after_id: int = 0, limit: int = 1000) -> pd.DataFrame:
+    """The next `limit` reviews with review_id > after_id, in review_id order: [review_id, review_text]."""
+    with get_engine().connect() as conn:
+        return pd.read_sql(
+            text("SELECT review_id, review_text FROM reviews WHERE review_id > :after_id ORDER BY review_id LIMIT :limit"),
+            con=conn, params={'after_id': after_id, 'limit': limit},
+        )
+
+
+def get_reviews_by_ids(review_ids: List[int]) -> pd.DataFrame:
+    """Reviews with the given ids, in the order given: [review_id, bank, review_text, rating, sentiment_label]."""
+    if not review_ids:
+        return pd.DataFrame(columns=['review_id', 'bank', 'review_text', 'rating', 'sentiment_label'])
+    df = _read_aggregate(
+        "SELECT r.review_id, b.bank_name AS bank, r.review_text, r.rating, r.sentiment_label "
+        "FROM reviews r JOIN banks b ON r.bank_id = b.bank_id {where}", None,
+        ["r.review_id IN :ids"], ids=[int(i) for i in review_ids]
+    )
+    return df.set_index('review_id').reindex(review_ids).dropna(how='all').reset_index()
+
+
+def search_reviews(query: str, banks: Optional[List[str]] = None, date_range: Optional[tuple] = None,
+                   limit: int = 50, offset: int = 0) -> pd.DataFrame:
+    """
+    Reviews matching a full-text query, best match first:
+    [review_id, bank, review_date, review_text, rating, sentiment_label, rank].
+
+    Args:
+        query (str): Words to match, e.g. 'otp or login failure' or '"login failure" -cbe'
+            (see src.db.search for the syntax).
+        banks (Optional[List[str]]): Restrict to these bank names (None = all).
+        date_range (Optional[tuple]): (start, end) review dates, inclusive; either may be None.
+        limit (int): Page size.
+        offset (int): Hits to skip, for the following pages.
+    """
+    groups = search.parse_query(query)
+    if not groups:
+        return pd.DataFrame(columns=SEARCH_COLUMNS)
+    conditions, params = [], {'limit': limit, 'offset': offset}
+    start, end = date_range or (None, None)
+    if start is not None:
+        conditions.append("r.review_date >= :date_from")
+        params['date_from'] = pd.Timestamp(start).strftime('%Y-%m-%d')
+    if end is not None:
+        conditions.append("r.review_date <= :date_to")
+        params['date_to'] = pd.Timestamp(end).strftime('%Y-%m-%d')
+
+    select = "SELECT r.review_id, b.bank_name AS bank, r.review_date, r.review_text, r.rating, r.sentiment_label, "
+    if get_engine().dialect.name == 'postgresql':
+        # The GIN index finds the matches; only those are ranked
+        sql = (select + "ts_rank_cd(r.search_vector, q) AS rank "
+               "FROM reviews r JOIN banks b ON r.bank_id = b.bank_id "
+               f"CROSS JOIN to_tsquery('{SEARCH_CONFIG}', :query) AS q {{where}} "
+               "ORDER BY rank DESC, r.review_id DESC LIMIT :limit OFFSET :offset")
+        conditions.append("r.search_vector @@ q")
+        params['query'] = search.to_tsquery(groups)
+    else:
+        # bm25() is lower-is-better; negate it so rank sorts the same way on both backends
+        sql = (select + "-reviews_fts.rank AS rank "
+               "FROM reviews_fts JOIN reviews r ON r.review_id = reviews_fts.rowid "
+               "JOIN banks b ON r.bank_id = b.bank_id {where} "
+               "ORDER BY reviews_fts.rank, r.review_id DESC LIMIT :limit OFFSET :offset")
+        conditions.append("reviews_fts MATCH :query")
+        params['query'] = search.to_fts5(groups)
+    with instrumentation.timer('db.search'):
+        return _read_aggregate(sql, banks, conditions, **params)
+
+
+@with_retry
+def _read_all_reviews() -> pd.DataFrame:
+    # Explicit columns keep the (server-maintained) search_vector out of the frame
+    cols = ', '.join(f'r.{c}' for c in ['review_id', *REVIEW_COLUMNS])
+    return pd.read_sql(
+        f'SELECT {cols}, b.bank_name as bank FROM reviews r JOIN banks b ON r.bank_id=b.bank_id',
+        con=get_engine()
+    )
 
 
 def get_all_reviews(use_fallback=True) -> pd.DataFrame:
-    """Retrieve all reviews joined with bank names."""
-    engine = get_engine()
+    """Retrieve all reviews joined with bank names, retrying transient errors before falling back."""
     try:
-        df = pd.read_sql(
-            'SELECT r.*, b.bank_name as bank FROM reviews r JOIN banks b ON r.bank_id=b.bank_id',
-            con=engine
-        )
-        return df
+        return _read_all_reviews()
     except Exception as e:
         print("⚠️ DB query failed:", e)
-        if use_fallback and Path(config.FALLBACK_CSV).exists():
+        fallback = Path(config.FALLBACK_CSV)
+        if use_fallback and fallback.exists():
+            if fallback.is_dir() or fallback.suffix == '.parquet':
+                from src.storage import columnar
+                print("ℹ️ Using fallback Parquet snapshot instead")
+                return columnar.read_reviews(fallback, memory_map=True)
             print("ℹ️ Using fallback CSV instead")
             return pd.read_csv(config.FALLBACK_CSV)
         raise
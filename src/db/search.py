@@ -0,0 +1,166 @@
+"""
+Review Search
+-------------
+Query parsing for full-text search over review_text, compiled to a PostgreSQL
+tsquery (matched against the GIN-indexed reviews.search_vector), to an SQLite
+FTS5 MATCH expression (the reviews_fts stand-in), or evaluated against an
+in-memory inverted index when the database is unreachable.
+
+Query syntax, the same on every backend:
+    otp or login failure      -> "otp" OR ("login" AND "failure")
+    "login failure" -cbe      -> the phrase, excluding reviews mentioning "cbe"
+Terms are case-insensitive words; adjacent terms are ANDed, OR separates alternatives.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import re
+
+import numpy as np
+import pandas as pd
+
+# Same notion of a word as the FTS tokenizers: runs of Unicode letters/digits (Ge'ez included)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_TERM_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+
+# A term is a tuple of words (more than one = phrase); a group is [(term, negated), ...]
+Term = Tuple[str, ...]
+Group = List[Tuple[Term, bool]]
+
+# BM25 parameters for the in-memory index
+_K1 = 1.2
+_B = 0.75
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower()) if isinstance(text, str) else []
+
+
+def parse_query(query: str) -> List[Group]:
+    """
+    Split a query into OR-groups of (term, negated) pairs. Groups without a
+    positive term cannot match on their own and are dropped.
+    """
+    groups: List[Group] = [[]]
+    for match in _TERM_RE.finditer(query or ""):
+        phrase_neg, phrase, word_neg, word = match.groups()
+        if word is not None and word.lower() == "or":
+            groups.append([])
+            continue
+        term = tuple(words(phrase if phrase is not None else word))
+        if term:
+            groups[-1].append((term, bool(phrase_neg or word_neg)))
+    return [g for g in groups if any(not neg for _, neg in g)]
+
+
+def to_tsquery(groups: Sequence[Group]) -> str:
+    """PostgreSQL to_tsquery() text: <-> for phrases, & within a group, | between groups."""
+    def term(t: Term, neg: bool) -> str:
+        body = " <-> ".join(t)
+        return f"!({body})" if neg else f"({body})"
+    return " | ".join("(" + " & ".join(term(t, neg) for t, neg in group) + ")" for group in groups)
+
+
+def to_fts5(groups: Sequence[Group]) -> str:
+    """SQLite FTS5 MATCH expression; FTS5's NOT is binary, so positive terms go first."""
+    def quoted(t: Term) -> str:
+        return '"' + " ".join(t).replace('"', '""') + '"'
+    parts = []
+    for group in groups:
+        positive = " AND ".join(quoted(t) for t, neg in group if not neg)
+        negative = "".join(f" NOT {quoted(t)}" for t, neg in group if neg)
+        parts.append(f"({positive}{negative})")
+    return " OR ".join(parts)
+
+
+class ReviewIndex:
+    """
+    In-memory inverted index over a sequence of texts, for search without a database.
+    Postings are stored CSR-style (documents sorted per term) with term frequencies,
+    and results are ranked with BM25. Phrases are checked against the candidate texts.
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        self.texts = pd.Series(list(texts), dtype=object).where(lambda s: s.map(lambda t: isinstance(t, str)), "")
+        tokens = self.texts.str.lower().str.findall(_WORD_RE)
+        self.lengths = tokens.str.len().to_numpy(dtype=np.float64)
+        self.avg_length = float(self.lengths.mean()) if len(self.lengths) else 0.0
+
+        exploded = tokens.explode().dropna()
+        codes, vocab = pd.factorize(exploded.to_numpy())
+        self.vocab = {word: i for i, word in enumerate(vocab)}
+        docs = exploded.index.to_numpy(dtype=np.int64)
+        # Unique (term, doc) pairs with their counts, ordered by term then document
+        pairs = codes.astype(np.int64) * max(len(self.texts), 1) + docs
+        pairs, self._tf = np.unique(pairs, return_counts=True)
+        self._terms = pairs // max(len(self.texts), 1)
+        self._docs = pairs % max(len(self.texts), 1)
+        self._offsets = np.searchsorted(self._terms, np.arange(len(vocab) + 1))
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def postings(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted document positions, term frequencies) for one word."""
+        code = self.vocab.get(word)
+        if code is None:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        start, end = self._offsets[code], self._offsets[code + 1]
+        return self._docs[start:end], self._tf[start:end]
+
+    def _term_docs(self, term: Term) -> np.ndarray:
+        docs = self.postings(term[0])[0]
+        for word in term[1:]:
+            docs = np.intersect1d(docs, self.postings(word)[0], assume_unique=True)
+        if len(term) > 1 and len(docs):
+            phrase = re.compile(r"\b" + r"\W+".join(map(re.escape, term)) + r"\b", re.IGNORECASE)
+            docs = docs[[bool(phrase.search(t)) for t in self.texts.iloc[docs]]]
+        return docs
+
+    def search(self, query: str, mask: Optional[np.ndarray] = None,
+               top: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions of matching texts and their BM25 scores, best first (ties: later position first).
+        `mask` (bool per text) restricts the candidates, e.g. to a bank selection; `top` keeps
+        only the best hits, which avoids sorting every match of a common word.
+        """
+        groups = parse_query(query)
+        matches = np.zeros(0, np.int64)
+        for group in groups:
+            docs = None
+            for term, neg in sorted(group, key=lambda item: item[1]):
+                term_docs = self._term_docs(term)
+                if neg:
+                    docs = np.setdiff1d(docs, term_docs, assume_unique=True)
+                else:
+                    docs = term_docs if docs is None else np.intersect1d(docs, term_docs, assume_unique=True)
+            matches = np.union1d(matches, docs)
+        if mask is not None:
+            matches = matches[np.asarray(mask, dtype=bool)[matches]]
+        if not len(matches):
+            return matches, np.zeros(0)
+
+        scores = np.zeros(len(matches))
+        norm = _K1 * (1 - _B + _B * self.lengths[matches] / (self.avg_length or 1.0))
+        positive = {word for group in groups for term, neg in group if not neg for word in term}
+        for word in positive:
+            docs, tf = self.postings(word)
+            if not len(docs):
+                continue
+            idf = np.log(1 + (len(self) - len(docs) + 0.5) / (len(docs) + 0.5))
+            pos = np.minimum(np.searchsorted(docs, matches), len(docs) - 1)
+            freq = np.where(docs[pos] == matches, tf[pos], 0)
+            scores += idf * freq * (_K1 + 1) / (freq + norm)
+        if top is not None and top < len(matches):
+            keep = np.argpartition(-scores, top - 1)[:top] if top > 0 else np.zeros(0, np.int64)
+            # Keep everything tied with the cut-off score so tie order stays deterministic
+            keep = np.flatnonzero(scores >= scores[keep].min()) if len(keep) else keep
+            matches, scores = matches[keep], scores[keep]
+        order = np.lexsort((-matches, -scores))
+        return matches[order][:top], scores[order][:top]
+
+    def search_frame(self, frame: pd.DataFrame, query: str, mask: Optional[np.ndarray] = None,
+                     limit: int = 50, offset: int = 0) -> pd.DataFrame:
+        """Rows of `frame` (aligned with the indexed texts) for one page of hits, with a `rank` column."""
+        positions, scores = self.search(query, mask, top=offset + limit)
+        page = slice(offset, offset + limit)
+        return frame.iloc[positions[page]].assign(rank=scores[page])
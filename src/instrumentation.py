@@ -0,0 +1,166 @@
+"""
+Pipeline Instrumentation
+------------------------
+Process-wide counters, gauges and latency histograms for the hot paths
+(scraping, cleaning, sentiment, themes, DB loads), exportable as JSON or
+Prometheus text, plus an opt-in cProfile wrapper for the pipeline entry
+points. Standard library only, so importing it costs nothing.
+
+Metrics are per process: with the pipeline in "process" mode or sentiment
+worker pools, only what ran in the exporting process is included.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Union
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict:
+        cumulative, running = {}, 0
+        for bound, n in zip((*self.buckets, float('inf')), self.counts):
+            running += n
+            cumulative['+Inf' if bound == float('inf') else str(bound)] = running
+        return {'count': self.count, 'sum': self.sum, 'max': self.max, 'buckets': cumulative}
+
+
+class Registry:
+    """Thread-safe store of named counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(buckets)
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the duration of the block in the `name` histogram, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: h.snapshot() for name, h in self.histograms.items()},
+            }
+
+    def to_prometheus(self, prefix: str = 'reviews') -> str:
+        """Prometheus text exposition format; dotted names become underscores."""
+        snap = self.snapshot()
+        lines = []
+        for kind, values in (('counter', snap['counters']), ('gauge', snap['gauges'])):
+            for name, value in sorted(values.items()):
+                metric = _metric_name(prefix, name)
+                lines += [f'# TYPE {metric} {kind}', f'{metric} {value}']
+        for name, hist in sorted(snap['histograms'].items()):
+            metric = _metric_name(prefix, name) + '_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            for bound, n in hist['buckets'].items():
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {n}')
+            lines += [f'{metric}_sum {hist["sum"]}', f'{metric}_count {hist["count"]}']
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: Union[str, Path]) -> Path:
+        """Write a snapshot to `path`: JSON for *.json, Prometheus text otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == '.json':
+            body = json.dumps(self.snapshot(), indent=2, sort_keys=True)
+        else:
+            body = self.to_prometheus()
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(body)
+        tmp.replace(path)
+        return path
+
+
+def _metric_name(prefix: str, name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', f'{prefix}_{name}')
+
+
+# Default process-wide registry used by the pipeline modules
+registry = Registry()
+inc = registry.inc
+set_gauge = registry.set_gauge
+observe = registry.observe
+timer = registry.timer
+snapshot = registry.snapshot
+export = registry.export
+
+
+@contextmanager
+def profiled(path: Optional[Union[str, Path]] = None) -> Iterator[None]:
+    """
+    Run the block under cProfile when `path` (or the PROFILE_OUTPUT env var) is set and
+    dump the stats there, readable with `python -m pstats` or snakeviz. Without a path the
+    block runs unprofiled, which is also what py-spy should attach to.
+    """
+    path = path or os.getenv('PROFILE_OUTPUT')
+    if not path:
+        yield
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        logger.info(f"ℹ️ cProfile stats written to {path}")
@@ -0,0 +1,110 @@
+"""
+Incremental Re-scoring
+----------------------
+Re-runs the sentiment model and theme extraction only on reviews whose stored
+model_version / themes_version differs from the current one (or is unknown),
+and writes the results back with batched UPDATEs. Stale rows are read in
+review_id order and every chunk commits on its own, so an interrupted job
+simply resumes with the rows that are still stale on the next run.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import logging
+import time
+
+from src.config import config
+from src.analysis.sentiment import current_model_version, get_cache, predict_sentiment
+from src.analysis.thematic import THEMES_VERSION, extract_themes_per_review
+from src.db import postgres
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RescoreReport:
+    stale: int = 0
+    sentiment_rows: int = 0
+    theme_rows: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.sentiment_rows + self.theme_rows
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"Re-scored {self.sentiment_rows} sentiment / {self.theme_rows} theme rows of {self.stale} stale "
+                f"reviews in {self.chunks} chunks, {self.seconds:.1f}s ({self.rows_per_sec:.1f} rows/sec)")
+
+
+def rescore_stale(sentiment: bool = True, themes: bool = True, chunksize: int = None,
+                  limit: Optional[int] = None) -> RescoreReport:
+    """
+    Re-score stale reviews chunk by chunk.
+
+    Args:
+        sentiment (bool): Re-run predict_sentiment where model_version is stale.
+        themes (bool): Re-run extract_themes_per_review where themes_version is stale.
+        chunksize (int): Reviews per read / score / UPDATE round trip.
+        limit (Optional[int]): Stop after this many reviews, e.g. to spread a backfill over several runs.
+    """
+    chunksize = chunksize or config.PIPELINE_CHUNKSIZE
+    model_version = None
+    if sentiment:
+        model_version = current_model_version()
+        if model_version is None:
+            # Fallback scores must never be stamped as current, or they would not be re-scored later
+            logger.warning("⚠️ Sentiment model unavailable — re-scoring themes only.")
+
+    report = RescoreReport(stale=postgres.count_stale_reviews(model_version, THEMES_VERSION if themes else None))
+    if limit is not None:
+        report.stale = min(report.stale, limit)
+    logger.info(f"ℹ️ {report.stale} stale reviews to re-score")
+
+    started = time.perf_counter()
+    after_id, seen = 0, 0
+    while limit is None or seen < limit:
+        batch = chunksize if limit is None else min(chunksize, limit - seen)
+        df = postgres.get_stale_reviews(model_version, THEMES_VERSION if themes else None, after_id, batch)
+        if df.empty:
+            break
+        after_id = int(df['review_id'].iloc[-1])
+        seen += len(df)
+
+        sentiment_rows, theme_rows = [], []
+        if model_version is not None:
+            todo = df[df['model_version'].ne(model_version) | df['model_version'].isna()]
+            failed: List[int] = []
+            preds = predict_sentiment(todo['review_text'].tolist(), batch_size=config.SENTIMENT_BATCH_SIZE,
+                                      cache=get_cache(), failed=failed)
+            # Re-check after inference: the model may have failed to load on first use.
+            # Texts that fell back to NEUTRAL are left stale for the next run.
+            if current_model_version() == model_version:
+                skip = set(failed)
+                sentiment_rows = [
+                    {'review_id': int(i), 'sentiment_label': label, 'sentiment_score': score,
+                     'model_version': model_version}
+                    for pos, (i, (label, score)) in enumerate(zip(todo['review_id'], preds)) if pos not in skip
+                ]
+        if themes:
+            todo = df[df['themes_version'].ne(THEMES_VERSION) | df['themes_version'].isna()]
+            extracted = extract_themes_per_review(todo['review_text'].tolist())
+            theme_rows = [
+                {'review_id': int(i), 'themes': t, 'themes_version': THEMES_VERSION}
+                for i, t in zip(todo['review_id'], extracted)
+            ]
+
+        postgres.update_scores(sentiment_rows, theme_rows)
+        report.chunks += 1
+        report.sentiment_rows += len(sentiment_rows)
+        report.theme_rows += len(theme_rows)
+        report.seconds = time.perf_counter() - started
+        logger.info(f"⏳ {seen}/{report.stale} reviews checked, {report.rows_per_sec:.1f} rows/sec")
+
+    report.seconds = time.perf_counter() - started
+    return report
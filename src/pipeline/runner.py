@@ -0,0 +1,300 @@
+"""
+Streaming Pipeline Runner
+-------------------------
+Streams chunks of reviews through clean → dedup → sentiment → themes → output → load.
+Each stage runs on its own thread (or process) and stages are connected
+by bounded queues, so memory stays proportional to the queue size rather
+than to the corpus. Near-duplicate reviews are clustered after cleaning and
+only one representative per cluster is scored; its results are copied to
+the rest of the cluster. Finished chunks are recorded in a checkpoint file so
+an interrupted run resumes where it stopped.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+import hashlib
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from src import instrumentation
+from src.config import config
+from src.preprocessing.clean import clean_reviews
+from src.preprocessing.dedup import broadcast, find_near_duplicates, representative_mask
+from src.analysis.sentiment import current_model_version, get_cache, predict_sentiment
+from src.analysis.thematic import THEMES_VERSION, extract_themes_per_review
+from src.db import postgres
+from src.scraping.scraper import APP_IDS
+from src.storage import columnar
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Chunk:
+    chunk_id: str
+    bank: str
+    df: pd.DataFrame
+    error: Optional[str] = None
+
+
+@dataclass
+class StageStats:
+    name: str
+    chunks: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    failures: int = 0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class PipelineReport:
+    stages: List[StageStats] = field(default_factory=list)
+    completed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<10} | {'chunks':>6} | {'rows':>8} | {'busy':>8} | {'rows/sec':>9} | {'failed':>6}"]
+        for s in self.stages:
+            lines.append(f"{s.name:<10} | {s.chunks:>6} | {s.rows:>8} | {s.seconds:>7.2f}s | "
+                         f"{s.rows_per_sec:>9.1f} | {s.failures:>6}")
+        lines.append(f"{len(self.completed)} chunks done, {len(self.skipped)} skipped (checkpoint), "
+                     f"{len(self.failed)} failed in {self.wall_time:.1f}s")
+        return "\n".join(lines)
+
+
+# --------------------------------------------------
+# STAGES
+# --------------------------------------------------
+def clean_stage(chunk: Chunk) -> Chunk:
+    chunk.df = clean_reviews(chunk.df)
+    return chunk
+
+
+def dedup_stage(chunk: Chunk) -> Chunk:
+    if config.DEDUP_ENABLED:
+        chunk.df = find_near_duplicates(chunk.df, threshold=config.DEDUP_THRESHOLD)
+    return chunk
+
+
+def _representative_texts(df: pd.DataFrame) -> List[str]:
+    return df.loc[representative_mask(df), 'review_text'].tolist()
+
+
+def sentiment_stage(chunk: Chunk) -> Chunk:
+    texts = _representative_texts(chunk.df)
+    failed: List[int] = []
+    preds = predict_sentiment(texts, batch_size=config.SENTIMENT_BATCH_SIZE, cache=get_cache(), failed=failed)
+    preds = broadcast(chunk.df, preds)
+    ok = np.ones(len(texts), dtype=bool)
+    ok[failed] = False
+    chunk.df['sentiment_label'] = [label for label, _ in preds]
+    chunk.df['sentiment_score'] = [score for _, score in preds]
+    # Fallback scores keep model_version NULL so rescore_stale picks them up later
+    chunk.df['model_version'] = np.where(broadcast(chunk.df, ok), current_model_version(), None)
+    return chunk
+
+
+def themes_stage(chunk: Chunk) -> Chunk:
+    themes = extract_themes_per_review(_representative_texts(chunk.df))
+    chunk.df['identified_theme'] = broadcast(chunk.df, themes)
+    chunk.df['themes_version'] = THEMES_VERSION
+    return chunk
+
+
+def output_stage(chunk: Chunk) -> Chunk:
+    # The scored chunk also goes to the Parquet output dataset that scripts/insert_reviews.py loads.
+    # One part file per chunk id, so a retried chunk overwrites its own part instead of duplicating rows
+    if config.STORAGE_FORMAT == "parquet":
+        part = hashlib.sha1(chunk.chunk_id.encode()).hexdigest()[:16]
+        columnar.write_reviews(chunk.df, "output", chunk.bank, mode="append", part=part)
+    return chunk
+
+
+def load_stage(chunk: Chunk) -> Chunk:
+    # Raise instead of logging, so a failed load is not checkpointed as done
+    postgres.insert_reviews(chunk.df, bank_name=chunk.bank, raise_errors=True)
+    return chunk
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Chunk], Chunk]
+
+
+DEFAULT_STAGES = [
+    Stage("clean", clean_stage),
+    Stage("dedup", dedup_stage),
+    Stage("sentiment", sentiment_stage),
+    Stage("themes", themes_stage),
+    Stage("output", output_stage),
+    Stage("load", load_stage),
+]
+
+
+# --------------------------------------------------
+# SOURCES & CHECKPOINTS
+# --------------------------------------------------
+def _chunk_id(source: str, start: int, df: pd.DataFrame) -> str:
+    """
+    Chunk id from its position and a digest of its rows, so a re-scrape that rewrites
+    the same offsets with new reviews gets new ids instead of matching the checkpoint.
+    """
+    key = df['review_id'] if 'review_id' in df.columns else df
+    digest = hashlib.sha1(pd.util.hash_pandas_object(key, index=False).to_numpy().tobytes()).hexdigest()[:12]
+    return f"{source}:{start}-{start + len(df)}:{digest}"
+
+
+def iter_raw_chunks(banks: Optional[List[str]] = None, chunksize: int = None) -> Iterator[Chunk]:
+    """
+    Read raw reviews in chunks, from the raw Parquet dataset when STORAGE_FORMAT is
+    "parquet", otherwise from RAW_DIR/<bank>_raw.csv. Chunk ids are derived from the
+    chunk's review ids (or its content), so they are stable across runs for unchanged
+    data and change when the data does.
+    """
+    chunksize = chunksize or config.PIPELINE_CHUNKSIZE
+    if config.STORAGE_FORMAT == "parquet" and columnar.exists("raw"):
+        for bank in banks or list(APP_IDS):
+            for start, df in columnar.iter_batches("raw", bank, chunksize):
+                yield Chunk(_chunk_id(f"raw/bank={bank}", start, df), bank, df)
+        return
+    for bank in banks or list(APP_IDS):
+        path = Path(config.RAW_DIR) / f"{bank.lower()}_raw.csv"
+        if not path.exists():
+            logger.warning(f"⚠️ No raw file for {bank}: {path}")
+            continue
+        for i, df in enumerate(pd.read_csv(path, chunksize=chunksize)):
+            start = i * chunksize
+            yield Chunk(_chunk_id(path.name, start, df), bank, df)
+
+
+def load_checkpoint(path: Path) -> set:
+    path = Path(path)
+    return set(json.loads(path.read_text())) if path.exists() else set()
+
+
+def save_checkpoint(path: Path, done: set):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(sorted(done)))
+    tmp.replace(path)
+
+
+# --------------------------------------------------
+# RUNNER
+# --------------------------------------------------
+def _stage_worker(stage: Stage, inbox, outbox, stats_box):
+    stats = StageStats(stage.name)
+    while True:
+        chunk = inbox.get()
+        if chunk is None:
+            break
+        if chunk.error is None:
+            started = time.perf_counter()
+            try:
+                chunk = stage.fn(chunk)
+                stats.rows += len(chunk.df)
+            except Exception as e:
+                chunk.error = f"{stage.name}: {e}"
+                stats.failures += 1
+            elapsed = time.perf_counter() - started
+            stats.seconds += elapsed
+            instrumentation.observe(f'pipeline.{stage.name}', elapsed)
+            stats.chunks += 1
+        outbox.put(chunk)
+    outbox.put(None)
+    stats_box.put(stats)
+
+
+def run_pipeline(chunks: Iterable[Chunk], stages: Optional[List[Stage]] = None, mode: str = "thread",
+                 queue_size: int = None, checkpoint_path: Optional[Path] = None) -> PipelineReport:
+    """
+    Stream chunks through the stages and return per-stage timings.
+
+    Args:
+        chunks: Source of chunks, e.g. iter_raw_chunks().
+        stages: Ordered stages; defaults to clean → sentiment → themes → load.
+        mode: "thread" or "process" (one worker per stage either way).
+        queue_size: Bound on each inter-stage queue (chunks in flight).
+        checkpoint_path: JSON file of finished chunk ids; chunks listed there are skipped.
+    """
+    if mode not in ("thread", "process"):
+        raise ValueError(f"mode must be 'thread' or 'process', got {mode!r}")
+    stages = stages or DEFAULT_STAGES
+    queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+    if mode == "process":
+        make_queue, worker_cls, stats_box = (lambda: multiprocessing.Queue(queue_size)), multiprocessing.Process, multiprocessing.Queue()
+    else:
+        make_queue, worker_cls, stats_box = (lambda: queue.Queue(queue_size)), threading.Thread, queue.Queue()
+
+    done = load_checkpoint(checkpoint_path) if checkpoint_path else set()
+    report = PipelineReport()
+    started = time.perf_counter()
+
+    queues = [make_queue() for _ in range(len(stages) + 1)]
+    workers = [
+        # Named per stage so py-spy dumps and profiles show which stage a thread belongs to
+        worker_cls(target=_stage_worker, args=(stage, queues[i], queues[i + 1], stats_box),
+                   name=f"stage-{stage.name}", daemon=True)
+        for i, stage in enumerate(stages)
+    ]
+    for w in workers:
+        w.start()
+
+    source_errors: List[BaseException] = []
+
+    def feed():
+        try:
+            for chunk in chunks:
+                if chunk.chunk_id in done:
+                    report.skipped.append(chunk.chunk_id)
+                    continue
+                queues[0].put(chunk)
+        except BaseException as e:
+            source_errors.append(e)
+        finally:
+            # Always close the stream so the stage workers drain and exit
+            queues[0].put(None)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    while True:
+        chunk = queues[-1].get()
+        if chunk is None:
+            break
+        if chunk.error:
+            report.failed[chunk.chunk_id] = chunk.error
+            logger.error(f"❌ Chunk {chunk.chunk_id} failed in {chunk.error}")
+            continue
+        report.completed.append(chunk.chunk_id)
+        if checkpoint_path:
+            done.add(chunk.chunk_id)
+            save_checkpoint(checkpoint_path, done)
+
+    feeder.join()
+    for w in workers:
+        w.join()
+    by_name = {}
+    for _ in stages:
+        s = stats_box.get()
+        by_name[s.name] = s
+    report.stages = [by_name[stage.name] for stage in stages]
+    report.wall_time = time.perf_counter() - started
+    if source_errors:
+        raise source_errors[0]
+    return report
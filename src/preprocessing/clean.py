@@ -2,7 +2,9 @@ from typing import List
 import pandas as pd
 import re
 from dateutil import parser
+from src import instrumentation
 from src.config import config
+from src.storage import columnar
 from pathlib import Path
 
 def clean_text(text: str) -> str:
@@ -21,19 +23,73 @@ def normalize_date(x):
         except Exception:
             return pd.NaT
 
+# Low-cardinality text columns stored as categoricals after cleaning
+CATEGORICAL_COLUMNS = ['source', 'bank']
+
+def clean_text_series(s: pd.Series) -> pd.Series:
+    """Vectorized clean_text: collapse whitespace and strip; non-strings become ''."""
+    if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+        return pd.Series('', index=s.index, dtype=object)
+    is_str = s.map(lambda x: isinstance(x, str), na_action='ignore').fillna(False).astype(bool)
+    return s.where(is_str).str.replace(r'\s+', ' ', regex=True).str.strip().fillna('')
+
+def normalize_dates(s: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_date: one bulk pd.to_datetime pass with the inferred format,
+    an element-wise bulk pass for rows in other formats, and the per-row dateutil
+    fallback only for values neither pass could parse.
+    """
+    try:
+        parsed = pd.to_datetime(s, errors='coerce')
+    except (TypeError, ValueError):
+        # e.g. mixed timezones, which a single datetime column cannot hold
+        return s.apply(normalize_date)
+    failed = parsed.isna() & s.notna()
+    if failed.any():
+        # Rows in a different format than the one inferred: parse them element-wise in bulk,
+        # and only send what is still unparsed to dateutil
+        try:
+            fallback = pd.to_datetime(s[failed], errors='coerce', format='mixed').astype(object)
+        except (TypeError, ValueError):
+            fallback = pd.Series(pd.NaT, index=s[failed].index, dtype=object)
+        retry = fallback.isna()
+        if retry.any():
+            fallback[retry] = s[failed][retry].apply(normalize_date)
+        if fallback.notna().any():
+            combined = parsed.astype(object)
+            combined[failed] = fallback
+            try:
+                return pd.to_datetime(combined)
+            except (TypeError, ValueError):
+                return s.apply(normalize_date)
+    return parsed
+
 def clean_reviews(df: pd.DataFrame) -> pd.DataFrame:
+    with instrumentation.timer('clean.reviews'):
+        cleaned = _clean_reviews(df)
+    instrumentation.inc('clean.rows_in', len(df))
+    instrumentation.inc('clean.rows_out', len(cleaned))
+    return cleaned
+
+def _clean_reviews(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
-    df['review_text'] = df.get('review_text','').fillna('').apply(clean_text)
+    # A frame without review_text has nothing to keep, so it cleans to an empty result
+    df['review_text'] = clean_text_series(df.get('review_text', pd.Series('', index=df.index, dtype=object)))
     df = df[df['review_text'].str.len() > 0]
     if 'review_date' in df.columns:
-        df['review_date'] = df['review_date'].apply(normalize_date)
-    df = df.drop_duplicates(subset=['review_text','review_date'])
+        df['review_date'] = normalize_dates(df['review_date'])
+    df = df.drop_duplicates(subset=[c for c in ['review_text','review_date'] if c in df.columns])
     df['rating'] = pd.to_numeric(df.get('rating'), errors='coerce')
     df = df[(df['rating'] >= 1) & (df['rating'] <= 5)]
     df = df.reset_index(drop=True)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
     return df
 
 def save_clean(df: pd.DataFrame, bank:str) -> str:
+    if config.STORAGE_FORMAT == "parquet":
+        return columnar.write_reviews(df, "cleaned", bank)
     Path(config.CLEAN_DIR).mkdir(parents=True, exist_ok=True)
     out = config.CLEAN_DIR / f"{bank.lower()}_clean.csv"
     df.to_csv(out, index=False)
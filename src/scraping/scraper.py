@@ -1,8 +1,15 @@
-from typing import List
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import json
+import random
+import threading
 import time
 import pandas as pd
 from google_play_scraper import reviews
+from src import instrumentation
 from src.config import config
+from src.storage import columnar
 from pathlib import Path
 
 APP_IDS = {
@@ -12,33 +19,279 @@ APP_IDS = {
 
 }
 
-def scrape_reviews_for_app(app_package: str, n: int = 500) -> pd.DataFrame:
+PLAY_STORE_HOST = "play.google.com"
+RAW_COLUMNS = ["review_id", "review_text", "rating", "review_date", "user_name", "source"]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_host_limiters: Dict[str, TokenBucket] = {}
+_host_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(host: str = PLAY_STORE_HOST) -> TokenBucket:
+    """Shared limiter per host, so concurrent bank scrapes respect one request budget."""
+    with _host_limiters_lock:
+        if host not in _host_limiters:
+            _host_limiters[host] = TokenBucket(config.SCRAPE_RATE_PER_SEC, config.SCRAPE_BURST)
+        return _host_limiters[host]
+
+
+@dataclass
+class ScrapeStats:
+    reviews: int = 0
+    pages: int = 0
+    retries: int = 0
+    wait_time: float = 0.0
+    wall_time: float = 0.0
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.wall_time if self.wall_time else 0.0
+
+
+@dataclass
+class ScrapeReport:
+    outputs: Dict[str, str] = field(default_factory=dict)
+    stats: Dict[str, ScrapeStats] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    @property
+    def pages(self) -> int:
+        return sum(s.pages for s in self.stats.values())
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> str:
+        lines = [f"{'bank':<8} | {'reviews':>7} | {'pages':>5} | {'retries':>7} | {'pages/sec':>9} | {'wall':>7}"]
+        for bank, s in self.stats.items():
+            lines.append(f"{bank:<8} | {s.reviews:>7} | {s.pages:>5} | {s.retries:>7} | "
+                         f"{s.pages_per_sec:>9.2f} | {s.wall_time:>6.1f}s")
+        lines.append(f"total: {self.pages} pages in {self.wall_time:.1f}s ({self.pages_per_sec:.2f} pages/sec)")
+        for bank, err in self.errors.items():
+            lines.append(f"❌ {bank}: {err}")
+        return "\n".join(lines)
+
+
+@dataclass
+class HighWaterMark:
+    """Newest review seen for an app: its timestamp and the ids sharing that timestamp."""
+    newest_at: pd.Timestamp
+    review_ids: List[str] = field(default_factory=list)
+
+    def is_seen(self, at, review_id) -> bool:
+        at = pd.Timestamp(at)
+        return at < self.newest_at or (at == self.newest_at and review_id in self.review_ids)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> Optional["HighWaterMark"]:
+        dates = pd.to_datetime(df["review_date"], errors="coerce") if "review_date" in df else None
+        if dates is None or dates.isna().all():
+            return None
+        newest = dates.max()
+        ids = df.loc[dates == newest, "review_id"] if "review_id" in df else []
+        return cls(newest_at=newest, review_ids=[str(i) for i in ids if pd.notna(i)])
+
+    def merge(self, other: Optional["HighWaterMark"]) -> "HighWaterMark":
+        if other is None or other.newest_at < self.newest_at:
+            return self
+        if other.newest_at > self.newest_at:
+            return other
+        return HighWaterMark(self.newest_at, sorted(set(self.review_ids) | set(other.review_ids)))
+
+
+def _state_path(bank: str) -> Path:
+    return Path(config.RAW_DIR) / f"{bank.lower()}_state.json"
+
+
+def load_high_water_mark(bank: str) -> Optional[HighWaterMark]:
+    path = _state_path(bank)
+    if not path.exists():
+        return None
+    state = json.loads(path.read_text())
+    return HighWaterMark(pd.Timestamp(state["newest_at"]), state.get("review_ids", []))
+
+
+def save_high_water_mark(bank: str, mark: HighWaterMark):
+    path = _state_path(bank)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"newest_at": mark.newest_at.isoformat(), "review_ids": mark.review_ids}))
+
+
+def _fetch_page(fetch: Callable, app_package: str, count: int, token, limiter: TokenBucket, stats: ScrapeStats):
+    """Fetch one page through the limiter, retrying with exponential backoff and jitter."""
+    for attempt in range(config.SCRAPE_MAX_RETRIES + 1):
+        waited = limiter.acquire()
+        stats.wait_time += waited
+        instrumentation.observe('scrape.rate_limit_wait', waited)
+        try:
+            with instrumentation.timer('scrape.page_fetch'):
+                return fetch(app_package, lang='en', country='us', count=count, continuation_token=token)
+        except Exception:
+            if attempt == config.SCRAPE_MAX_RETRIES:
+                raise
+            stats.retries += 1
+            instrumentation.inc('scrape.retries')
+            delay = min(config.SCRAPE_BACKOFF_MAX, config.SCRAPE_BACKOFF_BASE * 2 ** attempt)
+            delay *= random.uniform(0.5, 1.0)
+            instrumentation.observe('scrape.backoff_sleep', delay)
+            time.sleep(delay)
+
+
+def scrape_reviews_for_app(app_package: str, n: int = 500, fetch: Optional[Callable] = None,
+                           limiter: Optional[TokenBucket] = None, stats: Optional[ScrapeStats] = None,
+                           high_water: Optional[HighWaterMark] = None) -> pd.DataFrame:
+    """
+    Page through an app's reviews (newest first). With `high_water`, paging stops
+    at the first review that was already seen and only newer reviews are returned.
+    """
+    fetch = fetch or reviews
+    limiter = limiter or get_host_limiter()
+    stats = stats if stats is not None else ScrapeStats()
+    started = time.perf_counter()
     all_reviews = []
     count = 0
     token = None
+    reached_seen = False
     while count < n:
-        result, token = reviews(app_package, lang='en', country='us', count=min(200, n-count), continuation_token=token)
+        result, token = _fetch_page(fetch, app_package, min(200, n-count), token, limiter, stats)
         for r in result:
+            if high_water is not None and high_water.is_seen(r.get("at"), r.get("reviewId")):
+                reached_seen = True
+                break
             all_reviews.append({
+                "review_id": r.get("reviewId"),
                 "review_text": r.get("content",""),
                 "rating": r.get("score"),
                 "review_date": r.get("at"),
                 "user_name": r.get("userName",""),
                 "source": "google_play"
             })
-        count += len(result)
-        if not token:
+        count = len(all_reviews)
+        stats.pages += 1
+        instrumentation.inc('scrape.pages')
+        if reached_seen or not token or not result:
             break
-        time.sleep(config.SLEEP_BETWEEN_REQUESTS)
-    return pd.DataFrame(all_reviews)
+    stats.reviews += count
+    instrumentation.inc('scrape.reviews', count)
+    stats.wall_time += time.perf_counter() - started
+    return pd.DataFrame(all_reviews, columns=RAW_COLUMNS)
+
+def _append_csv(df: pd.DataFrame, out: Path):
+    """
+    Append scraped rows to a raw CSV. A file whose header is not RAW_COLUMNS (e.g. written
+    before review_id existed) is rewritten with the union of columns, since appending under
+    the old header would shift every new row by a column.
+    """
+    if not out.exists():
+        df.to_csv(out, index=False)
+        return
+    header = list(pd.read_csv(out, nrows=0).columns)
+    if header == RAW_COLUMNS:
+        df.to_csv(out, mode="a", header=False, index=False)
+        return
+    existing = pd.read_csv(out)
+    columns = RAW_COLUMNS + [c for c in header if c not in RAW_COLUMNS]
+    tmp = out.with_suffix(".tmp")
+    pd.concat([existing, df], ignore_index=True).reindex(columns=columns).to_csv(tmp, index=False)
+    tmp.replace(out)
+
 
-def scrape_and_save(bank: str, n:int = None) -> str:
+def scrape_and_save(bank: str, n:int = None, fetch: Optional[Callable] = None,
+                    limiter: Optional[TokenBucket] = None, stats: Optional[ScrapeStats] = None,
+                    incremental: bool = False) -> str:
+    """
+    Scrape a bank and store the raw reviews, returning the written path.
+
+    With STORAGE_FORMAT="parquet" reviews go to today's bank partition of the raw
+    Parquet dataset (replaced on a full scrape, appended as a new part file in
+    incremental mode). With "csv" they go to RAW_DIR/<bank>_raw.csv.
+    In incremental mode only reviews newer than the stored high-water mark are
+    fetched; as CSV they are written to RAW_DIR/<bank>_raw_delta.csv (the returned
+    path) and appended to the raw file.
+    """
     n = n or config.MAX_SCRAPE_PER_BANK
     app_id = APP_IDS.get(bank)
     if not app_id:
         raise ValueError(f"No app id for {bank}")
-    df = scrape_reviews_for_app(app_id, n=n)
+    mark = load_high_water_mark(bank) if incremental else None
+    df = scrape_reviews_for_app(app_id, n=n, fetch=fetch, limiter=limiter, stats=stats, high_water=mark)
     Path(config.RAW_DIR).mkdir(parents=True, exist_ok=True)
-    out = config.RAW_DIR / f"{bank.lower()}_raw.csv"
-    df.to_csv(out, index=False)
-    return str(out)
+    if config.STORAGE_FORMAT == "parquet":
+        written = columnar.write_reviews(df, "raw", bank, mode="append" if incremental else "replace")
+    else:
+        out = config.RAW_DIR / f"{bank.lower()}_raw.csv"
+        if incremental:
+            written = config.RAW_DIR / f"{bank.lower()}_raw_delta.csv"
+            df.to_csv(written, index=False)
+            if not df.empty:
+                _append_csv(df, Path(out))
+        else:
+            written = out
+            df.to_csv(out, index=False)
+
+    new_mark = HighWaterMark.from_frame(df) if not df.empty else None
+    if new_mark is not None:
+        save_high_water_mark(bank, new_mark.merge(mark))
+    return str(written)
+
+
+def scrape_all_banks(banks: Optional[List[str]] = None, n: int = None, fetch: Optional[Callable] = None,
+                     max_workers: Optional[int] = None, limiter: Optional[TokenBucket] = None,
+                     incremental: bool = False) -> ScrapeReport:
+    """
+    Scrape several banks concurrently. Banks share one per-host limiter, so fan-out
+    overlaps request latency without exceeding the configured request rate.
+    """
+    banks = banks or list(APP_IDS)
+    limiter = limiter or get_host_limiter()
+    report = ScrapeReport(stats={bank: ScrapeStats() for bank in banks})
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or config.SCRAPE_MAX_WORKERS) as pool:
+        futures = {
+            pool.submit(scrape_and_save, bank, n, fetch, limiter, report.stats[bank], incremental): bank
+            for bank in banks
+        }
+        for future in as_completed(futures):
+            bank = futures[future]
+            try:
+                report.outputs[bank] = future.result()
+            except Exception as e:
+                report.errors[bank] = str(e)
+    report.wall_time = time.perf_counter() - started
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+    # PROFILE_OUTPUT=<file> enables cProfile for the run
+    with instrumentation.profiled():
+        print(scrape_all_banks(incremental="--incremental" in sys.argv).summary())
+    instrumentation.export(config.METRICS_PATH)
@@ -0,0 +1,166 @@
+"""
+Columnar Review Storage
+-----------------------
+Partitioned Parquet datasets (hive layout: bank=<bank>/scrape_date=<YYYY-MM-DD>)
+that replace the intermediate CSV files. Dtypes survive the round trip, themes
+are stored as native list<string> columns, reads support column projection and
+predicate pushdown, and local files are memory-mapped. Conversion to pandas
+frees the Arrow buffers column by column instead of holding both copies.
+"""
+
+from typing import Iterator, List, Optional, Tuple, Union
+from pathlib import Path
+import ast
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from src.config import config
+
+STAGE_DIRS = {
+    "raw": lambda: config.RAW_DIR,
+    "cleaned": lambda: config.CLEAN_DIR,
+    "output": lambda: config.OUTPUT_DIR,
+}
+
+PARTITIONING = ds.partitioning(pa.schema([("bank", pa.string()), ("scrape_date", pa.string())]), flavor="hive")
+
+# Canonical Arrow types, so every part file in a dataset shares one schema
+COLUMN_TYPES = {
+    "review_id": pa.string(),
+    "review_text": pa.string(),
+    "rating": pa.float64(),
+    "review_date": pa.timestamp("us"),
+    "user_name": pa.string(),
+    "source": pa.string(),
+    "sentiment_label": pa.string(),
+    "sentiment_score": pa.float64(),
+    "identified_theme": pa.list_(pa.string()),
+    "themes": pa.list_(pa.string()),
+}
+LIST_COLUMNS = [name for name, typ in COLUMN_TYPES.items() if pa.types.is_list(typ)]
+
+
+def dataset_dir(stage: str) -> Path:
+    """Dataset root for a pipeline stage ("raw", "cleaned" or "output")."""
+    if stage not in STAGE_DIRS:
+        raise ValueError(f"Unknown stage {stage!r}; expected one of {sorted(STAGE_DIRS)}")
+    return Path(STAGE_DIRS[stage]()) / "reviews"
+
+
+def _as_list(val) -> List[str]:
+    """Themes as a list, accepting lists, arrays and stringified lists from CSV files."""
+    if isinstance(val, str):
+        val = val.strip()
+        if not val.startswith('['):
+            return [val] if val else []
+        try:
+            val = ast.literal_eval(val)
+        except (ValueError, SyntaxError):
+            return []
+    if val is None or (not hasattr(val, '__iter__')):
+        return []
+    return [str(v) for v in val]
+
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    frame = df.copy()
+    for col in LIST_COLUMNS:
+        if col in frame.columns:
+            frame[col] = frame[col].map(_as_list)
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(object)
+    if "review_date" in frame.columns:
+        frame["review_date"] = pd.to_datetime(frame["review_date"], errors="coerce")
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    schema = pa.schema([
+        pa.field(f.name, COLUMN_TYPES.get(f.name, f.type)) for f in table.schema
+    ])
+    return table.cast(schema)
+
+
+def write_reviews(df: pd.DataFrame, stage: str, bank: str, scrape_date=None, mode: str = "replace",
+                  part: Optional[str] = None) -> str:
+    """
+    Write reviews into the bank/scrape_date partition of a stage dataset.
+    mode="replace" rewrites that partition; mode="append" adds a new part file,
+    named after `part` when given, so appending the same part again overwrites it.
+    Returns the partition directory.
+    """
+    if mode not in ("replace", "append"):
+        raise ValueError(f"mode must be 'replace' or 'append', got {mode!r}")
+    day = pd.Timestamp(scrape_date or pd.Timestamp.now()).strftime("%Y-%m-%d")
+    base = dataset_dir(stage)
+    table = _to_table(df.drop(columns=["bank", "scrape_date"], errors="ignore"))
+    table = table.append_column("bank", pa.array([bank] * len(table), pa.string()))
+    table = table.append_column("scrape_date", pa.array([day] * len(table), pa.string()))
+    ds.write_dataset(
+        table, base, format="parquet", partitioning=PARTITIONING,
+        basename_template=f"part-{part or uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if mode == "replace" else "overwrite_or_ignore",
+    )
+    return str(base / f"bank={bank}" / f"scrape_date={day}")
+
+
+def _dataset(source: Union[str, Path], memory_map: bool) -> ds.Dataset:
+    path = Path(dataset_dir(source) if source in STAGE_DIRS else source)
+    fs = pafs.LocalFileSystem(use_mmap=memory_map)
+    partitioning = PARTITIONING if path.is_dir() else None
+    return ds.dataset(str(path.resolve()), format="parquet", partitioning=partitioning, filesystem=fs)
+
+
+def _filter(banks: Optional[List[str]], start, end, extra: Optional[ds.Expression]) -> Optional[ds.Expression]:
+    expr = extra
+    conditions = []
+    if banks is not None:
+        conditions.append(ds.field("bank").isin(list(banks)))
+    if start is not None:
+        conditions.append(ds.field("review_date") >= pd.Timestamp(start).to_pydatetime())
+    if end is not None:
+        conditions.append(ds.field("review_date") <= pd.Timestamp(end).to_pydatetime())
+    for cond in conditions:
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def read_table(source: Union[str, Path], columns: Optional[List[str]] = None, banks: Optional[List[str]] = None,
+               start=None, end=None, filter: Optional[ds.Expression] = None, memory_map: bool = True) -> pa.Table:
+    """
+    Read a stage dataset (or any Parquet file/directory) as an Arrow table.
+    Only `columns` are read; bank/date predicates prune partitions and row groups.
+    """
+    return _dataset(source, memory_map).to_table(columns=columns, filter=_filter(banks, start, end, filter))
+
+
+def _to_frame(table: pa.Table) -> pd.DataFrame:
+    # Release each Arrow column once converted, so the table and the frame are not both held in full
+    df = table.to_pandas(self_destruct=True, split_blocks=True)
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = [list(v) if v is not None else [] for v in df[col]]
+    return df
+
+
+def read_reviews(source: Union[str, Path], columns: Optional[List[str]] = None, banks: Optional[List[str]] = None,
+                 start=None, end=None, filter: Optional[ds.Expression] = None, memory_map: bool = True) -> pd.DataFrame:
+    """read_table as a DataFrame, with list columns as Python lists."""
+    return _to_frame(read_table(source, columns, banks, start, end, filter, memory_map))
+
+
+def iter_batches(source: Union[str, Path], bank: str, batch_size: int,
+                 columns: Optional[List[str]] = None) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Stream one bank's rows as (row offset, DataFrame) batches of at most batch_size rows."""
+    dataset = _dataset(source, memory_map=True)
+    offset = 0
+    for batch in dataset.to_batches(columns=columns, filter=_filter([bank], None, None, None), batch_size=batch_size):
+        if batch.num_rows:
+            yield offset, _to_frame(pa.Table.from_batches([batch]))
+            offset += batch.num_rows
+
+
+def exists(stage: str) -> bool:
+    return dataset_dir(stage).exists()
@@ -6,3 +6,12 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _no_persistent_sentiment_cache(monkeypatch):
+    # Keep tests from reading or writing the real cache under models/
+    from src.config import config
+    monkeypatch.setattr(config, "SENTIMENT_CACHE_ENABLED", False)
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from src.preprocessing.clean import clean_reviews
+
+
+def test_clean_reviews_vectorized():
+    df = pd.DataFrame({
+        "review_text": ["  Good   app\n", "", None, "Slow login", "Good app", "Otp", 7],
+        "rating": [5, 4, 3, "2", 5, 9, 1],
+        "review_date": ["2024-01-01 10:00:00", "2024-01-02", None, "3 March 2024", "2024-01-01 10:00:00",
+                        "2024-01-05 08:00:00", "2024-01-06 08:00:00"],
+        "source": "google_play",
+    })
+    out = clean_reviews(df)
+
+    assert out["review_text"].tolist() == ["Good app", "Slow login"]
+    assert out["review_date"].tolist() == [pd.Timestamp("2024-01-01 10:00:00"), pd.Timestamp("2024-03-03")]
+    assert out["rating"].tolist() == [5, 2]
+    assert isinstance(out["source"].dtype, pd.CategoricalDtype)
+
+
+def test_clean_reviews_unparseable_dates_become_nat():
+    df = pd.DataFrame({"review_text": ["a", "b"], "rating": [1, 2], "review_date": ["2024-01-01", "not a date"]})
+    out = clean_reviews(df)
+    assert out["review_date"].isna().tolist() == [False, True]
+
+
+def test_clean_reviews_without_review_text_is_empty():
+    cleaned = clean_reviews(pd.DataFrame({"rating": [5, 4], "review_date": ["2024-01-01", "2024-01-02"]}))
+    assert cleaned.empty
+    assert "review_text" in cleaned.columns
@@ -3,6 +3,7 @@
 import sys
 import json
 import pandas as pd
+import pytest
 import importlib
 from pathlib import Path
 
@@ -78,3 +79,156 @@ def test_theme_driver_computation():
 
 
 
+
+# Test rollup slicing
+def test_aggregate_rollups_matches_raw_rows():
+    """Slicing the rolled-up frame gives the same numbers as aggregating the raw rows."""
+    import streamlit as st
+    st.cache_data.clear()
+    df = pd.DataFrame({
+        "bank": ["CBE", "CBE", "Dashen"],
+        "review_text": ["Good app", "Slow", "Meh"],
+        "rating": [5, 1, 3],
+        "review_date": ["2024-01-01", "2024-01-01", "2024-01-02"],
+        "sentiment_label": ["POSITIVE", "NEGATIVE", "NEUTRAL"],
+        "sentiment_score": [0.9, 0.2, 0.4],
+        "themes": ['["fast", "good"]', '["slow"]', '["good", "slow"]'],
+    })
+    app = reload_dashboard_with_mock(df)
+    rollups = app.rollup_frame(app.fetch_production_data())
+
+    agg = app.aggregate_rollups(rollups, ["CBE"])
+    assert agg["kpis"]["volume"] == 2
+    assert agg["kpis"]["avg_rating"] == 3
+    assert agg["kpis"]["positive_pct"] == 50
+    assert agg["kpis"]["polarization"] == 0
+
+    themes = app.aggregate_rollups(rollups, ["CBE", "Dashen"])["themes"].set_index("Theme")
+    assert themes.loc["good", "Volume"] == 2
+    assert abs(themes.loc["good", "Impact"] - 0.65) < 1e-9
+    assert abs(themes.loc["slow", "Impact"] - 0.3) < 1e-9
+
+
+def test_rollup_frame_theme_filters_match_theme_rollups():
+    df = pd.DataFrame({
+        "bank": ["CBE", "CBE", "CBE", "Dashen"],
+        "review_text": ["good good", "slow", "good and fast", "slow"],
+        "sentiment_label": ["POSITIVE", "NEGATIVE", "POSITIVE", "NEGATIVE"],
+        "rating": [5, 1, 4, 2],
+        "std_score": [0.9, 0.2, 0.7, 0.4],
+        "themes": [["good", "good"], ["slow"], ["good", "fast"], ["slow"]],
+    })
+    app = reload_dashboard_with_mock(df.copy())
+
+    themes = app.rollup_frame(df)["themes"].set_index(["bank", "theme"])
+    # A repeated theme counts once per mention, as the theme_rollups table counts it
+    assert themes.loc[("CBE", "good"), "review_count"] == 3
+    assert themes.loc[("CBE", "good"), "score_sum"] == pytest.approx(2.5)
+
+    filtered = app.rollup_frame(df, min_volume=2)["themes"]
+    assert filtered[["bank", "theme"]].values.tolist() == [["CBE", "good"]]
+    top = app.rollup_frame(df, top_k=1)["themes"]
+    assert top[["bank", "theme"]].values.tolist() == [["CBE", "good"], ["Dashen", "slow"]]
+
+
+# Test server-side aggregation path
+def test_dashboard_uses_server_side_aggregates(monkeypatch):
+    """With the DB reachable, the dashboard renders from the rollup tables, never the full table."""
+    import streamlit as st
+
+    def fail():
+        raise AssertionError("full-table read should not happen")
+
+    monkeypatch.setattr(postgres, "get_bank_names", lambda: ["CBE", "Dashen"])
+    monkeypatch.setattr(postgres, "get_kpis", lambda banks: {
+        "volume": 2, "avg_rating": 3.5, "positive_pct": 50.0, "polarization": 0.5})
+    monkeypatch.setattr(postgres, "get_rollups", lambda: {
+        "daily": pd.DataFrame({
+            "bank": ["CBE", "Dashen"], "review_date": ["2024-01-01", "2024-01-02"],
+            "sentiment_label": ["POSITIVE", "NEGATIVE"], "rating": [5, 2],
+            "review_count": [1, 1], "score_sum": [0.9, 0.3]}),
+        "themes": pd.DataFrame({
+            "bank": ["CBE", "Dashen"], "theme": ["good", "slow"], "review_count": [1, 1], "score_sum": [0.9, 0.3]}),
+    })
+    monkeypatch.setattr(postgres, "get_recent_reviews", lambda banks, limit, before_id=None: pd.DataFrame(
+        {"review_id": [1], "bank": ["CBE"], "review_text": ["Good app"], "rating": [5],
+         "sentiment_label": ["POSITIVE"], "themes": [["good"]]}))
+    monkeypatch.setattr(postgres, "get_all_reviews", fail)
+    st.cache_data.clear()
+
+    if "src.dashboard.app" in sys.modules:
+        del sys.modules["src.dashboard.app"]
+    import src.dashboard.app as app
+
+    assert app.df_raw is None
+    assert app.agg["kpis"]["volume"] == 2
+    assert app.agg["kpis"]["positive_pct"] == 50
+    assert list(app.agg["themes"]["Theme"]) == ["good", "slow"]
+
+
+# Test progressive loading order
+def test_kpis_render_before_rollups_and_audit(monkeypatch):
+    """The KPI row is drawn from get_kpis before the rollups or any review rows are fetched."""
+    import streamlit as st
+    import time
+
+    calls = []
+    monkeypatch.setattr(time, "sleep", lambda s: calls.append("sleep"))
+    monkeypatch.setattr(postgres, "get_bank_names", lambda: ["CBE"])
+    monkeypatch.setattr(postgres, "get_kpis", lambda banks: calls.append("kpis") or {
+        "volume": 1, "avg_rating": 5.0, "positive_pct": 100.0, "polarization": 1.0})
+    monkeypatch.setattr(postgres, "get_rollups", lambda: calls.append("rollups") or {
+        "daily": pd.DataFrame({"bank": ["CBE"], "review_date": ["2024-01-01"], "sentiment_label": ["POSITIVE"],
+                               "rating": [5], "review_count": [1], "score_sum": [0.9]}),
+        "themes": pd.DataFrame({"bank": ["CBE"], "theme": ["good"],
+                                "review_count": [1], "score_sum": [0.9]}),
+    })
+    monkeypatch.setattr(postgres, "get_recent_reviews", lambda banks, limit, before_id=None: calls.append(
+        ("audit", limit, before_id)) or pd.DataFrame(
+        {"review_id": [7], "bank": ["CBE"], "review_text": ["Good app"], "rating": [5],
+         "sentiment_label": ["POSITIVE"], "themes": [["good"]]}))
+    from streamlit.delta_generator import DeltaGenerator
+    monkeypatch.setattr(DeltaGenerator, "metric", lambda *a, **k: calls.append("metric"))
+    st.cache_data.clear()
+
+    if "src.dashboard.app" in sys.modules:
+        del sys.modules["src.dashboard.app"]
+    import src.dashboard.app as app
+
+    assert "sleep" not in calls
+    assert calls.index("kpis") < calls.index("rollups")
+    assert calls.index("metric") < calls.index("rollups")
+    assert ("audit", app.AUDIT_PAGE_SIZE, None) in calls
+
+
+# Test search box
+def test_search_box_uses_search_index(monkeypatch):
+    """A query is answered by postgres.search_reviews one ranked page at a time."""
+    import streamlit as st
+
+    calls = []
+    monkeypatch.setattr(postgres, "get_bank_names", lambda: ["CBE"])
+    monkeypatch.setattr(postgres, "get_kpis", lambda banks: {
+        "volume": 1, "avg_rating": 5.0, "positive_pct": 100.0, "polarization": 1.0})
+    monkeypatch.setattr(postgres, "get_rollups", lambda: {
+        "daily": pd.DataFrame({"bank": ["CBE"], "review_date": ["2024-01-01"], "sentiment_label": ["POSITIVE"],
+                               "rating": [5], "review_count": [1], "score_sum": [0.9]}),
+        "themes": pd.DataFrame({"bank": ["CBE"], "theme": ["good"],
+                                "review_count": [1], "score_sum": [0.9]}),
+    })
+    monkeypatch.setattr(postgres, "get_recent_reviews", lambda banks, limit, before_id=None: pd.DataFrame(
+        {"review_id": [7], "bank": ["CBE"], "review_text": ["Good app"], "rating": [5],
+         "sentiment_label": ["POSITIVE"], "themes": [["good"]]}))
+    monkeypatch.setattr(postgres, "search_reviews", lambda query, banks, limit, offset: calls.append(
+        (query, banks, limit, offset)) or pd.DataFrame(
+        {"review_id": [7], "bank": ["CBE"], "review_date": ["2024-01-01"], "review_text": ["OTP fails"],
+         "rating": [1], "sentiment_label": ["NEGATIVE"], "rank": [0.5]}))
+    monkeypatch.setattr(st, "text_input", lambda *a, **k: "otp")
+    st.cache_data.clear()
+
+    if "src.dashboard.app" in sys.modules:
+        del sys.modules["src.dashboard.app"]
+    import src.dashboard.app as app
+
+    assert calls == [("otp", ["CBE"], app.SEARCH_PAGE_SIZE, 0)]
+    assert len(app.hits) == 1
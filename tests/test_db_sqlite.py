@@ -0,0 +1,286 @@
+# tests/test_db_sqlite.py
+# Exercises src.db.postgres against a SQLite stand-in so it runs without a server.
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.db import postgres
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reviews.db'}")
+    monkeypatch.setattr(postgres, "_engine", engine)
+    postgres.create_schema()
+    return engine
+
+
+def _reviews(labels=("POSITIVE", "NEGATIVE", "NEUTRAL")):
+    return pd.DataFrame({
+        "review_text": ["Good app", "Slow login", "Okay"],
+        "rating": [5, 2, 3],
+        "review_date": ["2024-01-01", "2024-01-02", "2024-01-02"],
+        "sentiment_label": list(labels),
+        "sentiment_score": [0.9, 0.2, 0.5],
+        "source": "google_play",
+        "identified_theme": [["good", "app"], "['slow', 'login']", None],
+    })
+
+
+def _count(engine, sql="SELECT COUNT(*) FROM reviews"):
+    with engine.connect() as conn:
+        return conn.execute(text(sql)).scalar()
+
+
+def test_bulk_insert_is_idempotent(sqlite_engine):
+    assert postgres.insert_reviews(_reviews(), "CBE", chunksize=2) == 3
+    assert postgres.insert_reviews(_reviews(), "CBE", chunksize=2) == 0
+    assert postgres.insert_reviews(_reviews(), "BOA") == 3
+    assert _count(sqlite_engine) == 6
+    assert _count(sqlite_engine, "SELECT themes FROM reviews WHERE rating = 2") == '["slow", "login"]'
+
+
+def test_bulk_upsert_updates_existing_rows(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    postgres.insert_reviews(_reviews(labels=("NEGATIVE",) * 3), "CBE", on_conflict="update")
+    assert _count(sqlite_engine) == 3
+    assert _count(sqlite_engine, "SELECT COUNT(*) FROM reviews WHERE sentiment_label = 'NEGATIVE'") == 3
+
+
+def test_insert_accepts_chunk_iterator(sqlite_engine):
+    df = _reviews()
+    assert postgres.insert_reviews((df.iloc[i:i + 1] for i in range(len(df))), "CBE") == 3
+
+
+def test_server_side_aggregates(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    postgres.insert_reviews(_reviews().iloc[:1], "BOA")
+
+    assert postgres.get_bank_names() == ["BOA", "CBE"]
+    kpis = postgres.get_kpis(["CBE"])
+    assert kpis["volume"] == 3 and kpis["positive_pct"] == pytest.approx(100 / 3)
+    counts = postgres.get_sentiment_counts()
+    assert counts["count"].sum() == 4
+    assert postgres.get_rating_histogram(["BOA"]).to_dict("records") == [{"bank": "BOA", "rating": 5, "count": 1}]
+    themes = postgres.get_theme_impact(["CBE"]).set_index("Theme")
+    assert themes.loc["slow", "Impact"] == pytest.approx(0.2)
+    assert themes.loc["good", "Volume"] == 1
+    assert postgres.get_kpis([])["volume"] == 0
+
+
+def test_rollups_refresh_incrementally(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    assert _count(sqlite_engine, "SELECT SUM(review_count) FROM review_rollups") == 3
+    assert _count(sqlite_engine, "SELECT COUNT(*) FROM theme_rollups") == 4
+
+    # Relabel one day only; the other day's rollup rows must be left untouched
+    day2 = _reviews(labels=("POSITIVE", "NEGATIVE", "NEGATIVE")).iloc[1:]
+    with sqlite_engine.connect() as conn:
+        day1_before = conn.execute(text("SELECT * FROM review_rollups WHERE review_date = '2024-01-01'")).fetchall()
+    postgres.insert_reviews(day2, "CBE", on_conflict="update")
+    with sqlite_engine.connect() as conn:
+        day1_after = conn.execute(text("SELECT * FROM review_rollups WHERE review_date = '2024-01-01'")).fetchall()
+    assert day1_before == day1_after
+    assert postgres.get_sentiment_counts(["CBE"]).set_index("sentiment_label")["count"].to_dict() == {
+        "NEGATIVE": 2, "POSITIVE": 1}
+
+    rollups = postgres.get_rollups()
+    assert rollups["daily"]["review_count"].sum() == 3
+    assert set(rollups["themes"]["theme"]) == {"good", "app", "slow", "login"}
+
+
+def test_theme_rollups_are_summed_per_bank_and_theme(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    # Same themes on later days add to the (bank, theme) totals instead of adding rows
+    postgres.insert_reviews(_reviews().assign(review_date="2024-02-01"), "CBE")
+    postgres.insert_reviews(_reviews(), "BOA")
+
+    themes = postgres.get_rollups(["CBE"])["themes"]
+    assert list(themes.columns) == ["bank", "theme", "review_count", "score_sum"]
+    assert len(themes) == 4 and set(themes["bank"]) == {"CBE"}
+    assert themes.set_index("theme").loc["slow", "review_count"] == 2
+
+
+def test_daily_rollups_filter_by_bank_and_date(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    postgres.insert_reviews(_reviews(), "BOA")
+
+    daily = postgres.get_daily_rollups(["CBE"], start="2024-01-02", end="2024-01-02")
+    assert set(daily["bank"]) == {"CBE"} and daily["review_count"].sum() == 2
+    assert postgres.get_daily_rollups(end="2024-01-01")["review_count"].sum() == 2
+
+
+def test_incremental_rollups_use_the_bank_date_index(sqlite_engine):
+    from sqlalchemy import event
+
+    undated = _reviews().assign(review_date=[None, None, "2024-01-02"], review_text=["a", "b", "c"])
+    postgres.insert_reviews(_reviews(), "CBE")
+    postgres.insert_reviews(undated, "CBE")
+    postgres.insert_reviews(undated.iloc[:1].assign(review_text="d"), "CBE")
+    with sqlite_engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT SUM(review_count) FROM review_rollups WHERE review_date IS NULL")).scalar() == 3
+    assert postgres.get_kpis(["CBE"])["volume"] == 7
+
+    # Every incremental rebuild of a dated key reads reviews through ix_reviews_bank_date
+    statements = []
+
+    def capture(conn, cursor, sql, *args):
+        if sql.startswith(("INSERT INTO review_rollups", "INSERT INTO theme_rollups")):
+            statements.append(sql)
+
+    event.listen(sqlite_engine, "before_cursor_execute", capture)
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TEMP TABLE reviews_staging AS SELECT * FROM reviews"))
+        postgres._refresh_rollups(conn)
+        for sql in statements:
+            plan = [str(row[-1]) for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+            assert "SCAN r" not in plan and any(
+                step.startswith("SEARCH r USING INDEX ix_reviews_bank_date") for step in plan), plan
+        conn.execute(text("DROP TABLE reviews_staging"))
+    assert len(statements) == 4
+    assert postgres.get_kpis(["CBE"])["volume"] == 7
+
+
+def test_refresh_rollups_backfills_existing_reviews(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("DELETE FROM review_rollups"))
+        conn.execute(text("DELETE FROM theme_rollups"))
+    postgres.create_schema()
+    assert postgres.get_kpis(["CBE"])["volume"] == 3
+    assert postgres.get_theme_impact(["CBE"]).set_index("Theme").loc["good", "Volume"] == 1
+
+
+def test_content_hash_migration_is_explicit(sqlite_engine, capsys):
+    postgres.insert_reviews(_reviews(), "CBE")
+    postgres.insert_reviews(_reviews().iloc[:1], "BOA")
+    # Rows loaded before content_hash existed, one of them a copy of a hashed review
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE reviews SET content_hash = NULL WHERE review_text = 'Okay'"))
+        conn.execute(text(
+            "INSERT INTO reviews (bank_id, review_text, rating, review_date, sentiment_score) "
+            "SELECT bank_id, review_text, rating, review_date, sentiment_score FROM reviews WHERE review_text != 'Okay'"
+        ))
+
+    postgres.create_schema()
+    assert _count(sqlite_engine) == 7
+    assert "migrate_content_hashes" in capsys.readouterr().out
+
+    assert postgres.migrate_content_hashes(dry_run=True) == {'backfilled': 1, 'deleted': 3}
+    assert _count(sqlite_engine) == 7
+    assert postgres.migrate_content_hashes() == {'backfilled': 1, 'deleted': 3}
+    assert _count(sqlite_engine) == 4
+    assert _count(sqlite_engine, "SELECT COUNT(*) FROM reviews WHERE content_hash IS NULL") == 0
+    assert _count(sqlite_engine, "SELECT content_hash FROM reviews WHERE review_text = 'Okay'") == \
+        postgres.content_hash("Okay", "2024-01-02")
+    assert postgres.get_kpis(["CBE"])["volume"] == 3
+    assert postgres.migrate_content_hashes() == {'backfilled': 0, 'deleted': 0}
+    # The backfilled hash is the upsert key, so reloading the same reviews adds nothing
+    assert postgres.insert_reviews(_reviews(), "CBE") == 0
+
+
+def test_recent_reviews_keyset_pagination(sqlite_engine):
+    postgres.insert_reviews(_reviews(), "CBE")
+    postgres.insert_reviews(_reviews().iloc[:1], "BOA")
+
+    first = postgres.get_recent_reviews(["CBE"], limit=2)
+    assert len(first) == 2 and set(first["bank"]) == {"CBE"}
+    second = postgres.get_recent_reviews(["CBE"], limit=2, before_id=int(first["review_id"].min()))
+    assert len(second) == 1
+    assert second["review_id"].max() < first["review_id"].min()
+    assert len(postgres.get_recent_reviews(limit=10)) == 4
+
+
+def test_search_reviews_fts(sqlite_engine):
+    df = pd.DataFrame({
+        "review_text": ["OTP never arrives", "Login failure after update", "login keeps failing, login failure",
+                        "Great app", "ኦቲፒ አይመጣም"],
+        "rating": [1, 1, 2, 5, 1],
+        "review_date": ["2024-01-01", "2024-01-05", "2024-02-01", "2024-02-02", "2024-02-03"],
+        "sentiment_label": "NEGATIVE",
+        "sentiment_score": 0.2,
+        "source": "google_play",
+        "identified_theme": None,
+    })
+    postgres.insert_reviews(df, "CBE")
+    postgres.insert_reviews(df.iloc[:2], "BOA")
+
+    hits = postgres.search_reviews("OTP or login failure", banks=["CBE"])
+    assert list(hits.columns) == postgres.SEARCH_COLUMNS
+    assert set(hits["review_text"]) == {"OTP never arrives", "Login failure after update",
+                                        "login keeps failing, login failure"}
+    assert hits["rank"].is_monotonic_decreasing
+
+    assert len(postgres.search_reviews("otp")) == 2
+    assert len(postgres.search_reviews("ኦቲፒ")) == 1
+    assert postgres.search_reviews('"failure after" -update').empty
+    assert len(postgres.search_reviews("login", date_range=("2024-01-10", None))) == 1
+    assert len(postgres.search_reviews("login", banks=["CBE"], limit=1, offset=1)) == 1
+    assert postgres.search_reviews("-otp").empty
+
+
+def test_retry_on_transient_errors_only(monkeypatch):
+    from sqlalchemy.exc import OperationalError, ProgrammingError
+
+    monkeypatch.setattr(postgres.time, "sleep", lambda s: None)
+    attempts = []
+
+    @postgres.with_retry
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OperationalError("SELECT 1", {}, Exception("server closed the connection unexpectedly"),
+                                   connection_invalidated=True)
+        return "ok"
+
+    assert flaky() == "ok" and len(attempts) == 3
+
+    class Deadlock(Exception):
+        pgcode = "40P01"
+
+    @postgres.with_retry
+    def deadlocked():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise OperationalError("UPDATE reviews", {}, Deadlock("deadlock detected"))
+        return "ok"
+
+    attempts.clear()
+    assert deadlocked() == "ok" and len(attempts) == 2
+
+    @postgres.with_retry
+    def missing_table():
+        attempts.append(1)
+        raise OperationalError("SELECT * FROM nope", {}, Exception("no such table: nope"))
+
+    attempts.clear()
+    with pytest.raises(OperationalError):
+        missing_table()
+    assert len(attempts) == 1
+
+    @postgres.with_retry
+    def broken():
+        attempts.append(1)
+        raise ProgrammingError("SELEC 1", {}, Exception("syntax error"))
+
+    attempts.clear()
+    with pytest.raises(ProgrammingError):
+        broken()
+    assert len(attempts) == 1
+
+
+def test_pool_metrics(monkeypatch, tmp_path):
+    monkeypatch.setattr(postgres.config, "DB_URL", f"sqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.setattr(postgres, "_engine", None)
+    engine = postgres.get_engine()
+    before = postgres.get_pool_metrics()["checkouts"]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert postgres.get_pool_metrics()["checkedout"] == 1
+    metrics = postgres.get_pool_metrics()
+    assert metrics["checkouts"] == before + 1
+    assert metrics["checkedout"] == 0
+    assert metrics["wait_seconds_total"] >= 0
+    assert "reviews_db_pool_overflow " in postgres.pool_metrics_text()
+    engine.dispose()
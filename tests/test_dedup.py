@@ -0,0 +1,67 @@
+import pandas as pd
+
+from src.pipeline import runner
+from src.pipeline.runner import Chunk, dedup_stage, sentiment_stage, themes_stage
+from src.preprocessing.dedup import MinHashLSH, broadcast, find_near_duplicates, normalize_for_dedup
+
+
+def test_normalize_for_dedup():
+    assert normalize_for_dedup("  Goooood APP!!! 😍 ") == "good app 😍"
+    assert normalize_for_dedup(None) == ""
+
+
+def test_near_duplicates_cluster_to_first_member():
+    df = pd.DataFrame({"review_text": [
+        "Good app!!",
+        "The app keeps crashing every time I try to transfer money",
+        "good app",
+        "the app keeps crashing every time i try to transfer money!!!",
+        "Customer service never answers the phone",
+    ]}, index=[10, 11, 12, 13, 14])
+    out = find_near_duplicates(df, spam_min_size=2, spam_min_tokens=6)
+
+    assert out["dup_cluster"].tolist() == [0, 1, 0, 1, 4]
+    assert out["dup_cluster_size"].tolist() == [2, 2, 2, 2, 1]
+    assert out["is_representative"].tolist() == [True, True, False, False, True]
+    assert out["spam_candidate"].tolist() == [False, True, False, True, False]
+
+
+def test_emoji_keep_opposite_reviews_apart():
+    df = pd.DataFrame({"review_text": [
+        "👍", "😡", "", "ok", "ok",
+        "Good app 😍", "good app 😡", "good app 😍😍",
+        "The app keeps crashing every time I try to transfer money 😡",
+        "The app keeps crashing every time I try to transfer money 🙏",
+    ]})
+    out = find_near_duplicates(df)
+
+    # emoji-only and very short texts are never clustered; different emoji never merge
+    assert out["dup_cluster"].tolist() == [0, 1, 2, 3, 4, 5, 6, 5, 8, 9]
+
+
+def test_dissimilar_reviews_stay_apart():
+    texts = ["otp never arrives", "otp arrives late sometimes", "love the new design", "love the old design more"]
+    clusters = MinHashLSH(threshold=0.8).cluster([normalize_for_dedup(t) for t in texts])
+    assert clusters.tolist() == [0, 1, 2, 3]
+
+
+def test_stages_score_representatives_and_broadcast(monkeypatch):
+    scored = []
+
+    def fake_sentiment(texts, batch_size=None, cache=None, failed=None):
+        scored.extend(texts)
+        return [("POSITIVE" if "good" in t.lower() else "NEGATIVE", 0.9) for t in texts]
+
+    monkeypatch.setattr(runner, "predict_sentiment", fake_sentiment)
+    monkeypatch.setattr(runner, "extract_themes_per_review", lambda texts: [[t.split()[0].lower()] for t in texts])
+    df = pd.DataFrame({"review_text": ["Good app", "Slow login", "good app!", "GOOD APP"]})
+    chunk = themes_stage(sentiment_stage(dedup_stage(Chunk("c", "CBE", df))))
+
+    assert scored == ["Good app", "Slow login"]
+    assert chunk.df["sentiment_label"].tolist() == ["POSITIVE", "NEGATIVE", "POSITIVE", "POSITIVE"]
+    assert chunk.df["identified_theme"].tolist() == [["good"], ["slow"], ["good"], ["good"]]
+
+
+def test_broadcast_without_dedup_columns_is_identity():
+    df = pd.DataFrame({"review_text": ["a", "b"]})
+    assert broadcast(df, [1, 2]) == [1, 2]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import embeddings
+from src.analysis.embeddings import EmbeddingStore
+
+
+def _vectors(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, dim)).astype(np.float32)
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float16)
+
+
+def test_exact_search_and_persistence(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    vecs = _vectors(200)
+    assert store.add(np.arange(1, 201), vecs) == 200
+    assert store.add(np.arange(1, 201), vecs) == 0  # already stored
+
+    hits = store.search(vecs[41], k=3)
+    assert hits["review_id"].iloc[0] == 42
+    assert hits["score"].iloc[0] == pytest.approx(1.0, abs=1e-2)
+
+    reopened = EmbeddingStore(tmp_path)
+    assert len(reopened) == 200 and reopened.last_id == 200
+    assert reopened.vectors.dtype == np.float16
+    assert reopened.search(vecs[41], k=1)["review_id"].iloc[0] == 42
+
+
+def test_interrupted_add_is_truncated_on_open(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    vecs = _vectors(30)
+    store.add(np.arange(1, 21), vecs[:20])
+    # An add that appended its vectors but died before ids.npy was replaced
+    with open(tmp_path / "vectors.f16", "ab") as f:
+        f.write(vecs[20:25].tobytes())
+
+    reopened = EmbeddingStore(tmp_path)
+    assert len(reopened) == 20
+    assert (tmp_path / "vectors.f16").stat().st_size == 20 * 16 * 2
+    assert reopened.add(np.arange(21, 31), vecs[20:]) == 10
+    assert reopened.search(vecs[25], k=1)["review_id"].iloc[0] == 26
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_ivf_index_is_incremental(tmp_path):
+    store = EmbeddingStore(tmp_path, ivf_min_rows=500)
+    vecs = _vectors(800)
+    store.add(np.arange(400), vecs[:400])
+    assert store.centroids is None
+    store.add(np.arange(400, 600), vecs[400:600])
+    assert store.centroids is not None and len(store.lists) == 600
+    trained = store.centroids.copy()
+
+    store.add(np.arange(600, 800), vecs[600:])
+    assert len(store.lists) == 800 and np.array_equal(store.centroids, trained)
+
+    # The probed lists always include the query's own list, so a stored vector finds itself
+    for i in (5, 450, 799):
+        assert store.search(vecs[i], k=1, nprobe=2)["review_id"].iloc[0] == i
+
+
+def test_cluster_separates_groups(tmp_path):
+    base = _vectors(2, dim=8, seed=1).astype(np.float32)
+    noise = np.random.default_rng(2).normal(scale=0.01, size=(60, 8))
+    vecs = np.vstack([base[0] + noise[:30], base[1] + noise[30:]])
+    store = EmbeddingStore(tmp_path)
+    store.add(np.arange(60), vecs)
+    labels = store.cluster(2)["cluster"].to_numpy()
+    assert len(set(labels[:30])) == 1 and len(set(labels[30:])) == 1 and labels[0] != labels[-1]
+
+
+def test_embed_new_reviews_reads_only_new_ids(tmp_path, monkeypatch):
+    from src.db import postgres
+
+    rows = pd.DataFrame({"review_id": [1, 2, 3], "review_text": ["slow otp", "great app", "login fails"]})
+    monkeypatch.setattr(postgres, "get_reviews_after",
+                        lambda after_id, limit: rows[rows["review_id"] > after_id].head(limit))
+    monkeypatch.setattr(embeddings, "encode", lambda texts, batch_size=None: _vectors(len(texts), seed=len(texts)))
+
+    store = EmbeddingStore(tmp_path)
+    assert embeddings.embed_new_reviews(store, chunksize=2) == 3
+    assert embeddings.embed_new_reviews(store, chunksize=2) == 0
+    assert list(store.ids) == [1, 2, 3]
@@ -0,0 +1,47 @@
+# tests/test_import_time.py
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "src.config",
+    "src.analysis.sentiment",
+    "src.analysis.thematic",
+    "src.preprocessing.clean",
+    "src.scraping.scraper",
+    "src.db.postgres",
+]
+# Importing any of these means a model is being loaded at import time
+MODEL_PACKAGES = {"transformers", "torch", "spacy", "sentence_transformers"}
+# Cumulative seconds per module; generous because pandas/sqlalchemy dominate
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def _importtime(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative) / 1e6
+    return timings
+
+
+def test_no_model_loaded_on_import():
+    for module in MODULES:
+        timings = _importtime(module)
+        loaded = {name.split(".")[0] for name in timings} & MODEL_PACKAGES
+        assert not loaded, f"{module} imports {loaded} at import time"
+
+
+def test_import_time_budget():
+    for module in MODULES:
+        seconds = _importtime(module)[module]
+        assert seconds < IMPORT_BUDGET_SECONDS, f"{module} took {seconds:.2f}s to import"
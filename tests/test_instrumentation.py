@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from src.instrumentation import Registry, profiled
+
+
+def test_counters_gauges_and_histograms():
+    reg = Registry()
+    reg.inc("sentiment.texts", 3)
+    reg.inc("sentiment.texts")
+    reg.set_gauge("db.load_rows_per_sec", 120.5)
+    for seconds in (0.001, 0.02, 0.02, 3.0):
+        reg.observe("sentiment.batch", seconds)
+    with pytest.raises(RuntimeError):
+        with reg.timer("clean.reviews"):
+            raise RuntimeError("timed anyway")
+
+    snap = reg.snapshot()
+    assert snap["counters"] == {"sentiment.texts": 4}
+    assert snap["gauges"] == {"db.load_rows_per_sec": 120.5}
+    hist = snap["histograms"]["sentiment.batch"]
+    assert hist["count"] == 4 and hist["max"] == 3.0
+    assert hist["buckets"]["0.005"] == 1 and hist["buckets"]["0.025"] == 3 and hist["buckets"]["+Inf"] == 4
+    assert snap["histograms"]["clean.reviews"]["count"] == 1
+
+
+def test_export_json_and_prometheus(tmp_path):
+    reg = Registry()
+    reg.inc("scrape.pages", 2)
+    reg.observe("db.load", 0.2)
+
+    data = json.loads(reg.export(tmp_path / "metrics.json").read_text())
+    assert data["counters"]["scrape.pages"] == 2
+
+    text = reg.export(tmp_path / "metrics.prom").read_text()
+    assert "# TYPE reviews_scrape_pages counter\nreviews_scrape_pages 2" in text
+    assert 'reviews_db_load_seconds_bucket{le="0.25"} 1' in text
+    assert "reviews_db_load_seconds_count 1" in text
+
+
+def test_profiled_writes_stats(tmp_path):
+    out = tmp_path / "run.prof"
+    with profiled(out):
+        sum(range(1000))
+    assert out.exists() and out.stat().st_size > 0
+    with profiled(None):
+        pass
@@ -0,0 +1,114 @@
+import pandas as pd
+from sqlalchemy import create_engine
+
+from src.config import config
+from src.pipeline import runner
+from src.pipeline.runner import Chunk, Stage, iter_raw_chunks, load_stage, run_pipeline
+from src.storage import columnar
+
+
+def _chunks(n=5):
+    for i in range(n):
+        df = pd.DataFrame({
+            "review_text": [f"  review   {i} ", ""],
+            "rating": [4, 5],
+            "review_date": ["2024-01-01", "2024-01-02"],
+            "source": "google_play",
+        })
+        yield Chunk(f"chunk-{i}", "CBE", df)
+
+
+def test_default_stages_stream_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(config, "STORAGE_FORMAT", "parquet")
+    loaded = []
+    monkeypatch.setattr(runner, "predict_sentiment", lambda texts, batch_size=None, cache=None, failed=None: [("POSITIVE", 0.9)] * len(texts))
+    monkeypatch.setattr(runner, "extract_themes_per_review", lambda texts: [["app"]] * len(texts))
+    monkeypatch.setattr(runner.postgres, "insert_reviews", lambda df, bank_name, raise_errors: loaded.append((bank_name, df)))
+
+    report = run_pipeline(_chunks(5), queue_size=1, checkpoint_path=tmp_path / "ckpt.json")
+
+    assert report.completed == [f"chunk-{i}" for i in range(5)]
+    assert [s.name for s in report.stages] == ["clean", "dedup", "sentiment", "themes", "output", "load"]
+    assert all(s.chunks == 5 for s in report.stages)
+    bank, df = loaded[0]
+    assert bank == "CBE" and len(df) == 1
+    assert df.loc[0, "review_text"] == "review 0"
+    assert df.loc[0, "identified_theme"] == ["app"]
+
+    # A rerun rewrites each chunk's part file instead of appending the rows again
+    output = columnar.read_reviews("output", banks=["CBE"], columns=["review_text", "identified_theme"])
+    assert len(output) == 5 and output["identified_theme"].tolist() == [["app"]] * 5
+    run_pipeline(_chunks(5), checkpoint_path=tmp_path / "other.json")
+    assert len(columnar.read_reviews("output", banks=["CBE"], columns=["review_text"])) == 5
+
+
+def test_checkpoint_resumes_and_failed_chunks_retry(tmp_path):
+    ckpt = tmp_path / "ckpt.json"
+
+    def flaky(chunk):
+        if chunk.chunk_id == "chunk-2":
+            raise RuntimeError("boom")
+        return chunk
+
+    first = run_pipeline(_chunks(4), stages=[Stage("flaky", flaky)], checkpoint_path=ckpt)
+    assert first.completed == ["chunk-0", "chunk-1", "chunk-3"]
+    assert "chunk-2" in first.failed and first.stages[0].failures == 1
+
+    second = run_pipeline(_chunks(4), stages=[Stage("ok", lambda c: c)], checkpoint_path=ckpt)
+    assert second.completed == ["chunk-2"]
+    assert len(second.skipped) == 3
+
+
+def test_failed_load_is_not_checkpointed(monkeypatch, tmp_path):
+    monkeypatch.setattr(runner.postgres, "_engine", create_engine(f"sqlite:///{tmp_path / 'reviews.db'}"))
+    runner.postgres.create_schema()
+    ckpt = tmp_path / "ckpt.json"
+
+    def score(chunk):
+        chunk.df = chunk.df.assign(sentiment_label="POSITIVE", sentiment_score=0.9, identified_theme=None)
+        return chunk
+
+    stages = [Stage("clean", runner.clean_stage), Stage("score", score), Stage("load", load_stage)]
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(runner.postgres, "_load_staging", broken)
+        first = run_pipeline(_chunks(2), stages=stages, checkpoint_path=ckpt)
+    assert first.completed == [] and set(first.failed) == {"chunk-0", "chunk-1"}
+    assert runner.load_checkpoint(ckpt) == set()
+
+    second = run_pipeline(_chunks(2), stages=stages, checkpoint_path=ckpt)
+    assert second.completed == ["chunk-0", "chunk-1"] and not second.skipped
+    assert runner.postgres.get_kpis(["CBE"])["volume"] == 2
+
+
+def test_chunk_ids_change_when_the_raw_file_is_rewritten(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "RAW_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "STORAGE_FORMAT", "csv")
+    path = tmp_path / "cbe_raw.csv"
+
+    def ids(review_ids):
+        pd.DataFrame({"review_id": review_ids, "review_text": "ok"}).to_csv(path, index=False)
+        return [c.chunk_id for c in iter_raw_chunks(["CBE"], chunksize=2)]
+
+    first = ids(["a", "b", "c"])
+    assert ids(["a", "b", "c"]) == first
+    rescraped = ids(["d", "e", "c"])
+    assert rescraped[0] != first[0] and rescraped[1] == first[1]
+
+
+def test_fallback_scores_are_not_stamped(monkeypatch):
+    def predict(texts, batch_size=None, cache=None, failed=None):
+        failed.extend(i for i, t in enumerate(texts) if "boom" in t)
+        return [("NEUTRAL", 0.5) if "boom" in t else ("POSITIVE", 0.9) for t in texts]
+
+    monkeypatch.setattr(runner, "predict_sentiment", predict)
+    monkeypatch.setattr(runner, "current_model_version", lambda: "model@1")
+    df = pd.DataFrame({"review_text": ["good app today", "boom goes the app", "Boom goes the app!"]})
+    chunk = runner.sentiment_stage(runner.dedup_stage(Chunk("c", "CBE", df)))
+
+    assert chunk.df["model_version"].iloc[0] == "model@1"
+    assert chunk.df["model_version"].isna().tolist() == [False, True, True]
@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.db import postgres
+from src.pipeline import rescore
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reviews.db'}")
+    monkeypatch.setattr(postgres, "_engine", engine)
+    postgres.create_schema()
+    return engine
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    calls = {"sentiment": 0, "themes": 0}
+
+    def predict(texts, batch_size=None, cache=None, failed=None):
+        calls["sentiment"] += len(texts)
+        # "boom" texts fail inference and get the neutral fallback
+        failed.extend(i for i, t in enumerate(texts) if "boom" in t)
+        return [("NEUTRAL", 0.5) if "boom" in t else ("NEGATIVE", 0.1) for t in texts]
+
+    def themes(texts):
+        calls["themes"] += len(texts)
+        return [["rescored"]] * len(texts)
+
+    monkeypatch.setattr(rescore, "predict_sentiment", predict)
+    monkeypatch.setattr(rescore, "extract_themes_per_review", themes)
+    monkeypatch.setattr(rescore, "current_model_version", lambda: "model@2")
+    return calls
+
+
+def _reviews(n=5, **versions):
+    return pd.DataFrame({
+        "review_text": [f"review {i}" for i in range(n)],
+        "rating": 4,
+        "review_date": "2024-01-01",
+        "sentiment_label": "POSITIVE",
+        "sentiment_score": 0.9,
+        "source": "google_play",
+        "identified_theme": [["app"]] * n,
+        **versions,
+    })
+
+
+def test_only_stale_rows_are_rescored(sqlite_engine, fake_models):
+    postgres.insert_reviews(_reviews(5), "CBE")
+    postgres.insert_reviews(_reviews(2, model_version="model@2", themes_version=rescore.THEMES_VERSION)
+                            .assign(review_text=["fresh 0", "fresh 1"]), "CBE")
+
+    report = rescore.rescore_stale(chunksize=2)
+    assert report.stale == 5 and report.chunks == 3
+    assert fake_models == {"sentiment": 5, "themes": 5}
+    assert postgres.get_sentiment_counts(["CBE"]).set_index("sentiment_label")["count"].to_dict() == {
+        "NEGATIVE": 5, "POSITIVE": 2}
+    assert postgres.get_theme_impact(["CBE"]).set_index("Theme").loc["rescored", "Volume"] == 5
+
+    again = rescore.rescore_stale()
+    assert again.stale == 0 and again.rows == 0
+
+
+def test_limit_resumes_on_next_run(sqlite_engine, fake_models):
+    postgres.insert_reviews(_reviews(5), "CBE")
+    first = rescore.rescore_stale(themes=False, limit=3)
+    assert first.sentiment_rows == 3 and first.theme_rows == 0
+    assert postgres.count_stale_reviews("model@2") == 2
+    second = rescore.rescore_stale(themes=False)
+    assert second.sentiment_rows == 2
+    with sqlite_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM reviews WHERE themes_version IS NULL")).scalar() == 5
+
+
+def test_unavailable_model_is_never_stamped(sqlite_engine, fake_models, monkeypatch):
+    monkeypatch.setattr(rescore, "current_model_version", lambda: None)
+    postgres.insert_reviews(_reviews(2), "CBE")
+    report = rescore.rescore_stale()
+    assert report.sentiment_rows == 0 and report.theme_rows == 2
+    assert fake_models["sentiment"] == 0
+
+
+def test_fallback_scores_stay_stale(sqlite_engine, fake_models):
+    postgres.insert_reviews(_reviews(4).assign(review_text=["ok 0", "boom 1", "ok 2", "boom 3"]), "CBE")
+    report = rescore.rescore_stale(themes=False)
+    assert report.sentiment_rows == 2
+    with sqlite_engine.connect() as conn:
+        stale = conn.execute(text("SELECT review_text FROM reviews WHERE model_version IS NULL ORDER BY 1"))
+        assert [r[0] for r in stale] == ["boom 1", "boom 3"]
+    assert rescore.rescore_stale(themes=False).stale == 2
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.config import config
+from src.scraping import scraper
+from src.storage import columnar
+
+
+@pytest.fixture(autouse=True)
+def csv_storage(monkeypatch):
+    monkeypatch.setattr(config, "STORAGE_FORMAT", "csv")
+
+
+class FakeReviews:
+    """Local stand-in for google_play_scraper.reviews: pages of synthetic reviews."""
+
+    def __init__(self, total=450, fail_first=0, new=0):
+        self.total = total
+        self.fail_first = fail_first
+        self.new = new
+        self.calls = 0
+
+    def __call__(self, app_id, lang="en", country="us", count=100, continuation_token=None):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise ConnectionError("transient")
+        start = continuation_token if continuation_token is not None else -self.new
+        stop = min(start + count, self.total)
+        # Newest first; `new` reviews are newer than review 0
+        page = [{"content": f"{app_id} review {i}", "score": 1 + i % 5, "userName": "u",
+                 "at": datetime(2024, 1, 1) - timedelta(hours=i), "reviewId": f"{app_id}-{i}"}
+                for i in range(start, stop)]
+        return page, (stop if stop < self.total else None)
+
+
+def test_scrape_all_banks_concurrently(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    report = scraper.scrape_all_banks(n=300, fetch=FakeReviews(), limiter=scraper.TokenBucket(1000, 10))
+
+    assert set(report.outputs) == set(scraper.APP_IDS) and not report.errors
+    assert len(pd.read_csv(report.outputs["CBE"])) == 300
+    assert report.stats["CBE"].pages == 2
+    assert report.pages == 6 and report.wall_time > 0
+
+
+def test_fetch_retries_with_backoff(monkeypatch):
+    monkeypatch.setattr(config, "SCRAPE_BACKOFF_BASE", 0.0)
+    stats = scraper.ScrapeStats()
+    fake = FakeReviews(total=50, fail_first=2)
+    df = scraper.scrape_reviews_for_app("app", n=100, fetch=fake, limiter=scraper.TokenBucket(1000, 10), stats=stats)
+    assert len(df) == 50
+    assert stats.retries == 2
+
+
+def test_token_bucket_limits_rate():
+    bucket = scraper.TokenBucket(rate=50, capacity=1)
+    waited = sum(bucket.acquire() for _ in range(6))
+    assert waited >= 0.08
+
+
+def test_incremental_scrape_emits_only_new_reviews(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    limiter = scraper.TokenBucket(1000, 10)
+    scraper.scrape_and_save("CBE", n=300, fetch=FakeReviews(), limiter=limiter, incremental=True)
+
+    fake = FakeReviews(new=7)
+    stats = scraper.ScrapeStats()
+    delta_path = scraper.scrape_and_save("CBE", n=300, fetch=fake, limiter=limiter, stats=stats, incremental=True)
+
+    delta = pd.read_csv(delta_path)
+    assert delta_path.endswith("cbe_raw_delta.csv")
+    assert list(delta["review_id"]) == [f"com.combanketh.mobilebanking-{i}" for i in range(-7, 0)]
+    assert fake.calls == 1 and stats.pages == 1
+    assert len(pd.read_csv(tmp_path / "cbe_raw.csv")) == 307
+
+    again = scraper.scrape_and_save("CBE", n=300, fetch=FakeReviews(new=7), limiter=limiter, incremental=True)
+    assert pd.read_csv(again).empty
+
+
+def test_incremental_scrape_upgrades_legacy_csv(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    # Written before review_id was scraped
+    pd.DataFrame({"review_text": ["old review"], "rating": [4], "review_date": ["2023-12-01"],
+                  "user_name": ["u"], "source": ["google_play"]}).to_csv(tmp_path / "cbe_raw.csv", index=False)
+
+    scraper.scrape_and_save("CBE", n=3, fetch=FakeReviews(total=3), limiter=scraper.TokenBucket(1000, 10),
+                            incremental=True)
+    raw = pd.read_csv(tmp_path / "cbe_raw.csv")
+    assert list(raw.columns) == scraper.RAW_COLUMNS
+    assert raw["review_text"].tolist() == ["old review"] + [f"com.combanketh.mobilebanking review {i}" for i in range(3)]
+    assert raw["review_id"].isna().tolist() == [True, False, False, False]
+    assert raw["rating"].tolist() == [4, 1, 2, 3]
+
+
+def test_parquet_storage_partitions_by_bank(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "STORAGE_FORMAT", "parquet")
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    limiter = scraper.TokenBucket(1000, 10)
+    scraper.scrape_and_save("CBE", n=300, fetch=FakeReviews(), limiter=limiter, incremental=True)
+    path = scraper.scrape_and_save("CBE", n=300, fetch=FakeReviews(new=7), limiter=limiter, incremental=True)
+
+    assert "bank=CBE" in path and "scrape_date=" in path
+    df = columnar.read_reviews("raw", banks=["CBE"], columns=["review_id", "review_date", "bank"])
+    assert len(df) == 307
+    assert pd.api.types.is_datetime64_any_dtype(df["review_date"])
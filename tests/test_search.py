@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from src.db import search
+
+TEXTS = ["OTP never arrives", "login failure again", "Login keeps failing", "failure to login",
+         None, "ጥሩ otp otp", "cbe login failure"]
+
+
+def test_parse_and_compile_query():
+    groups = search.parse_query('"Login failure" -CBE or otp')
+    assert groups == [[(("login", "failure"), False), (("cbe",), True)], [(("otp",), False)]]
+    assert search.to_tsquery(groups) == "((login <-> failure) & !(cbe)) | ((otp))"
+    assert search.to_fts5(groups) == '("login failure" NOT "cbe") OR ("otp")'
+    assert search.parse_query("-otp or") == []
+
+
+def test_index_matches_boolean_semantics():
+    index = search.ReviewIndex(TEXTS)
+    positions, scores = index.search('otp or "login failure" -cbe')
+    assert set(positions) == {0, 1, 5}
+    assert positions[0] == 5  # two OTP mentions in a short review rank first
+    assert np.all(np.diff(scores) <= 0)
+
+    assert set(index.search("login failure")[0]) == {1, 3, 6}
+    assert set(index.search('"login failure"')[0]) == {1, 6}
+    assert list(index.search("ጥሩ")[0]) == [5]
+    assert len(index.search("")[0]) == 0
+
+
+def test_search_frame_applies_mask_and_pages():
+    frame = pd.DataFrame({"bank": ["CBE", "BOA", "CBE", "CBE", "BOA", "BOA", "CBE"], "review_text": TEXTS})
+    index = search.ReviewIndex(frame["review_text"])
+    mask = (frame["bank"] == "CBE").to_numpy()
+    hits = index.search_frame(frame, "login", mask=mask, limit=2)
+    assert len(hits) == 2 and set(hits["bank"]) == {"CBE"} and "rank" in hits
+    assert len(index.search_frame(frame, "login", mask=mask, limit=2, offset=2)) == 1
@@ -1,5 +1,12 @@
+from pathlib import Path
+
+import pandas as pd
+
+import src.analysis.sentiment as sentiment
+from src import instrumentation
 from src.analysis.sentiment import predict_sentiment
 
+
 def test_english_sentiment():
     result = predict_sentiment(["This app is great!"])
     label, score = result[0]
@@ -14,3 +21,106 @@ def test_amharic_sentiment():
 def test_emoji_sentiment():
     result = predict_sentiment(["👍"])
     assert result[0][0] == "POSITIVE"
+
+
+class FakeClassifier:
+    """Stand-in for the HF pipeline: labels by keyword and records batch sizes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        self.calls.append(len(batch))
+        if any("boom" in t for t in batch):
+            raise RuntimeError("inference failed")
+        return [{"label": "positive" if "good" in t else "negative", "score": 0.8} for t in batch]
+
+
+def test_batched_sentiment_preserves_order(monkeypatch):
+    fake = FakeClassifier()
+    monkeypatch.setattr(sentiment, "_classifier", fake)
+    texts = ["good app", "bad", "👍", "a much longer good review text here", "slow"]
+    result = predict_sentiment(texts, batch_size=2)
+    assert [label for label, _ in result] == ["POSITIVE", "NEGATIVE", "POSITIVE", "POSITIVE", "NEGATIVE"]
+    assert max(fake.calls) == 2
+    assert result == predict_sentiment(texts)
+
+
+def test_batched_sentiment_neutral_fallback_per_text(monkeypatch):
+    monkeypatch.setattr(sentiment, "_classifier", FakeClassifier())
+    failed = []
+    result = predict_sentiment(["good", "boom", "bad", "👍", "boom"], batch_size=8, failed=failed)
+    assert result == [("POSITIVE", 0.8), ("NEUTRAL", 0.5), ("NEGATIVE", 0.8), ("POSITIVE", 0.95), ("NEUTRAL", 0.5)]
+    assert failed == [1, 4]
+
+
+class LexiconClassifier:
+    """Keyword stand-in that records the texts it scores."""
+
+    POSITIVE = ("good", "great", "love", "best", "well", "ጥሩ")
+    NEGATIVE = ("crash", "fail", "slow", "worst", "bad", "አይሰራም", "ቀርፋፋ")
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        self.seen.extend(batch)
+        preds = []
+        for t in batch:
+            lower = t.lower()
+            label = ("positive" if any(w in lower for w in self.POSITIVE)
+                     else "negative" if any(w in lower for w in self.NEGATIVE) else "neutral")
+            preds.append({"label": label, "score": 0.7})
+        return preds
+
+
+def test_route_text_by_script_and_emoji():
+    assert sentiment.route_text("Great app") == (sentiment.ROUTE_ENGLISH, None)
+    assert sentiment.route_text("ይህ መተግበሪያ ጥሩ ነው") == (sentiment.ROUTE_MULTILINGUAL, None)
+    assert sentiment.route_text("app ው ጥሩ ነው") == (sentiment.ROUTE_MULTILINGUAL, None)
+    assert sentiment.route_text("🙏") == (sentiment.ROUTE_ENGLISH, None)
+    assert sentiment.route_text("🙏 slow 😡 😀") == (sentiment.ROUTE_LEXICON, sentiment.EMOJI_MAP["😡"])
+    assert sentiment.route_text("... 5") == (sentiment.ROUTE_LEXICON, sentiment.NEUTRAL_FALLBACK)
+
+
+def test_english_route_uses_english_model(monkeypatch):
+    multilingual, english = LexiconClassifier(), LexiconClassifier()
+    monkeypatch.setattr(sentiment, "_classifier", multilingual)
+    monkeypatch.setattr(sentiment, "ENGLISH_MODEL_NAME", "english-model")
+    monkeypatch.setattr(sentiment, "_english_classifier", english)
+    monkeypatch.setattr(sentiment, "_english_loaded", True)
+    instrumentation.registry.reset()
+
+    result = predict_sentiment(["good app", "አይሰራም", "👍", "...", "slow"], batch_size=4)
+    assert [label for label, _ in result] == ["POSITIVE", "NEGATIVE", "POSITIVE", "NEUTRAL", "NEGATIVE"]
+    assert sorted(english.seen) == ["good app", "slow"]
+    assert multilingual.seen == ["አይሰራም"]
+    snap = instrumentation.snapshot()
+    assert snap["counters"]["sentiment.route.lexicon"] == 2
+    assert snap["counters"]["sentiment.emoji_shortcircuit"] == 1
+    assert snap["counters"]["sentiment.route.english"] == 2
+    assert {"sentiment.routing", "sentiment.route.english", "sentiment.route.multilingual"} <= set(snap["histograms"])
+
+
+def test_routing_accuracy_parity_on_labelled_fixture(monkeypatch):
+    # Each stub only knows its own language, so a text sent down the wrong route scores NEUTRAL
+    multilingual, english = LexiconClassifier(), LexiconClassifier()
+    multilingual.POSITIVE, multilingual.NEGATIVE = ("ጥሩ",), ("አይሰራም", "ቀርፋፋ")
+    english.POSITIVE = ("good", "great", "love", "best", "well")
+    english.NEGATIVE = ("crash", "fail", "slow", "worst", "bad")
+    monkeypatch.setattr(sentiment, "_classifier", multilingual)
+    monkeypatch.setattr(sentiment, "ENGLISH_MODEL_NAME", "english-model")
+    monkeypatch.setattr(sentiment, "_english_classifier", english)
+    monkeypatch.setattr(sentiment, "_english_loaded", True)
+    fixture = pd.read_csv(Path(__file__).parent / "fixtures" / "labelled_reviews.csv", keep_default_na=False)
+
+    report = sentiment.evaluate_routing(fixture["review_text"], fixture["label"], batch_size=8)
+    assert report["routes"] == {"lexicon": 7, "english": 10, "multilingual": 5}
+    assert report["route_accuracy"] == {"lexicon": 1.0, "english": 1.0, "multilingual": 1.0}
+    assert report["ok"]
+    assert report["routed_accuracy"] == 1.0
+    # Unrouted, the English reviews reach the multilingual stub and only the neutral ones come out right
+    assert report["baseline_accuracy"] < report["routed_accuracy"]
+    assert all(text in english.seen for text in fixture["review_text"][:10])
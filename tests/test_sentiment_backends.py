@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import src.analysis.sentiment as sentiment
+from src.analysis.sentiment import OnnxClassifier, compare_backends, predict_sentiment
+
+
+class KeywordClassifier:
+    """Pipeline-compatible stand-in: labels by keyword, optional score offset."""
+
+    def __init__(self, offset=0.0, flip=None):
+        self.offset = offset
+        self.flip = flip
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        preds = []
+        for t in batch:
+            label = "positive" if "good" in t else "negative"
+            if t == self.flip:
+                label = "neutral"
+            preds.append({"label": label, "score": 0.8 + self.offset})
+        return preds
+
+
+def keyword_backend(model_name, num_threads):
+    return KeywordClassifier()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown sentiment backend"):
+        sentiment.load_backend("tensorrt")
+
+
+def test_get_classifier_loads_configured_backend(monkeypatch):
+    loaded = []
+    monkeypatch.setitem(sentiment.BACKENDS, "fake", lambda name, threads: loaded.append(threads) or KeywordClassifier())
+    monkeypatch.setattr(sentiment, "BACKEND", "fake")
+    monkeypatch.setattr(sentiment, "NUM_THREADS", 2)
+    monkeypatch.setattr(sentiment, "DISABLE_MODEL", False)
+    monkeypatch.setattr(sentiment, "_classifier", None)
+    monkeypatch.setattr(sentiment, "_classifier_loaded", False)
+
+    assert isinstance(sentiment.get_classifier(), KeywordClassifier)
+    sentiment.get_classifier()
+    assert loaded == [2]
+
+
+def test_onnx_classifier_matches_pipeline_output():
+    class Session:
+        def run(self, _, feeds):
+            assert feeds["input_ids"].dtype == np.int64
+            return [np.array([[0.0, 0.0, 3.0], [2.0, 0.0, 0.0]], dtype=np.float32)]
+
+    def tokenizer(texts, **kwargs):
+        return {"input_ids": np.ones((len(texts), 4), dtype=np.int32), "attention_mask": np.ones((len(texts), 4))}
+
+    clf = OnnxClassifier.__new__(OnnxClassifier)
+    clf.session, clf.tokenizer = Session(), tokenizer
+    clf.input_names = {"input_ids", "attention_mask"}
+    clf.id2label = {0: "negative", 1: "neutral", 2: "positive"}
+
+    preds = clf(["great", "awful"], batch_size=2)
+    assert [p["label"] for p in preds] == ["positive", "negative"]
+    assert preds[0]["score"] == pytest.approx(np.exp(3) / (np.exp(3) + 2))
+
+
+def test_compare_backends_reports_parity():
+    texts = ["good app", "slow login", "good but slow"]
+    close = compare_backends(texts, KeywordClassifier(offset=0.01), reference=KeywordClassifier())
+    assert close["ok"] and close["label_agreement"] == 1.0 and close["max_score_diff"] == 0.01
+
+    off = compare_backends(texts, KeywordClassifier(flip="slow login"), reference=KeywordClassifier())
+    assert not off["ok"]
+    assert off["mismatches"] == [("slow login", ("NEGATIVE", 0.8), ("NEUTRAL", 0.8))]
+
+
+def test_worker_pool_matches_in_process_scoring(monkeypatch):
+    texts = ["good app", "bad", "👍", "good service", "slow", "bad"]
+    monkeypatch.setattr(sentiment, "BACKEND", keyword_backend)
+    monkeypatch.setattr(sentiment, "DISABLE_MODEL", False)
+    monkeypatch.setattr(sentiment, "_classifier", KeywordClassifier())
+    try:
+        assert predict_sentiment(texts, batch_size=2, workers=2) == predict_sentiment(texts, batch_size=2)
+    finally:
+        sentiment.shutdown_worker_pool()
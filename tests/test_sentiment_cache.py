@@ -0,0 +1,64 @@
+import pandas as pd
+
+import src.analysis.sentiment as sentiment
+from src.analysis.sentiment_cache import SentimentCache
+from src.config import config
+from src.pipeline.runner import Chunk, sentiment_stage
+
+
+class CountingClassifier:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        self.seen.extend(batch)
+        return [{"label": "POSITIVE", "score": 0.9} for _ in batch]
+
+
+def test_cache_only_sends_unseen_texts_to_model(monkeypatch, tmp_path):
+    fake = CountingClassifier()
+    monkeypatch.setattr(sentiment, "_classifier", fake)
+    cache = SentimentCache("model-a", path=str(tmp_path / "cache.sqlite"))
+
+    sentiment.predict_sentiment(["good app", "good app", "nice"], cache=cache)
+    assert sorted(fake.seen) == ["good app", "nice"]
+
+    result = sentiment.predict_sentiment(["good app", "nice", "new text"], cache=cache)
+    assert fake.seen[-1] == "new text" and len(fake.seen) == 3
+    assert result[0] == ("POSITIVE", 0.9)
+    assert cache.hits == 2 and cache.misses == 3
+
+
+def test_cache_persists_and_invalidates_on_model_change(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SentimentCache("model-a", path=path).put("good app", ("POSITIVE", 0.9))
+
+    assert SentimentCache("model-a", path=path).get("good app") == ("POSITIVE", 0.9)
+    assert SentimentCache("model-b", path=path).get("good app") is None
+    assert SentimentCache("model-a", path=path).get("good app") is None
+
+
+def test_cache_invalidates_on_backend_or_version_change(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SentimentCache("model-a", path=path, backend="hf", model_version="v1").put("good app", ("POSITIVE", 0.9))
+
+    assert SentimentCache("model-a", path=path, backend="hf", model_version="v1").get("good app") == ("POSITIVE", 0.9)
+    assert SentimentCache("model-a", path=path, backend="onnx", model_version="v1").get("good app") is None
+    SentimentCache("model-a", path=path, backend="hf", model_version="v1").put("good app", ("POSITIVE", 0.9))
+    assert SentimentCache("model-a", path=path, backend="hf", model_version="v2").get("good app") is None
+    assert SentimentCache("model-a", backend="hf").key("x") != SentimentCache("model-a", backend="onnx").key("x")
+
+
+def test_pipeline_stage_uses_the_default_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SENTIMENT_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "SENTIMENT_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(sentiment, "_cache", None)
+    fake = CountingClassifier()
+    monkeypatch.setattr(sentiment, "_classifier", fake)
+
+    for _ in range(2):
+        sentiment_stage(Chunk("c", "CBE", pd.DataFrame({"review_text": ["good app", "slow login"]})))
+    assert sorted(fake.seen) == ["good app", "slow login"]
+    assert sentiment.get_cache().identity["backend"] == sentiment.BACKEND
+    sentiment.get_cache().close()
@@ -0,0 +1,50 @@
+import pandas as pd
+import pyarrow.dataset as ds
+
+from src.config import config
+from src.storage import columnar
+
+
+def _frame():
+    return pd.DataFrame({
+        "review_text": ["Good app", "Slow login", "Okay"],
+        "rating": [5, 2, 3],
+        "review_date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01"]),
+        "sentiment_label": ["POSITIVE", "NEGATIVE", "NEUTRAL"],
+        "identified_theme": [["good", "app"], "['slow', 'login']", None],
+    })
+
+
+def test_round_trip_keeps_dtypes_and_theme_lists(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path)
+    columnar.write_reviews(_frame(), "output", "CBE", scrape_date="2024-03-02")
+    columnar.write_reviews(_frame().iloc[:1], "output", "BOA", scrape_date="2024-03-02")
+
+    df = columnar.read_reviews("output", banks=["CBE"])
+    assert len(df) == 3
+    assert pd.api.types.is_datetime64_any_dtype(df["review_date"])
+    assert df["identified_theme"].tolist() == [["good", "app"], ["slow", "login"], []]
+    assert set(df["scrape_date"]) == {"2024-03-02"}
+
+
+def test_projection_and_predicate_pushdown(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path)
+    columnar.write_reviews(_frame(), "output", "CBE", scrape_date="2024-03-02")
+    columnar.write_reviews(_frame(), "output", "CBE", scrape_date="2024-03-02")  # replaces the partition
+
+    table = columnar.read_table("output", columns=["review_text"], start="2024-01-15",
+                                filter=ds.field("rating") < 5)
+    assert table.column_names == ["review_text"]
+    assert table.column("review_text").to_pylist() == ["Slow login", "Okay"]
+
+
+def test_append_and_iter_batches(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "RAW_DIR", tmp_path)
+    raw = pd.DataFrame({"review_id": ["a", "b"], "review_text": ["x", "y"], "rating": [1, 2]})
+    columnar.write_reviews(raw, "raw", "Dashen", scrape_date="2024-01-01")
+    columnar.write_reviews(raw.assign(review_id=["c", "d"]), "raw", "Dashen",
+                           scrape_date="2024-01-01", mode="append")
+
+    batches = list(columnar.iter_batches(columnar.dataset_dir("raw"), bank="Dashen", batch_size=3))
+    assert [start for start, _ in batches] == [0, 2]  # batches never span files
+    assert sorted(pd.concat([b for _, b in batches])["review_id"]) == ["a", "b", "c", "d"]
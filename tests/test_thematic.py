@@ -6,3 +6,13 @@ def test_theme_extraction_keywords():
     assert len(themes) == 2
     assert isinstance(themes[0], list)
     assert any("slow" in t for t in themes[0])
+
+
+def test_iter_themes_streams_in_order():
+    from src.analysis.thematic import extract_themes, iter_themes
+
+    reviews = (t for t in ["The app is slow", "", "Transfer failed with an error"])
+    themes = list(iter_themes(reviews, batch_size=2))
+    assert len(themes) == 3
+    assert themes[1] == []
+    assert themes[0] == extract_themes(["The app is slow"])
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MultiLabelBinarizer
+
+from src.analysis.theme_drivers import theme_impact, theme_indicator_matrix
+
+
+def _mlb_loop(themes, scores):
+    """The dense MultiLabelBinarizer loop the dashboard used to run."""
+    df = pd.DataFrame({"themes": themes, "std_score": scores})
+    mlb = MultiLabelBinarizer()
+    X = pd.DataFrame(mlb.fit_transform(df["themes"]), columns=mlb.classes_)
+    rows = []
+    for theme in mlb.classes_:
+        mask = X[theme] == 1
+        rows.append({"Theme": theme, "Impact": df.loc[mask, "std_score"].mean(), "Volume": mask.sum()})
+    return pd.DataFrame(rows).set_index("Theme").sort_index()
+
+
+def test_indicator_matrix_is_binary_and_sorted():
+    X, terms = theme_indicator_matrix([["slow", "app", "slow"], [], None, ["otp"]])
+    assert terms == ["app", "otp", "slow"]
+    assert X.shape == (4, 3)
+    assert X.toarray().tolist() == [[1, 0, 1], [0, 0, 0], [0, 0, 0], [0, 1, 0]]
+
+
+def test_matches_dense_loop():
+    rng = np.random.default_rng(0)
+    vocab = [f"theme{i}" for i in range(40)]
+    themes = [list(rng.choice(vocab, size=rng.integers(0, 5), replace=False)) for _ in range(500)]
+    scores = rng.random(500)
+
+    expected = _mlb_loop(themes, scores)
+    got = theme_impact(themes, scores).set_index("Theme").sort_index()
+    assert list(got.index) == list(expected.index)
+    np.testing.assert_allclose(got["Impact"], expected["Impact"])
+    assert (got["Volume"].values == expected["Volume"].values).all()
+
+
+def test_min_volume_and_top_k():
+    themes = [["good", "app"], ["slow", "app"], ["app"], ["slow"]]
+    scores = [0.9, 0.2, 0.6, 0.1]
+    result = theme_impact(themes, scores, min_volume=2)
+    assert list(result["Theme"]) == ["app", "slow"]
+    assert result["Impact"].iloc[0] == pytest.approx(1.7 / 3)
+
+    top = theme_impact(themes, scores, top_k=1)
+    assert list(top["Theme"]) == ["app"]
+    assert top["Volume"].iloc[0] == 3
+
+
+def test_repeated_theme_counts_per_mention_like_theme_rollups():
+    result = theme_impact([["slow", "app", "slow"], ["app"]], [0.2, 0.8]).set_index("Theme")
+    assert result.loc["slow", "Volume"] == 2
+    assert result.loc["app", "Volume"] == 2
+    assert result.loc["app", "Impact"] == pytest.approx(0.5)
+
+
+def test_score_length_mismatch():
+    with pytest.raises(ValueError):
+        theme_impact([["app"]], [0.1, 0.2])
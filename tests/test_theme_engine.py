@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.analysis.theme_engine import ThemeEngine
+
+
+def _engine():
+    engine = ThemeEngine()
+    engine.partial_fit([["app", "slow", "slow"], ["app", "otp"], ["app", "good"]], banks=["CBE", "CBE", "BOA"])
+    return engine
+
+
+def test_incremental_document_frequency():
+    engine = _engine()
+    rows = engine.partial_fit([["otp", "login"]], banks=["BOA"])
+    assert list(rows) == [3]
+    assert engine.n_docs == 4
+    df = dict(zip(engine.terms, engine.doc_freq))
+    assert df == {"app": 3, "slow": 1, "otp": 2, "good": 1, "login": 1}
+    assert np.isclose(engine.idf()[engine.vocabulary["app"]], np.log(5 / 4) + 1)
+
+
+def test_common_terms_rank_below_specific_ones():
+    themes = _engine().top_themes_per_review(k=1)
+    assert themes == [["slow"], ["otp"], ["good"]]
+
+
+def test_row_slice_matches_whole_corpus():
+    engine = _engine()
+    rows = engine.partial_fit([["otp", "login"], ["slow", "login"]], banks=["BOA", "CBE"])
+    assert engine.counts_matrix(range(2, 4)).shape == (2, len(engine.terms))
+    assert (engine.counts_matrix(range(2, 4)) != engine.counts_matrix()[2:4]).nnz == 0
+    assert engine.top_themes_per_review(k=2, rows=rows) == engine.top_themes_per_review(k=2)[3:]
+    assert engine.top_themes_per_review(k=2, rows=range(2, 4)) == engine.top_themes_per_review(k=2)[2:4]
+
+
+def test_top_themes_per_bank():
+    per_bank = _engine().top_themes_per_bank(k=2)
+    assert set(per_bank) == {"BOA", "CBE"}
+    assert per_bank["CBE"][0][0] == "slow"
+    assert per_bank["BOA"][0][0] == "good"
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import trends
+
+
+def _rollups(days=60, shift_day=30, spike_day=45):
+    """Two reviews a day per bank; CBE turns negative from shift_day and has a volume spike."""
+    rows = []
+    for bank in ("CBE", "BOA"):
+        for d, day in enumerate(pd.date_range("2024-01-01", periods=days).date):
+            negative = bank == "CBE" and d >= shift_day
+            label, rating = ("NEGATIVE", 1) if negative else ("POSITIVE", 5)
+            count = 20 if (bank == "CBE" and d == spike_day) else 2
+            rows.append({"bank": bank, "review_date": day, "sentiment_label": label, "rating": rating,
+                         "review_count": count, "score_sum": 0.5 * count})
+            rows.append({"bank": bank, "review_date": day, "sentiment_label": "NEUTRAL", "rating": None,
+                         "review_count": 1 + d % 2, "score_sum": 0.5})
+    return pd.DataFrame(rows)
+
+
+def test_daily_and_weekly_metrics():
+    daily = trends.daily_series(_rollups())
+    table = trends.trend_table(daily, freq="D", window=7)
+    first = table[(table["bank"] == "BOA")].iloc[0]
+    assert first["volume"] == 3
+    assert first["avg_rating"] == 5
+    assert first["positive_share"] == pytest.approx(2 / 3)
+    assert first["polarization"] == pytest.approx(2 / 3)
+
+    weekly = trends.trend_table(daily, freq="W")
+    boa = weekly[weekly["bank"] == "BOA"]
+    assert boa["volume"].sum() == daily.loc[daily["bank"] == "BOA", "volume"].sum()
+    assert set(weekly.columns) >= {"positive_share_rolling", "avg_rating_ewma"}
+
+
+def test_empty_days_are_filled_and_rolling_weights_by_volume():
+    rollups = _rollups(days=10).query("review_date != @pd.Timestamp('2024-01-05').date()")
+    table = trends.trend_table(trends.daily_series(rollups), window=3)
+    gap = table[(table["bank"] == "BOA") & (table["date"] == "2024-01-05")].iloc[0]
+    assert gap["volume"] == 0 and np.isnan(gap["avg_rating"])
+    assert gap["avg_rating_rolling"] == 5
+
+
+def test_spike_and_change_point_detection():
+    table = trends.trend_table(trends.daily_series(_rollups()))
+    spikes = trends.detect_spikes(table, "volume")
+    assert list(zip(spikes["bank"], spikes["date"].dt.day)) == [("CBE", 15)]  # day 45 = Feb 15
+
+    changes = trends.detect_change_points(table, "positive_share", window=7)
+    assert list(changes["bank"]) == ["CBE"]
+    assert changes["date"].iloc[0] == pd.Timestamp("2024-01-31")  # day 30
+    assert changes["shift"].iloc[0] < 0
+
+
+def test_get_trends_reads_only_the_daily_rollup(monkeypatch):
+    from src.db import postgres
+    calls = []
+
+    def daily(banks, start=None, end=None):
+        calls.append((banks, start, end))
+        rows = _rollups(days=5)
+        return rows[rows["bank"].isin(banks)]
+
+    monkeypatch.setattr(postgres, "get_daily_rollups", daily)
+    monkeypatch.setattr(postgres, "get_rollups", None)
+    table = trends.get_trends(["BOA"], start="2024-01-01", end="2024-01-31")
+    assert set(table["bank"]) == {"BOA"} and len(table) == 5
+    assert calls == [(["BOA"], "2024-01-01", "2024-01-31")]